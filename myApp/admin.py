@@ -2,11 +2,27 @@ from django.contrib import admin
 from .models import (
     MediaAsset, SEO, Navigation, Hero, About, Stat, Service, ServicesSection,
     Portfolio, PortfolioProject, Testimonial, FAQ, FAQSection,
-    Contact, ContactInfo, ContactFormField, SocialLink, Footer
+    Contact, ContactInfo, ContactFormField, SocialLink, Footer, HomepageSnapshot, ImageUploadJob
 )
+from .content_helpers import rebuild_homepage_snapshot
 
 # Register your models here.
 
+class HomepageContentAdmin(admin.ModelAdmin):
+    """Admin for content models; rebuilds the homepage snapshot in the same transaction."""
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        rebuild_homepage_snapshot()
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        rebuild_homepage_snapshot()
+
+    def delete_queryset(self, request, queryset):
+        super().delete_queryset(request, queryset)
+        rebuild_homepage_snapshot()
+
 @admin.register(MediaAsset)
 class MediaAssetAdmin(admin.ModelAdmin):
     list_display = ['file_name', 'format', 'width', 'height', 'uploaded_at']
@@ -14,90 +30,102 @@ class MediaAssetAdmin(admin.ModelAdmin):
     search_fields = ['file_name', 'cloudinary_public_id']
     readonly_fields = ['uploaded_at']
 
+@admin.register(ImageUploadJob)
+class ImageUploadJobAdmin(admin.ModelAdmin):
+    list_display = ['file_name', 'status', 'attempts', 'created_at', 'finished_at']
+    list_filter = ['status']
+    search_fields = ['file_name', 'error']
+    readonly_fields = ['media_asset', 'result', 'created_at', 'started_at', 'finished_at']
+
 @admin.register(SEO)
-class SEOAdmin(admin.ModelAdmin):
+class SEOAdmin(HomepageContentAdmin):
     pass
 
 @admin.register(Navigation)
-class NavigationAdmin(admin.ModelAdmin):
+class NavigationAdmin(HomepageContentAdmin):
     list_display = ['label', 'url', 'sort_order', 'is_active']
     list_editable = ['sort_order', 'is_active']
     list_filter = ['is_active']
 
 @admin.register(Hero)
-class HeroAdmin(admin.ModelAdmin):
+class HeroAdmin(HomepageContentAdmin):
     pass
 
 @admin.register(About)
-class AboutAdmin(admin.ModelAdmin):
+class AboutAdmin(HomepageContentAdmin):
     pass
 
 @admin.register(Stat)
-class StatAdmin(admin.ModelAdmin):
+class StatAdmin(HomepageContentAdmin):
     list_display = ['number', 'label', 'sort_order']
     list_editable = ['sort_order']
 
 @admin.register(Service)
-class ServiceAdmin(admin.ModelAdmin):
+class ServiceAdmin(HomepageContentAdmin):
     list_display = ['title', 'sort_order']
     list_editable = ['sort_order']
     search_fields = ['title', 'description']
 
 @admin.register(ServicesSection)
-class ServicesSectionAdmin(admin.ModelAdmin):
+class ServicesSectionAdmin(HomepageContentAdmin):
     pass
 
 @admin.register(Portfolio)
-class PortfolioAdmin(admin.ModelAdmin):
+class PortfolioAdmin(HomepageContentAdmin):
     pass
 
 @admin.register(PortfolioProject)
-class PortfolioProjectAdmin(admin.ModelAdmin):
+class PortfolioProjectAdmin(HomepageContentAdmin):
     list_display = ['title', 'category', 'sort_order']
     list_editable = ['sort_order']
     list_filter = ['category']
     search_fields = ['title', 'description']
 
 @admin.register(Testimonial)
-class TestimonialAdmin(admin.ModelAdmin):
+class TestimonialAdmin(HomepageContentAdmin):
     list_display = ['name', 'company', 'rating', 'sort_order']
     list_editable = ['sort_order']
     list_filter = ['rating']
     search_fields = ['name', 'company', 'content']
 
 @admin.register(FAQ)
-class FAQAdmin(admin.ModelAdmin):
+class FAQAdmin(HomepageContentAdmin):
     list_display = ['question', 'category', 'sort_order']
     list_editable = ['sort_order']
     list_filter = ['category']
     search_fields = ['question', 'answer']
 
 @admin.register(FAQSection)
-class FAQSectionAdmin(admin.ModelAdmin):
+class FAQSectionAdmin(HomepageContentAdmin):
     pass
 
 @admin.register(Contact)
-class ContactAdmin(admin.ModelAdmin):
+class ContactAdmin(HomepageContentAdmin):
     pass
 
 @admin.register(ContactInfo)
-class ContactInfoAdmin(admin.ModelAdmin):
+class ContactInfoAdmin(HomepageContentAdmin):
     list_display = ['type', 'label', 'value', 'sort_order']
     list_editable = ['sort_order']
     list_filter = ['type']
 
 @admin.register(ContactFormField)
-class ContactFormFieldAdmin(admin.ModelAdmin):
+class ContactFormFieldAdmin(HomepageContentAdmin):
     list_display = ['name', 'label', 'field_type', 'required', 'sort_order']
     list_editable = ['sort_order', 'required']
     list_filter = ['field_type', 'required']
 
 @admin.register(SocialLink)
-class SocialLinkAdmin(admin.ModelAdmin):
+class SocialLinkAdmin(HomepageContentAdmin):
     list_display = ['platform', 'url', 'sort_order']
     list_editable = ['sort_order']
     list_filter = ['platform']
 
 @admin.register(Footer)
-class FooterAdmin(admin.ModelAdmin):
+class FooterAdmin(HomepageContentAdmin):
     pass
+
+@admin.register(HomepageSnapshot)
+class HomepageSnapshotAdmin(admin.ModelAdmin):
+    list_display = ['__str__', 'updated_at']
+    readonly_fields = ['content', 'updated_at']
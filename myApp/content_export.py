@@ -0,0 +1,141 @@
+"""
+Streaming export of homepage content and media assets.
+
+Rows are read with values() and iterator(chunk_size), and written out one at
+a time, so memory use stays flat however large the media library is. Two
+formats are produced:
+
+- json: the export_all_data document, identical to json.dump(indent=2) of
+  the whole export, readable by import_homepage_data
+- ndjson: one {"section": ..., "data": ...} record per line, singletons
+  first and then every list row, so large exports can be split by line and
+  processed in parallel. Each list section's rows are preceded by a
+  {"section": ...} header, so an empty section still reaches the importer
+"""
+
+import json
+from .content_import import LIST_SECTIONS, SECTION_ORDER, SINGLETON_SECTIONS
+from .models import MediaAsset
+
+EXPORT_CHUNK_SIZE = 2000  # Rows fetched per database round trip
+
+# Fields written for each section, in output order
+EXPORT_FIELDS = {
+    'seo': ('title', 'description', 'keywords', 'og_image', 'og_title', 'og_description'),
+    'navigation': ('label', 'url', 'sort_order', 'is_active'),
+    'hero': ('title', 'subtitle', 'image_url', 'button_text', 'button_url', 'content'),
+    'about': ('title', 'description', 'image_url', 'content'),
+    'stats': ('number', 'label', 'icon', 'sort_order'),
+    'services_section': ('title', 'subtitle', 'content'),
+    'services': ('title', 'description', 'image_url', 'icon', 'sort_order', 'content'),
+    'portfolio': ('title', 'subtitle', 'content'),
+    'portfolio_projects': ('title', 'description', 'image_url', 'gallery', 'category', 'sort_order', 'content'),
+    'testimonials': ('name', 'role', 'company', 'content', 'image_url', 'rating', 'sort_order'),
+    'faq_section': ('title', 'subtitle', 'content'),
+    'faqs': ('question', 'answer', 'category', 'sort_order'),
+    'contact': ('title', 'subtitle', 'content'),
+    'contact_info': ('type', 'label', 'value', 'icon', 'sort_order'),
+    'contact_form_fields': ('name', 'label', 'field_type', 'required', 'placeholder', 'sort_order'),
+    'social_links': ('platform', 'url', 'icon', 'sort_order'),
+    'footer': ('copyright_text', 'content'),
+    'media_assets': (
+        'original_path', 'file_name', 'cloudinary_url', 'cloudinary_public_id', 'format',
+        'width', 'height', 'file_size', 'was_converted',
+    ),
+}
+
+EXPORT_FORMATS = ('json', 'ndjson')
+
+
+def export_singleton(section):
+    """The section's single row as a dict, or {} when it has not been created."""
+    model = SINGLETON_SECTIONS[section]
+    return model.objects.order_by('pk').values(*EXPORT_FIELDS[section]).first() or {}
+
+
+def iter_section_rows(section, chunk_size=EXPORT_CHUNK_SIZE):
+    """Yield a list section's rows as dicts, fetching chunk_size rows at a time."""
+    model = MediaAsset if section == 'media_assets' else LIST_SECTIONS[section]
+    return model.objects.values(*EXPORT_FIELDS[section]).iterator(chunk_size=chunk_size)
+
+
+def dump_json(value, indent):
+    """value as indented JSON, nested indent levels deep."""
+    return json.dumps(value, indent=2, ensure_ascii=False).replace('\n', '\n' + '  ' * indent)
+
+
+def write_json(stream, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Write the export document to stream, one row at a time.
+
+    Args:
+        stream: Text file object to write to
+        chunk_size: Rows fetched per database round trip
+
+    Returns:
+        Dictionary mapping each section to its number of rows
+    """
+    counts = {}
+    stream.write('{')
+    for position, section in enumerate(SECTION_ORDER):
+        stream.write(f'{"," if position else ""}\n  {json.dumps(section)}: ')
+        if section in SINGLETON_SECTIONS:
+            stream.write(dump_json(export_singleton(section), 1))
+            counts[section] = 1
+            continue
+        count = 0
+        for row in iter_section_rows(section, chunk_size):
+            stream.write(f'{"," if count else "["}\n    {dump_json(row, 2)}')
+            count += 1
+        stream.write('\n  ]' if count else '[]')
+        counts[section] = count
+    stream.write('\n}')
+    return counts
+
+
+def write_ndjson(stream, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Write one {"section", "data"} record per line to stream, with a
+    {"section"} header line before each list section.
+
+    Args:
+        stream: Text file object to write to
+        chunk_size: Rows fetched per database round trip
+
+    Returns:
+        Dictionary mapping each section to its number of records
+    """
+    counts = {}
+    # Singletons first, so a reader has them before the long list sections
+    sections = sorted(SECTION_ORDER, key=lambda section: section not in SINGLETON_SECTIONS)
+    for section in sections:
+        if section in SINGLETON_SECTIONS:
+            rows = [export_singleton(section)]
+        else:
+            stream.write(json.dumps({'section': section}))
+            stream.write('\n')
+            rows = iter_section_rows(section, chunk_size)
+        count = 0
+        for row in rows:
+            stream.write(json.dumps({'section': section, 'data': row}, ensure_ascii=False))
+            stream.write('\n')
+            count += 1
+        counts[section] = count
+    return counts
+
+
+def export_content(stream, output_format='json', chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Stream every section to stream in the given format.
+
+    Args:
+        stream: Text file object to write to
+        output_format: 'json' or 'ndjson'
+        chunk_size: Rows fetched per database round trip
+
+    Returns:
+        Dictionary mapping each section to its number of rows
+    """
+    if output_format == 'ndjson':
+        return write_ndjson(stream, chunk_size)
+    return write_json(stream, chunk_size)
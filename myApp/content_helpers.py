@@ -2,12 +2,170 @@
 Content helpers for converting database models to JSON format for templates.
 """
 
+import time
+from datetime import datetime, timezone
+from django.core.cache import cache
+from django.db import DatabaseError, transaction
 from .models import (
     SEO, Navigation, Hero, About, Stat, Service, ServicesSection,
     Portfolio, PortfolioProject, Testimonial, FAQ, FAQSection,
-    Contact, ContactInfo, ContactFormField, SocialLink, Footer
+    Contact, ContactInfo, ContactFormField, SocialLink, Footer,
+    HomepageSnapshot
 )
 
+# Models whose rows make up the homepage content. A save or delete on any of
+# them bumps the content version (see myApp/signals.py).
+HOMEPAGE_CONTENT_MODELS = (
+    SEO, Navigation, Hero, About, Stat, Service, ServicesSection,
+    Portfolio, PortfolioProject, Testimonial, FAQ, FAQSection,
+    Contact, ContactInfo, ContactFormField, SocialLink, Footer,
+)
+
+# Cache settings
+CONTENT_VERSION_CACHE_KEY = 'homepage:content_version'
+CONTENT_CACHE_KEY = 'homepage:content:{version}'
+CONTENT_CACHE_TIMEOUT = 60 * 60 * 24  # Entries are keyed by version, so this only bounds stale ones
+
+# The homepage snapshot is a single row
+HOMEPAGE_SNAPSHOT_PK = 1
+
+# Per-process copy of the last content served, as a (version, content) tuple
+_local_content = (None, None)
+
+
+def get_content_version():
+    """
+    Get the current homepage content version.
+    
+    The version is the time of the last content change in nanoseconds, stored
+    in the shared cache so every worker sees the same value.
+    
+    Returns:
+        Version string
+    """
+    version = cache.get(CONTENT_VERSION_CACHE_KEY)
+    if version is None:
+        # First request after a cache flush; add() keeps concurrent workers in agreement
+        cache.add(CONTENT_VERSION_CACHE_KEY, get_initial_content_version(), None)
+        version = cache.get(CONTENT_VERSION_CACHE_KEY)
+    return version
+
+
+def get_initial_content_version():
+    """
+    Derive a content version from the database after a cache flush.
+    
+    Every content write rebuilds the homepage snapshot, so its timestamp is
+    the latest change across the content models. Using it keeps versions
+    (and the ETag/Last-Modified headers built from them) stable across
+    restarts and cache flushes.
+    
+    Returns:
+        Version string
+    """
+    try:
+        # A savepoint, so a failed query leaves an enclosing transaction usable
+        with transaction.atomic():
+            updated_at = HomepageSnapshot.objects.filter(pk=HOMEPAGE_SNAPSHOT_PK).values_list('updated_at', flat=True).first()
+    except DatabaseError:
+        # Snapshot table not migrated yet
+        updated_at = None
+    if updated_at is None:
+        return str(time.time_ns())
+    return str(int(updated_at.timestamp()) * 10**9 + updated_at.microsecond * 1000)
+
+
+def get_content_last_modified():
+    """
+    Get the time of the latest homepage content change.
+    
+    Returns:
+        Timezone-aware datetime
+    """
+    return datetime.fromtimestamp(int(get_content_version()) / 10**9, tz=timezone.utc)
+
+
+def bump_content_version():
+    """
+    Start a new homepage content version, invalidating every cached copy.
+    
+    Returns:
+        The new version string
+    """
+    version = str(time.time_ns())
+    cache.set(CONTENT_VERSION_CACHE_KEY, version, None)
+    return version
+
+
+def get_homepage_content():
+    """
+    Get homepage content, served from cache until the content version changes.
+    
+    Lookups go through a per-process copy first, then the shared cache, and
+    only fall back to the homepage snapshot row when neither holds the
+    current version.
+    The returned dictionary is shared between requests and must not be mutated.
+    
+    Returns:
+        Dictionary with all homepage content sections
+    """
+    global _local_content
+    
+    version = get_content_version()
+    local_version, content = _local_content
+    if local_version == version:
+        return content
+    
+    cache_key = CONTENT_CACHE_KEY.format(version=version)
+    content = cache.get(cache_key)
+    if content is None:
+        content = get_homepage_snapshot_content()
+        cache.set(cache_key, content, CONTENT_CACHE_TIMEOUT)
+    
+    _local_content = (version, content)
+    return content
+
+
+def get_homepage_snapshot_content():
+    """
+    Get homepage content from the snapshot row with a single primary key lookup.
+    
+    Falls back to building the content from the content tables if the
+    snapshot has not been generated yet.
+    
+    Returns:
+        Dictionary with all homepage content sections
+    """
+    try:
+        # A savepoint, so a failed query leaves an enclosing transaction usable
+        with transaction.atomic():
+            content = HomepageSnapshot.objects.filter(pk=HOMEPAGE_SNAPSHOT_PK).values_list('content', flat=True).first()
+    except DatabaseError:
+        # Snapshot table not migrated yet
+        content = None
+    if content is None:
+        content = get_homepage_content_from_db()
+    return content
+
+
+def rebuild_homepage_snapshot():
+    """
+    Regenerate the homepage snapshot from the content tables.
+    
+    Runs in a single transaction, so when called from inside a view's
+    transaction the snapshot is committed together with the content change.
+    
+    Returns:
+        The saved HomepageSnapshot instance
+    """
+    with transaction.atomic():
+        content = get_homepage_content_from_db()
+        snapshot, created = HomepageSnapshot.objects.update_or_create(
+            pk=HOMEPAGE_SNAPSHOT_PK,
+            defaults={'content': content}
+        )
+    return snapshot
+
 
 def get_homepage_content_from_db():
     """
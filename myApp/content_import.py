@@ -0,0 +1,422 @@
+"""
+Transactional bulk import of homepage content exported by export_all_data.
+
+The whole import runs in one transaction, so a failure part way leaves the
+previous content in place. List sections are replaced with one DELETE and
+batched bulk_create calls, singleton sections with one update_or_create each.
+The per-row content signals are disconnected for the duration; the homepage
+snapshot is rebuilt inside the transaction and the content version is bumped
+once it commits.
+
+In sync mode, list rows are instead matched to existing rows by a natural key
+(NATURAL_KEYS) and only the differences are written, so primary keys survive
+and an import that changes nothing leaves the content version, and every
+cache keyed by it, untouched.
+
+import_homepage_ndjson reads the NDJSON variant written by
+export_all_data --format ndjson line by line and writes it in batches as it
+goes, so memory use is bounded by the batch size rather than the file.
+"""
+
+import json
+import time
+from collections import defaultdict, deque
+from django.db import IntegrityError, transaction
+from .content_helpers import rebuild_homepage_snapshot
+from .models import (
+    SEO, Navigation, Hero, About, Stat, Service, ServicesSection,
+    Portfolio, PortfolioProject, Testimonial, FAQ, FAQSection,
+    Contact, ContactInfo, ContactFormField, SocialLink, Footer, MediaAsset
+)
+from .page_cache import purge_page_cache
+from .signals import content_signals_disconnected
+from .utils.cloudinary_utils import get_asset_url_fields
+
+IMPORT_BATCH_SIZE = 1000  # Rows per bulk_create/bulk_update
+PROGRESS_INTERVAL = 10000  # Records between progress reports of a streaming import
+IN_LOOKUP_CHUNK_SIZE = 900  # Values per IN (...) lookup, under SQLite's default 999 variable limit
+
+# Sections stored as a single row with pk=1
+SINGLETON_SECTIONS = {
+    'seo': SEO,
+    'hero': Hero,
+    'about': About,
+    'services_section': ServicesSection,
+    'portfolio': Portfolio,
+    'faq_section': FAQSection,
+    'contact': Contact,
+    'footer': Footer,
+}
+
+# Sections stored as a list of rows
+LIST_SECTIONS = {
+    'navigation': Navigation,
+    'stats': Stat,
+    'services': Service,
+    'portfolio_projects': PortfolioProject,
+    'testimonials': Testimonial,
+    'faqs': FAQ,
+    'contact_info': ContactInfo,
+    'contact_form_fields': ContactFormField,
+    'social_links': SocialLink,
+}
+
+# Fields identifying the same item across exports, used by sync mode
+NATURAL_KEYS = {
+    'navigation': ('url',),
+    'stats': ('label',),
+    'services': ('title',),
+    'portfolio_projects': ('title',),
+    'testimonials': ('name', 'company'),
+    'faqs': ('question',),
+    'contact_info': ('type', 'label'),
+    'contact_form_fields': ('name',),
+    'social_links': ('platform',),
+}
+
+# Order of the sections in export_all_data output
+SECTION_ORDER = (
+    'seo', 'navigation', 'hero', 'about', 'stats', 'services_section', 'services',
+    'portfolio', 'portfolio_projects', 'testimonials', 'faq_section', 'faqs',
+    'contact', 'contact_info', 'contact_form_fields', 'social_links', 'footer',
+    'media_assets',
+)
+
+
+class ImportFormatError(ValueError):
+    """Raised for an NDJSON line that is not a valid export record."""
+
+
+def batched(items, batch_size):
+    """Yield successive lists of at most batch_size items."""
+    for start in range(0, len(items), batch_size):
+        yield items[start:start + batch_size]
+
+
+def section_result(section, created=0, updated=0, deleted=0, unchanged=0):
+    """Diff counts for one imported section; import_homepage_data adds its seconds."""
+    return {
+        'section': section, 'created': created, 'updated': updated,
+        'deleted': deleted, 'unchanged': unchanged, 'seconds': 0.0,
+    }
+
+
+def has_changes(result):
+    return bool(result['created'] or result['updated'] or result['deleted'])
+
+
+def changed_fields(model, row, item):
+    """Names of the fields in item whose values differ from row, a values() dict."""
+    changed = []
+    for name, value in item.items():
+        field = model._meta.get_field(name)
+        if field.to_python(value) != row[field.attname]:
+            changed.append(name)
+    return changed
+
+
+def natural_key(model, key_fields, item):
+    """Natural key of an incoming item, with the field defaults for missing values."""
+    fields = [model._meta.get_field(name) for name in key_fields]
+    return tuple(field.to_python(item[field.name]) if field.name in item else field.get_default() for field in fields)
+
+
+def import_singleton(section, model, data, sync=False):
+    """Write a singleton section with one update_or_create; sync skips unchanged rows."""
+    if sync:
+        row = model.objects.filter(pk=1).values().first()
+        if row is not None and not changed_fields(model, row, data):
+            return section_result(section, unchanged=1)
+    instance, created = model.objects.update_or_create(pk=1, defaults=data)
+    return section_result(section, created=int(created), updated=int(not created))
+
+
+def import_list(section, model, data, batch_size=IMPORT_BATCH_SIZE):
+    """Replace every row of a list section."""
+    deleted, _ = model.objects.all().delete()
+    model.objects.bulk_create((model(**item) for item in data), batch_size=batch_size)
+    return section_result(section, created=len(data), deleted=deleted)
+
+
+def sync_list(section, model, data, batch_size=IMPORT_BATCH_SIZE):
+    """
+    Bring a list section in line with data, writing only what differs.
+
+    Incoming items are matched to existing rows by NATURAL_KEYS (in primary key
+    order when a key repeats). Matched rows that differ are updated with one
+    bulk_update, unmatched items are inserted with bulk_create and rows no
+    longer present are deleted by primary key.
+    """
+    key_fields = NATURAL_KEYS[section]
+    # Plain dicts are enough for comparing, and far cheaper to load than model instances
+    existing = defaultdict(deque)
+    for row in model.objects.order_by('pk').values():
+        existing[tuple(row[field] for field in key_fields)].append(row)
+
+    to_create = []
+    to_update = []
+    update_fields = set()
+    unchanged = 0
+    for item in data:
+        matches = existing.get(natural_key(model, key_fields, item))
+        if not matches:
+            to_create.append(model(**item))
+            continue
+        row = matches.popleft()
+        fields = changed_fields(model, row, item)
+        if not fields:
+            unchanged += 1
+            continue
+        update_fields.update(fields)
+        to_update.append(model(**{**row, **item}))
+
+    stale_ids = [row['id'] for matches in existing.values() for row in matches]
+    if stale_ids:
+        model.objects.filter(pk__in=stale_ids).delete()
+    if to_update:
+        model.objects.bulk_update(to_update, sorted(update_fields), batch_size=batch_size)
+    if to_create:
+        model.objects.bulk_create(to_create, batch_size=batch_size)
+    return section_result(
+        section, created=len(to_create), updated=len(to_update), deleted=len(stale_ids), unchanged=unchanged
+    )
+
+
+def existing_public_ids(public_ids):
+    """The subset of public_ids already in the library, looked up in IN_LOOKUP_CHUNK_SIZE chunks."""
+    public_ids = list(public_ids)
+    existing = set()
+    for chunk in batched(public_ids, IN_LOOKUP_CHUNK_SIZE):
+        existing.update(
+            MediaAsset.objects.filter(cloudinary_public_id__in=chunk).values_list('cloudinary_public_id', flat=True)
+        )
+    return existing
+
+
+def import_media_assets(data, batch_size=IMPORT_BATCH_SIZE):
+    """
+    Add media assets whose public ID is not in the library yet.
+
+    Existing assets are kept. The public IDs already stored are loaded up front
+    and the rest are filtered in memory, so a payload of any size costs one
+    query per IN_LOOKUP_CHUNK_SIZE IDs plus the batched inserts. If another
+    writer inserts one of the public IDs in the meantime, the unique constraint
+    rejects the insert; the IDs are looked up again and the insert retried
+    without them, so they are reported as unchanged rather than created.
+    Assets without a public ID are always added.
+    """
+    existing = existing_public_ids({item['cloudinary_public_id'] for item in data if item.get('cloudinary_public_id')})
+    new_assets = []
+    for item in data:
+        public_id = item.get('cloudinary_public_id')
+        if public_id:
+            if public_id in existing:
+                continue
+            existing.add(public_id)
+        new_assets.append(MediaAsset(**{**get_asset_url_fields(item['cloudinary_url']), **item}))
+
+    while True:
+        try:
+            with transaction.atomic():
+                MediaAsset.objects.bulk_create(new_assets, batch_size=batch_size)
+            break
+        except IntegrityError:
+            taken = existing_public_ids(asset.cloudinary_public_id for asset in new_assets if asset.cloudinary_public_id)
+            if not taken:
+                raise
+            for asset in new_assets:
+                asset.pk = None  # Set by any insert batch that went through before the rollback
+            new_assets = [asset for asset in new_assets if asset.cloudinary_public_id not in taken]
+    return section_result('media_assets', created=len(new_assets), unchanged=len(data) - len(new_assets))
+
+
+def finish_import(results, sync):
+    """
+    Rebuild the snapshot after the sections in results were written.
+
+    Must run inside the import's transaction; appends the snapshot result.
+    """
+    # Media assets are not homepage content; an import that changed no content keeps caches warm
+    content_changed = any(has_changes(result) for result in results if result['section'] != 'media_assets')
+    start = time.perf_counter()
+    if content_changed or not sync:
+        rebuild_homepage_snapshot()
+        # The signals that would have bumped the version were disconnected
+        transaction.on_commit(purge_page_cache)
+        snapshot = section_result('snapshot', updated=1)
+    else:
+        snapshot = section_result('snapshot', unchanged=1)
+    snapshot['seconds'] = time.perf_counter() - start
+    results.append(snapshot)
+    return results
+
+
+def import_homepage_data(data, batch_size=IMPORT_BATCH_SIZE, sync=False):
+    """
+    Import every section present in data in one transaction.
+
+    Args:
+        data: Dictionary in the export_all_data format
+        batch_size: Rows per bulk_create/bulk_update
+        sync: Match list rows by natural key and write only the differences,
+            instead of replacing every row
+
+    Returns:
+        List of per-section dicts with section, created, updated, deleted,
+        unchanged and seconds, ending with the snapshot rebuild
+    """
+    results = []
+    with transaction.atomic(), content_signals_disconnected():
+        for section in SECTION_ORDER:
+            if section not in data:
+                continue
+            start = time.perf_counter()
+            if section in SINGLETON_SECTIONS:
+                result = import_singleton(section, SINGLETON_SECTIONS[section], data[section], sync)
+            elif section in LIST_SECTIONS and sync:
+                result = sync_list(section, LIST_SECTIONS[section], data[section], batch_size)
+            elif section in LIST_SECTIONS:
+                result = import_list(section, LIST_SECTIONS[section], data[section], batch_size)
+            else:
+                result = import_media_assets(data[section], batch_size)
+            result['seconds'] = time.perf_counter() - start
+            results.append(result)
+        return finish_import(results, sync)
+
+
+def iter_ndjson_records(lines):
+    """
+    Yield (section, data) for each record of an NDJSON export.
+
+    A {"section"} record without data is a list section header, yielded with
+    data None; it marks the section as present even when no rows follow.
+
+    Args:
+        lines: Iterable of text lines, e.g. an open file
+
+    Raises:
+        ImportFormatError: For a line that is not a {"section", "data"}
+            record or list section header of a known section
+    """
+    for line_number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+            section, data = record['section'], record.get('data')
+        except (ValueError, TypeError, KeyError, AttributeError) as e:
+            raise ImportFormatError(f'line {line_number}: not a {{"section", "data"}} record ({e})') from None
+        if section not in SECTION_ORDER:
+            raise ImportFormatError(f'line {line_number}: unknown section {section!r}')
+        if data is None and section in SINGLETON_SECTIONS:
+            raise ImportFormatError(f'line {line_number}: {section!r} record has no data')
+        yield section, data
+
+
+class StreamingImport:
+    """
+    Writes NDJSON records as they are read, in batches.
+
+    List rows are buffered per section and written every batch_size rows;
+    in replace mode a section's old rows are deleted when its header or
+    first row arrives, so a header with no rows empties the section like []
+    does in JSON. Sync mode needs a section's full row set to find
+    deletions, so homepage list sections are collected (they are small) and
+    synced at the end, while media assets are always streamed.
+    """
+
+    def __init__(self, batch_size=IMPORT_BATCH_SIZE, sync=False):
+        self.batch_size = batch_size
+        self.sync = sync
+        self.rows = 0
+        self.results = {}
+        self._pending = defaultdict(list)
+
+    def result(self, section):
+        if section not in self.results:
+            self.results[section] = section_result(section)
+        return self.results[section]
+
+    def add_counts(self, section, counts, seconds):
+        result = self.result(section)
+        for key in ('created', 'updated', 'deleted', 'unchanged'):
+            result[key] += counts[key]
+        result['seconds'] += seconds
+
+    def begin(self, section):
+        """Mark a list section as present in the file; replace mode clears its old rows."""
+        if section in self.results:
+            return
+        start = time.perf_counter()
+        deleted = 0
+        if section in LIST_SECTIONS and not self.sync:
+            deleted, _ = LIST_SECTIONS[section].objects.all().delete()
+        self.add_counts(section, section_result(section, deleted=deleted), time.perf_counter() - start)
+
+    def add(self, section, data):
+        """Import one record, flushing its section's buffer when full."""
+        self.rows += 1
+        start = time.perf_counter()
+        if section in SINGLETON_SECTIONS:
+            counts = import_singleton(section, SINGLETON_SECTIONS[section], data, self.sync)
+            self.add_counts(section, counts, time.perf_counter() - start)
+            return
+        self.begin(section)
+        pending = self._pending[section]
+        pending.append(data)
+        if len(pending) >= self.batch_size and (section == 'media_assets' or not self.sync):
+            self.flush(section)
+
+    def flush(self, section):
+        """Write the rows buffered for section."""
+        rows, self._pending[section] = self._pending[section], []
+        start = time.perf_counter()
+        if section == 'media_assets':
+            counts = import_media_assets(rows, self.batch_size)
+        elif self.sync:
+            counts = sync_list(section, LIST_SECTIONS[section], rows, self.batch_size)
+        else:
+            LIST_SECTIONS[section].objects.bulk_create((LIST_SECTIONS[section](**item) for item in rows))
+            counts = section_result(section, created=len(rows))
+        self.add_counts(section, counts, time.perf_counter() - start)
+
+    def finish(self):
+        """Write every remaining buffer; returns the results in SECTION_ORDER."""
+        for section in list(self.results):
+            # A synced list section present without rows still has its old rows deleted
+            if self._pending[section] or (self.sync and section in LIST_SECTIONS):
+                self.flush(section)
+        return [self.results[section] for section in SECTION_ORDER if section in self.results]
+
+
+def import_homepage_ndjson(lines, batch_size=IMPORT_BATCH_SIZE, sync=False, progress=None,
+                           progress_every=PROGRESS_INTERVAL):
+    """
+    Import an NDJSON export in one transaction without loading it whole.
+
+    Args:
+        lines: Iterable of {"section", "data"} JSON lines, e.g. an open file
+        batch_size: Rows per bulk_create/bulk_update
+        sync: Match list rows by natural key and write only the differences
+        progress: Optional callable(rows, seconds) called every
+            progress_every records and once at the end
+        progress_every: Records between progress calls
+
+    Returns:
+        List of per-section dicts as returned by import_homepage_data; list
+        sections with neither a header nor rows in the file are left untouched
+    """
+    importer = StreamingImport(batch_size, sync)
+    start = time.perf_counter()
+    with transaction.atomic(), content_signals_disconnected():
+        for section, data in iter_ndjson_records(lines):
+            if data is None:
+                importer.begin(section)
+                continue
+            importer.add(section, data)
+            if progress and importer.rows % progress_every == 0:
+                progress(importer.rows, time.perf_counter() - start)
+        results = importer.finish()
+        if progress:
+            progress(importer.rows, time.perf_counter() - start)
+        return finish_import(results, sync)
@@ -17,6 +17,9 @@ urlpatterns = [
     
     # Image Upload and Gallery
     path('upload-image/', dashboard_views.upload_image, name='upload_image'),
+    path('upload-images/', dashboard_views.upload_images, name='upload_images'),
+    path('upload-jobs/', dashboard_views.upload_jobs_status, name='upload_jobs_status'),
+    path('upload-jobs/<int:job_id>/', dashboard_views.upload_job_status, name='upload_job_status'),
     path('gallery/', dashboard_views.gallery, name='gallery'),
     
     # SEO
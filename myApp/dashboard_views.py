@@ -2,7 +2,10 @@
 Dashboard views for content management.
 """
 
+import base64
 import json
+from datetime import datetime
+from functools import wraps
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import login_required
@@ -10,12 +13,34 @@ from django.http import JsonResponse, HttpResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.urls import reverse
 from .models import (
-    MediaAsset, SEO, Navigation, Hero, About, Stat, Service, ServicesSection,
+    ImageUploadJob, MediaAsset, SEO, Navigation, Hero, About, Stat, Service, ServicesSection,
     Portfolio, PortfolioProject, Testimonial, FAQ, FAQSection,
     Contact, ContactInfo, ContactFormField, SocialLink, Footer
 )
-from .utils.cloudinary_utils import upload_to_cloudinary
+from .image_jobs import enqueue_upload, enqueue_uploads
+from .media_search import search_media_assets
+from .content_helpers import rebuild_homepage_snapshot
+from .utils.cloudinary_urls import ORIGINAL, build_urls
+
+
+def rebuilds_homepage_snapshot(view_func):
+    """
+    Run a content view's POST requests in one transaction that also rebuilds
+    the homepage snapshot, so public pages never see a half-applied edit.
+    """
+    @wraps(view_func)
+    def _wrapped_view(request, *args, **kwargs):
+        if request.method != 'POST':
+            return view_func(request, *args, **kwargs)
+        with transaction.atomic():
+            response = view_func(request, *args, **kwargs)
+            rebuild_homepage_snapshot()
+        return response
+    return _wrapped_view
 
 
 # Authentication Views
@@ -56,86 +81,218 @@ def dashboard_home(request):
 @login_required
 @require_http_methods(["POST"])
 def upload_image(request):
-    """Upload image to Cloudinary."""
+    """Queue an image for upload to Cloudinary by the run_image_worker command."""
     try:
         if 'image' not in request.FILES:
             return JsonResponse({'error': 'No image file provided'}, status=400)
         
         image_file = request.FILES['image']
-        folder = request.POST.get('folder', 'uploads')
-        
-        # Upload to Cloudinary
-        result = upload_to_cloudinary(
+        job = enqueue_upload(
             image_file,
-            folder=folder,
-            compress=True,
-            convert_to_webp=True
+            folder=request.POST.get('folder', 'uploads'),
+            original_path=request.POST.get('original_path', '')
         )
         
-        # Save to database
-        media_asset = MediaAsset.objects.create(
-            original_path=request.POST.get('original_path', ''),
-            file_name=image_file.name,
-            cloudinary_url=result.get('secure_url', result.get('url', '')),
-            cloudinary_public_id=result.get('public_id', ''),
-            format=result.get('format', ''),
-            width=result.get('width'),
-            height=result.get('height'),
-            file_size=result.get('bytes'),
-            was_converted=True
+        return JsonResponse(dict(upload_job_data(job), success=True), status=202)
+        
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=500)
+
+
+@login_required
+@require_http_methods(["POST"])
+def upload_images(request):
+    """Queue several images from one multipart request; returns one result per file."""
+    try:
+        image_files = request.FILES.getlist('image')
+        if not image_files:
+            return JsonResponse({'error': 'No image files provided'}, status=400)
+        
+        jobs = enqueue_uploads(
+            image_files,
+            folder=request.POST.get('folder', 'uploads'),
+            original_path=request.POST.get('original_path', '')
         )
         
         return JsonResponse({
             'success': True,
-            'url': result.get('secure_url', result.get('url', '')),
-            'web_url': result.get('web_url', ''),
-            'thumb_url': result.get('thumb_url', ''),
-            'public_id': result.get('public_id', ''),
-            'width': result.get('width'),
-            'height': result.get('height'),
-            'format': result.get('format', ''),
-            'id': media_asset.id,
-        })
+            'status_url': reverse('dashboard:upload_jobs_status') + '?ids=' + ','.join(str(job.id) for job in jobs),
+            'results': [upload_job_data(job) for job in jobs],
+        }, status=202)
         
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
 
 
+def upload_job_data(job):
+    """JSON description of an upload job; done jobs include the upload result."""
+    data = {
+        'job_id': job.id,
+        'status': job.status,
+        'file_name': job.file_name,
+        'status_url': reverse('dashboard:upload_job_status', args=[job.id]),
+    }
+    if job.status == ImageUploadJob.DONE:
+        data.update(job.result, success=True)
+    elif job.status == ImageUploadJob.FAILED:
+        data['error'] = job.error
+    return data
+
+
+@login_required
+def upload_job_status(request, job_id):
+    """Report the state of a queued upload."""
+    job = get_object_or_404(ImageUploadJob, id=job_id)
+    return JsonResponse(upload_job_data(job))
+
+
+@login_required
+def upload_jobs_status(request):
+    """Report the state of several queued uploads (?ids=1,2,3) in one request."""
+    try:
+        job_ids = [int(job_id) for job_id in request.GET.get('ids', '').split(',') if job_id]
+    except ValueError:
+        return JsonResponse({'error': 'Invalid job ids'}, status=400)
+    
+    jobs = ImageUploadJob.objects.in_bulk(job_ids)
+    return JsonResponse({
+        'results': [upload_job_data(jobs[job_id]) for job_id in job_ids if job_id in jobs],
+    })
+
+
+GALLERY_PAGE_SIZE = 60  # Images per gallery page
+GALLERY_MAX_PAGE_SIZE = 200  # Upper bound for the limit parameter
+GALLERY_FIELDS = (
+    'id', 'file_name', 'cloudinary_url', 'cloudinary_public_id', 'web_url', 'thumb_url', 'url_variants',
+    'width', 'height', 'format', 'uploaded_at',
+)
+
+
+def encode_gallery_cursor(value):
+    """Opaque cursor for a gallery position string."""
+    return base64.urlsafe_b64encode(value.encode()).decode()
+
+
+def decode_gallery_cursor(cursor):
+    """
+    Decode a gallery cursor.
+    
+    Returns:
+        (uploaded_at, id) for browsing, an int offset for ranked search
+        results, or None if the cursor is malformed
+    """
+    try:
+        value = base64.urlsafe_b64decode(cursor.encode()).decode()
+        if value.startswith('offset:'):
+            return int(value[len('offset:'):])
+        uploaded_at, image_id = value.split('|')
+        return datetime.fromisoformat(uploaded_at), int(image_id)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+def get_gallery_page(search_query='', cursor=None, limit=GALLERY_PAGE_SIZE):
+    """
+    Fetch one page of the gallery.
+    
+    Browsing is newest first with keyset pagination: the page is found by
+    seeking the (uploaded_at, id) index from the cursor rather than with
+    OFFSET, so every page costs the same however deep it is. Searches are
+    ranked by relevance through the search index and paged by offset, since
+    a match set is small next to the whole library.
+    
+    Returns:
+        Tuple of (list of image dicts, next cursor or None)
+    """
+    position = decode_gallery_cursor(cursor) if cursor else None
+    
+    if search_query:
+        offset = position if isinstance(position, int) else 0
+        images = search_media_assets(MediaAsset.objects.all(), search_query)
+        page = list(images.values(*GALLERY_FIELDS)[offset:offset + limit + 1])
+        next_cursor = encode_gallery_cursor(f'offset:{offset + limit}') if len(page) > limit else None
+        return page[:limit], next_cursor
+    
+    images = MediaAsset.objects.order_by('-uploaded_at', '-id')
+    if isinstance(position, tuple):
+        uploaded_at, image_id = position
+        # The leading uploaded_at__lte gives the database a range to seek the index with
+        images = images.filter(
+            Q(uploaded_at__lte=uploaded_at) & (Q(uploaded_at__lt=uploaded_at) | Q(id__lt=image_id))
+        )
+    
+    # Fetch one extra row to learn whether another page exists
+    page = list(images.values(*GALLERY_FIELDS)[:limit + 1])
+    if len(page) > limit:
+        last = page[limit - 1]
+        next_cursor = encode_gallery_cursor(f"{last['uploaded_at'].isoformat()}|{last['id']}")
+    else:
+        next_cursor = None
+    return page[:limit], next_cursor
+
+
+def fill_url_variants(images):
+    """
+    Build variant URLs for gallery rows that have not been backfilled yet.
+    
+    Every missing row on the page is handled by one build_urls call, whose
+    results are cached per (public_id, preset) for the next request.
+    
+    Args:
+        images: Image dicts from get_gallery_page, updated in place
+    """
+    missing = [img for img in images if not img['url_variants'] and img['cloudinary_public_id']]
+    if not missing:
+        return
+    urls = build_urls([img['cloudinary_public_id'] for img in missing])
+    for img in missing:
+        variants = urls[img['cloudinary_public_id']]
+        img['url_variants'] = {name: url for name, url in variants.items() if name != ORIGINAL}
+        img['web_url'] = img['web_url'] or variants.get('web', img['cloudinary_url'])
+        img['thumb_url'] = img['thumb_url'] or variants.get('thumb', img['cloudinary_url'])
+
+
 @login_required
 def gallery(request):
-    """Image gallery view."""
-    images = MediaAsset.objects.all()
+    """Image gallery view, paginated with an opaque cursor (?cursor=, ?limit=)."""
     search_query = request.GET.get('search', '')
+    try:
+        limit = min(max(int(request.GET.get('limit', GALLERY_PAGE_SIZE)), 1), GALLERY_MAX_PAGE_SIZE)
+    except ValueError:
+        limit = GALLERY_PAGE_SIZE
     
-    if search_query:
-        images = images.filter(file_name__icontains=search_query)
+    images, next_cursor = get_gallery_page(search_query, request.GET.get('cursor'), limit)
     
-    # Support JSON format for AJAX requests
+    # Support JSON format for AJAX requests; the HTML page builds its URLs in the template
     if request.GET.get('format') == 'json':
-        from .utils.cloudinary_utils import get_cloudinary_urls
-        image_list = []
-        for img in images:
-            urls = get_cloudinary_urls(img.cloudinary_public_id or '') if img.cloudinary_public_id else {}
-            image_list.append({
-                'id': img.id,
-                'file_name': img.file_name,
-                'cloudinary_url': img.cloudinary_url,
-                'web_url': urls.get('web_optimized', img.cloudinary_url),
-                'thumb_url': urls.get('thumbnail', img.cloudinary_url),
-                'width': img.width,
-                'height': img.height,
-                'format': img.format,
-            })
-        return JsonResponse({'images': image_list})
+        fill_url_variants(images)
+        # Variant URLs are precomputed columns, or built above for rows not yet backfilled
+        image_list = [
+            {
+                'id': img['id'],
+                'file_name': img['file_name'],
+                'cloudinary_url': img['cloudinary_url'],
+                'web_url': img['web_url'] or img['cloudinary_url'],
+                'thumb_url': img['thumb_url'] or img['cloudinary_url'],
+                'variants': img['url_variants'],
+                'width': img['width'],
+                'height': img['height'],
+                'format': img['format'],
+            }
+            for img in images
+        ]
+        return JsonResponse({'images': image_list, 'next_cursor': next_cursor})
     
     return render(request, 'dashboard/gallery.html', {
         'images': images,
         'search_query': search_query,
+        'next_cursor': next_cursor,
     })
 
 
 # SEO Views
 @login_required
+@rebuilds_homepage_snapshot
 def seo_edit(request):
     """Edit SEO settings."""
     seo, created = SEO.objects.get_or_create(pk=1)
@@ -155,6 +312,7 @@ def seo_edit(request):
 
 # Navigation Views
 @login_required
+@rebuilds_homepage_snapshot
 def navigation_edit(request):
     """Edit navigation items."""
     items = Navigation.objects.all()
@@ -184,6 +342,7 @@ def navigation_edit(request):
 
 # Hero Views
 @login_required
+@rebuilds_homepage_snapshot
 def hero_edit(request):
     """Edit hero section."""
     hero, created = Hero.objects.get_or_create(pk=1)
@@ -209,6 +368,7 @@ def hero_edit(request):
 
 # About Views
 @login_required
+@rebuilds_homepage_snapshot
 def about_edit(request):
     """Edit about section."""
     about, created = About.objects.get_or_create(pk=1)
@@ -231,6 +391,7 @@ def about_edit(request):
 
 # Stats Views
 @login_required
+@rebuilds_homepage_snapshot
 def stats_list(request):
     """List all statistics."""
     stats = Stat.objects.all()
@@ -257,6 +418,7 @@ def stats_list(request):
 
 
 @login_required
+@rebuilds_homepage_snapshot
 def stat_edit(request, stat_id=None):
     """Edit a single statistic."""
     if stat_id:
@@ -279,6 +441,7 @@ def stat_edit(request, stat_id=None):
 
 # Services Views
 @login_required
+@rebuilds_homepage_snapshot
 def services_section_edit(request):
     """Edit services section header."""
     section, created = ServicesSection.objects.get_or_create(pk=1)
@@ -299,6 +462,7 @@ def services_section_edit(request):
 
 
 @login_required
+@rebuilds_homepage_snapshot
 def services_list(request):
     """List all services."""
     services = Service.objects.all()
@@ -332,6 +496,7 @@ def services_list(request):
 
 
 @login_required
+@rebuilds_homepage_snapshot
 def service_edit(request, service_id=None):
     """Edit a single service."""
     if service_id:
@@ -361,6 +526,7 @@ def service_edit(request, service_id=None):
 
 # Portfolio Views
 @login_required
+@rebuilds_homepage_snapshot
 def portfolio_edit(request):
     """Edit portfolio section header."""
     portfolio, created = Portfolio.objects.get_or_create(pk=1)
@@ -381,6 +547,7 @@ def portfolio_edit(request):
 
 
 @login_required
+@rebuilds_homepage_snapshot
 def portfolio_projects_list(request):
     """List all portfolio projects."""
     projects = PortfolioProject.objects.all()
@@ -421,6 +588,7 @@ def portfolio_projects_list(request):
 
 
 @login_required
+@rebuilds_homepage_snapshot
 def portfolio_project_edit(request, project_id=None):
     """Edit a single portfolio project."""
     if project_id:
@@ -456,6 +624,7 @@ def portfolio_project_edit(request, project_id=None):
 
 # Testimonials Views
 @login_required
+@rebuilds_homepage_snapshot
 def testimonials_list(request):
     """List all testimonials."""
     testimonials = Testimonial.objects.all()
@@ -485,6 +654,7 @@ def testimonials_list(request):
 
 
 @login_required
+@rebuilds_homepage_snapshot
 def testimonial_edit(request, testimonial_id=None):
     """Edit a single testimonial."""
     if testimonial_id:
@@ -510,6 +680,7 @@ def testimonial_edit(request, testimonial_id=None):
 
 # FAQ Views
 @login_required
+@rebuilds_homepage_snapshot
 def faq_section_edit(request):
     """Edit FAQ section header."""
     section, created = FAQSection.objects.get_or_create(pk=1)
@@ -530,6 +701,7 @@ def faq_section_edit(request):
 
 
 @login_required
+@rebuilds_homepage_snapshot
 def faqs_list(request):
     """List all FAQs."""
     faqs = FAQ.objects.all()
@@ -556,6 +728,7 @@ def faqs_list(request):
 
 
 @login_required
+@rebuilds_homepage_snapshot
 def faq_edit(request, faq_id=None):
     """Edit a single FAQ."""
     if faq_id:
@@ -578,6 +751,7 @@ def faq_edit(request, faq_id=None):
 
 # Contact Views
 @login_required
+@rebuilds_homepage_snapshot
 def contact_edit(request):
     """Edit contact section."""
     contact, created = Contact.objects.get_or_create(pk=1)
@@ -598,6 +772,7 @@ def contact_edit(request):
 
 
 @login_required
+@rebuilds_homepage_snapshot
 def contact_info_list(request):
     """List all contact info items."""
     contact_info = ContactInfo.objects.all()
@@ -625,6 +800,7 @@ def contact_info_list(request):
 
 
 @login_required
+@rebuilds_homepage_snapshot
 def contact_info_edit(request, info_id=None):
     """Edit a single contact info item."""
     if info_id:
@@ -647,6 +823,7 @@ def contact_info_edit(request, info_id=None):
 
 
 @login_required
+@rebuilds_homepage_snapshot
 def contact_form_fields_list(request):
     """List all contact form fields."""
     fields = ContactFormField.objects.all()
@@ -675,6 +852,7 @@ def contact_form_fields_list(request):
 
 
 @login_required
+@rebuilds_homepage_snapshot
 def contact_form_field_edit(request, field_id=None):
     """Edit a single contact form field."""
     if field_id:
@@ -699,6 +877,7 @@ def contact_form_field_edit(request, field_id=None):
 
 # Social Links Views
 @login_required
+@rebuilds_homepage_snapshot
 def social_links_list(request):
     """List all social links."""
     links = SocialLink.objects.all()
@@ -725,6 +904,7 @@ def social_links_list(request):
 
 
 @login_required
+@rebuilds_homepage_snapshot
 def social_link_edit(request, link_id=None):
     """Edit a single social link."""
     if link_id:
@@ -747,6 +927,7 @@ def social_link_edit(request, link_id=None):
 
 # Footer Views
 @login_required
+@rebuilds_homepage_snapshot
 def footer_edit(request):
     """Edit footer."""
     footer, created = Footer.objects.get_or_create(pk=1)
@@ -0,0 +1,280 @@
+"""
+Local stand-in for the Cloudinary upload API and delivery CDN.
+
+FakeCloudinaryServer accepts the same multipart upload requests as
+api.cloudinary.com, including the chunked requests sent by upload_large,
+stores each image under storage_dir and answers with a payload shaped like
+Cloudinary's. It also serves the stored images back from delivery URLs, so the
+whole image pipeline can be tested and benchmarked without network access.
+
+Start one with `python manage.py run_fake_cloudinary` and point the app at it
+with the CLOUDINARY_FAKE_URL setting.
+"""
+
+import email.parser
+import email.policy
+import glob
+import hashlib
+import json
+import mimetypes
+import random
+import re
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import unquote
+
+from PIL import Image
+
+UPLOAD_PATH = re.compile(r'^/v1_1/(?P<cloud>[^/]+)/image/upload/?$')
+DELIVERY_PATH = re.compile(
+    r'^/(?P<cloud>[^/]+)/image/upload/(?:(?P<transformation>[a-z]{1,2}_[^/]*)/)?(?:v\d+/)?(?P<path>.+)$'
+)
+CONTENT_RANGE = re.compile(r'bytes (\d+)-(\d+)/(\d+)')
+FORMAT_NAMES = {'jpg': 'JPEG', 'jpeg': 'JPEG', 'png': 'PNG', 'webp': 'WEBP', 'gif': 'GIF'}
+
+
+def parse_multipart(content_type, body):
+    """
+    Split a multipart/form-data body into fields.
+
+    Returns:
+        Tuple of (dict of text fields, (filename, bytes) of the file field or None)
+    """
+    message = email.parser.BytesParser(policy=email.policy.HTTP).parsebytes(
+        b'Content-Type: ' + content_type.encode() + b'\r\n\r\n' + body
+    )
+    fields = {}
+    upload = None
+    for part in message.iter_parts():
+        name = part.get_param('name', header='content-disposition')
+        data = part.get_payload(decode=True)
+        if name == 'file':
+            upload = (part.get_filename() or 'file', data)
+        else:
+            fields[name] = data.decode()
+    return fields, upload
+
+
+class FakeCloudinaryHandler(BaseHTTPRequestHandler):
+    """Serves uploads to /v1_1/<cloud>/image/upload and delivery URLs under /<cloud>/image/upload/."""
+
+    server_version = 'FakeCloudinary/1.0'
+
+    def do_POST(self):
+        match = UPLOAD_PATH.match(self.path)
+        if not match:
+            return self.send_json(404, {'error': {'message': f'Unknown API path {self.path}'}})
+
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        self.server.simulate_latency()
+        fields, upload = parse_multipart(self.headers['Content-Type'], body)
+        if upload is None:
+            return self.send_json(400, {'error': {'message': 'Missing required parameter - file'}})
+
+        status, payload = self.server.store_upload(
+            match.group('cloud'), fields, upload, self.headers.get('Content-Range'),
+            self.headers.get('X-Unique-Upload-Id'), self.delivery_base(),
+        )
+        self.send_json(status, payload)
+
+    def do_GET(self):
+        match = DELIVERY_PATH.match(unquote(self.path.split('?', 1)[0]))
+        path = None
+        if match:
+            path = self.server.find_asset(match.group('cloud'), match.group('path'))
+            if path is None and match.group('transformation'):
+                # A folder name can look like a transformation, e.g. my_folder/photo
+                path = self.server.find_asset(
+                    match.group('cloud'), f"{match.group('transformation')}/{match.group('path')}"
+                )
+        if path is None:
+            return self.send_json(404, {'error': {'message': 'Resource not found'}})
+
+        self.server.simulate_latency()
+        content = path.read_bytes()
+        self.send_response(200)
+        self.send_header('Content-Type', mimetypes.guess_type(path.name)[0] or 'application/octet-stream')
+        self.send_header('Content-Length', str(len(content)))
+        self.send_header('ETag', f'"{hashlib.md5(content).hexdigest()}"')
+        self.end_headers()
+        self.wfile.write(content)
+
+    def delivery_base(self):
+        host = self.headers.get('Host') or '%s:%s' % self.server.server_address[:2]
+        return f'http://{host}'
+
+    def send_json(self, status, payload):
+        content = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class FakeCloudinaryServer(ThreadingHTTPServer):
+    """
+    HTTP server standing in for Cloudinary.
+
+    Args:
+        address: (host, port) to listen on; port 0 picks a free port
+        storage_dir: Directory uploaded images are written to
+        latency: Seconds added to every request, to model network round trips
+        fail_rate: Fraction of uploads answered with an error, chosen at random
+        verbose: Log each request to stderr
+
+    Attributes:
+        uploads: Public IDs of completed upload requests, in arrival order
+        fail_public_ids: Public IDs whose uploads are answered with an error
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address, storage_dir, latency=0.0, fail_rate=0.0, verbose=False):
+        super().__init__(address, FakeCloudinaryHandler)
+        self.storage_dir = Path(storage_dir)
+        self.latency = latency
+        self.fail_rate = fail_rate
+        self.verbose = verbose
+        self.uploads = []
+        self.fail_public_ids = set()
+        self.lock = threading.Lock()
+        self._chunked = {}  # X-Unique-Upload-Id -> public ID of an upload in progress
+
+    @property
+    def url(self):
+        """Base URL to use as the Cloudinary upload_prefix."""
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self):
+        """Serve requests on a daemon thread."""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def reset(self):
+        """Forget recorded uploads and injected failures."""
+        with self.lock:
+            self.uploads.clear()
+            self.fail_public_ids.clear()
+            self._chunked.clear()
+
+    def simulate_latency(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+    def asset_dir(self, cloud_name):
+        return self.storage_dir / cloud_name
+
+    def find_asset(self, cloud_name, path):
+        """Stored file for a delivery path, with or without its extension."""
+        root = self.asset_dir(cloud_name)
+        candidate = (root / path).resolve()
+        if not candidate.is_relative_to(root.resolve()):
+            return None
+        if candidate.is_file():
+            return candidate
+        matches = sorted(candidate.parent.glob(f'{glob.escape(candidate.name)}.*')) if candidate.parent.is_dir() else []
+        return matches[0] if matches else None
+
+    def resolve_public_id(self, fields, upload_id):
+        with self.lock:
+            if upload_id in self._chunked:
+                return self._chunked[upload_id]
+        public_id = fields.get('public_id') or uuid.uuid4().hex[:20]
+        folder = fields.get('folder', '').strip('/')
+        if folder and not public_id.startswith(f'{folder}/'):
+            public_id = f'{folder}/{public_id}'
+        if upload_id:
+            with self.lock:
+                self._chunked[upload_id] = public_id
+        return public_id
+
+    def store_upload(self, cloud_name, fields, upload, content_range, upload_id, delivery_base):
+        """
+        Write an uploaded file or chunk and build the API response.
+
+        Returns:
+            Tuple of (HTTP status, response payload)
+        """
+        public_id = self.resolve_public_id(fields, upload_id)
+        filename, data = upload
+        partial = self.storage_dir / '.partial' / f'{upload_id or uuid.uuid4().hex}'
+        partial.parent.mkdir(parents=True, exist_ok=True)
+
+        range_match = CONTENT_RANGE.match(content_range or '')
+        with open(partial, 'r+b' if range_match and partial.exists() else 'wb') as f:
+            f.seek(int(range_match.group(1)) if range_match else 0)
+            f.write(data)
+        if range_match and int(range_match.group(2)) + 1 < int(range_match.group(3)):
+            return 200, {'public_id': public_id, 'done': False}
+
+        with self.lock:
+            self._chunked.pop(upload_id, None)
+            self.uploads.append(public_id)
+            failed = public_id in self.fail_public_ids or random.random() < self.fail_rate
+        if failed:
+            partial.unlink()
+            return 500, {'error': {'message': 'Simulated failure'}}
+
+        try:
+            with Image.open(partial) as img:
+                width, height = img.size
+                source_format = (img.format or '').lower()
+                requested = fields.get('format', '').lower()
+                image_format = requested or {'jpeg': 'jpg'}.get(source_format, source_format)
+                destination = self.asset_dir(cloud_name) / f'{public_id}.{image_format}'
+                destination.parent.mkdir(parents=True, exist_ok=True)
+                if requested and FORMAT_NAMES.get(requested) != img.format:
+                    # Cloudinary converts on upload when a format is requested
+                    target = FORMAT_NAMES.get(requested, requested.upper())
+                    converted = img.convert('RGB') if target == 'JPEG' and img.mode not in ('RGB', 'L') else img
+                    converted.save(destination, format=target)
+                else:
+                    partial.replace(destination)
+        except (OSError, KeyError, ValueError) as e:
+            return 400, {'error': {'message': f'Invalid image file: {e}'}}
+        finally:
+            partial.unlink(missing_ok=True)
+
+        for stale in destination.parent.glob(f'{glob.escape(destination.stem)}.*'):
+            if stale != destination:
+                stale.unlink()
+
+        content = destination.read_bytes()
+        version = int(time.time())
+        url = f'{delivery_base}/{cloud_name}/image/upload/v{version}/{public_id}.{image_format}'
+        return 200, {
+            'asset_id': uuid.uuid4().hex,
+            'public_id': public_id,
+            'version': version,
+            'version_id': uuid.uuid4().hex,
+            'signature': hashlib.sha1(content).hexdigest(),
+            'width': width,
+            'height': height,
+            'format': image_format,
+            'resource_type': 'image',
+            'created_at': datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'tags': [],
+            'bytes': len(content),
+            'type': 'upload',
+            'etag': hashlib.md5(content).hexdigest(),
+            'placeholder': False,
+            'url': url,
+            'secure_url': url,
+            'folder': public_id.rpartition('/')[0],
+            'original_filename': Path(filename).stem,
+            'api_key': fields.get('api_key', ''),
+        }
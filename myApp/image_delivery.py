@@ -0,0 +1,308 @@
+"""
+Self-hosted image delivery with Cloudinary-style URL transformations.
+
+Delivery paths have the same shape as Cloudinary's, e.g.
+c_thumb,w_300,h_300,q_80/v1/uploads/photo.jpg, and the transformations the
+site uses (crop modes, width, height, quality, format) are applied locally with
+Pillow to originals under IMAGE_DELIVERY_ROOT. Each derivative is written once
+to IMAGE_TRANSFORM_CACHE_DIR under a key derived from the source content and
+the transformation, so later requests are served straight from disk and
+identical sources share derivatives.
+
+The endpoint is public, so like Cloudinary's strict transformations it only
+renders the named presets in CLOUDINARY_URL_VARIANTS (and untransformed
+originals); any other transformation is refused rather than rendered and
+cached, so URLs cannot be enumerated to fill the disk or the CPU.
+"""
+
+import glob
+import hashlib
+import os
+import re
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+from PIL import Image, ImageOps
+from django.conf import settings
+from .utils.cloudinary_urls import get_presets
+from .utils.responsive_images import PIL_FORMATS, supported_formats
+
+# Transformation parameters applied locally, and other Cloudinary ones that are rejected
+SUPPORTED_PARAMS = {'c', 'w', 'h', 'q', 'f', 'g'}
+CLOUDINARY_PARAMS = SUPPORTED_PARAMS | {
+    'a', 'ar', 'b', 'bo', 'co', 'dl', 'dn', 'dpr', 'e', 'fl', 'fn', 'if', 'l', 'o', 'pg', 'r', 't', 'u', 'x', 'y', 'z',
+}
+CROP_MODES = {'scale', 'fit', 'limit', 'fill', 'thumb'}
+AUTO_QUALITY = {'auto': 80, 'auto:best': 90, 'auto:good': 80, 'auto:eco': 70, 'auto:low': 60}
+MAX_TRANSFORM_DIMENSION = 4096  # Largest width or height a URL may request
+# Crop anchors for g_; other gravities (auto, faces) crop around the centre
+GRAVITY_CENTERING = {
+    'north': (0.5, 0.0), 'south': (0.5, 1.0), 'east': (1.0, 0.5), 'west': (0.0, 0.5),
+    'north_west': (0.0, 0.0), 'north_east': (1.0, 0.0), 'south_west': (0.0, 1.0), 'south_east': (1.0, 1.0),
+}
+VERSION_SEGMENT = re.compile(r'^v\d+$')
+
+# Output formats by URL/transformation name, with their Pillow name and content type
+OUTPUT_FORMATS = {
+    'jpg': ('JPEG', 'image/jpeg'),
+    'png': ('PNG', 'image/png'),
+    'webp': ('WEBP', 'image/webp'),
+    'avif': ('AVIF', 'image/avif'),
+}
+FORMAT_ALIASES = {'jpeg': 'jpg', 'jpe': 'jpg'}
+CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+
+class TransformationError(ValueError):
+    """A delivery URL requested a transformation that cannot be applied."""
+
+
+def parse_transformation(segment):
+    """
+    Parse a comma-separated Cloudinary transformation such as c_fill,w_640,h_480.
+
+    Args:
+        segment: Transformation path segment
+
+    Returns:
+        Dictionary of parameter name to value, or None if segment is not a
+        transformation (e.g. a folder name)
+
+    Raises:
+        TransformationError: If it uses parameters or values this endpoint does not support
+    """
+    params = {}
+    for component in segment.split(','):
+        key, _, value = component.partition('_')
+        if key not in CLOUDINARY_PARAMS or not value:
+            return None
+        params[key] = value
+
+    unsupported = sorted(set(params) - SUPPORTED_PARAMS)
+    if unsupported:
+        raise TransformationError(f"Unsupported transformation parameter(s): {', '.join(unsupported)}")
+    if params.get('c', 'scale') not in CROP_MODES:
+        raise TransformationError(f"Unsupported crop mode: {params['c']}")
+    for key in ('w', 'h'):
+        if key in params:
+            if not params[key].isdigit() or not 0 < int(params[key]) <= MAX_TRANSFORM_DIMENSION:
+                raise TransformationError(f'{key}_ must be a whole number of pixels up to {MAX_TRANSFORM_DIMENSION}')
+            params[key] = int(params[key])
+    if 'q' in params:
+        quality = params['q']
+        if quality not in AUTO_QUALITY and not (quality.isdigit() and 1 <= int(quality) <= 100):
+            raise TransformationError(f'Unsupported quality: {quality}')
+    if 'f' in params:
+        params['f'] = FORMAT_ALIASES.get(params['f'], params['f'])
+        if params['f'] != 'auto' and params['f'] not in OUTPUT_FORMATS:
+            raise TransformationError(f"Unsupported format: {params['f']}")
+    return params
+
+
+def named_transformations():
+    """
+    The parsed transformations of the CLOUDINARY_URL_VARIANTS presets.
+
+    Presets using parameters this endpoint cannot apply are left out.
+    """
+    transformations = []
+    for transformation in get_presets().values():
+        try:
+            params = parse_transformation(transformation) if transformation else None
+        except TransformationError:
+            continue
+        if params:
+            transformations.append(params)
+    return transformations
+
+
+def split_delivery_path(path):
+    """
+    Split a delivery path into its transformation and public ID.
+
+    Returns:
+        Tuple of (transformation params, public ID with optional extension)
+    """
+    segments = path.strip('/').split('/')
+    params = {}
+    if len(segments) > 1:
+        parsed = parse_transformation(segments[0])
+        if parsed is not None:
+            params = parsed
+            segments = segments[1:]
+    if len(segments) > 1 and VERSION_SEGMENT.match(segments[0]):
+        segments = segments[1:]
+    return params, '/'.join(segments)
+
+
+def canonical_transformation(params):
+    """Transformation string with parameters in a fixed order, for cache keys."""
+    return ','.join(f'{key}_{params[key]}' for key in sorted(params))
+
+
+def find_source(public_id):
+    """
+    Locate the original for a public ID under IMAGE_DELIVERY_ROOT.
+
+    The public ID may carry an extension; originals may be stored with any extension.
+
+    Returns:
+        Path of the original, or None if there is none
+    """
+    root = Path(settings.IMAGE_DELIVERY_ROOT).resolve()
+    candidate = (root / public_id).resolve()
+    if not candidate.is_relative_to(root) or candidate == root:
+        return None
+    if candidate.is_file():
+        return candidate
+    stem = candidate.with_suffix('') if candidate.suffix else candidate
+    matches = sorted(stem.parent.glob(f'{glob.escape(stem.name)}.*')) if stem.parent.is_dir() else []
+    return matches[0] if matches else None
+
+
+@lru_cache(maxsize=4096)
+def _source_digest(path, mtime_ns, size):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def source_digest(path):
+    """Content hash of an original, recomputed only when its size or mtime changes."""
+    stat = os.stat(path)
+    return _source_digest(str(path), stat.st_mtime_ns, stat.st_size)
+
+
+def choose_format(params, public_id, source_path, accept=''):
+    """
+    Pick the output format: f_ if given, f_auto by the Accept header, else the URL extension.
+
+    Returns:
+        Key of OUTPUT_FORMATS
+    """
+    requested = params.get('f')
+    if requested == 'auto':
+        available = supported_formats(('avif', 'webp'))
+        for fmt in available:
+            if f'image/{fmt}' in accept:
+                return fmt
+        requested = None
+    if requested:
+        return requested
+
+    extension = Path(public_id).suffix.lower().lstrip('.')
+    extension = FORMAT_ALIASES.get(extension, extension)
+    if extension in OUTPUT_FORMATS:
+        return extension
+    source_extension = source_path.suffix.lower().lstrip('.')
+    return 'png' if FORMAT_ALIASES.get(source_extension, source_extension) == 'png' else 'jpg'
+
+
+def transform_image(img, params):
+    """
+    Apply crop, width and height parameters the way Cloudinary does.
+
+    Args:
+        img: Decoded PIL image
+        params: Parsed transformation
+
+    Returns:
+        Transformed PIL image
+    """
+    width, height = params.get('w'), params.get('h')
+    if not width and not height:
+        return img
+
+    crop = params.get('c', 'scale')
+    source_width, source_height = img.size
+    if crop in ('fill', 'thumb') and width and height:
+        centering = GRAVITY_CENTERING.get(params.get('g'), (0.5, 0.5))
+        return ImageOps.fit(img, (width, height), Image.LANCZOS, centering=centering)
+
+    # Keep the aspect ratio within the requested box; scale alone may stretch when both are given
+    if crop == 'scale' and width and height:
+        return img.resize((width, height), Image.LANCZOS)
+    ratio = min(
+        width / source_width if width else float('inf'),
+        height / source_height if height else float('inf'),
+    )
+    if crop in ('limit', 'thumb') and ratio >= 1:
+        return img
+    size = (max(1, round(source_width * ratio)), max(1, round(source_height * ratio)))
+    return img.resize(size, Image.LANCZOS)
+
+
+def render_derivative(source_path, params, fmt, output_path):
+    """Decode an original, transform it and encode it to output_path atomically."""
+    pil_format = OUTPUT_FORMATS[fmt][0]
+    quality = params.get('q', 'auto')
+    quality = AUTO_QUALITY[quality] if quality in AUTO_QUALITY else int(quality)
+
+    with Image.open(source_path) as opened:
+        side = max(params.get('w', 0), params.get('h', 0))
+        if side:
+            # JPEG draft mode decodes at a reduced scale that still covers the target on both sides
+            opened.draft('RGB', (side, side))
+        img = ImageOps.exif_transpose(opened)
+        has_alpha = img.mode in ('RGBA', 'LA', 'PA') or 'transparency' in img.info
+        img = img.convert('RGBA' if has_alpha and pil_format != 'JPEG' else 'RGB')
+        img = transform_image(img, params)
+
+    save_options = {'optimize': True} if pil_format in ('JPEG', 'PNG') else {}
+    if pil_format != 'PNG':
+        save_options['quality'] = quality
+    if pil_format == 'JPEG':
+        save_options['progressive'] = True
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=output_path.parent, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            img.save(f, format=pil_format, **save_options)
+        os.replace(temp_path, output_path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+def get_derivative(path, accept=''):
+    """
+    Resolve a delivery path to a cached derivative, rendering it on first request.
+
+    Args:
+        path: Delivery path after the /upload/ prefix
+        accept: Request Accept header, used by f_auto
+
+    Returns:
+        Dictionary with path, content_type, etag and vary_accept, or None if
+        there is no such original
+
+    Raises:
+        TransformationError: If the transformation is not supported or not a named preset
+    """
+    params, public_id = split_delivery_path(path)
+    if params and params not in named_transformations():
+        raise TransformationError('Only the named transformations in CLOUDINARY_URL_VARIANTS are served')
+    source_path = find_source(public_id)
+    if source_path is None:
+        return None
+
+    fmt = choose_format(params, public_id, source_path, accept)
+    if fmt in PIL_FORMATS and not supported_formats((fmt,)):
+        raise TransformationError(f'This server cannot encode {fmt}')
+
+    # Content-addressed: the same original and transformation always map to the same file
+    transform_key = canonical_transformation({key: value for key, value in params.items() if key != 'f'})
+    key = hashlib.sha256(f'{source_digest(source_path)}:{transform_key}:{fmt}'.encode()).hexdigest()
+    output_path = Path(settings.IMAGE_TRANSFORM_CACHE_DIR) / key[:2] / f'{key}.{fmt}'
+    if not output_path.exists():
+        render_derivative(source_path, params, fmt, output_path)
+
+    return {
+        'path': output_path,
+        'content_type': OUTPUT_FORMATS[fmt][1],
+        'etag': f'"{key}"',
+        'vary_accept': params.get('f') == 'auto',
+    }
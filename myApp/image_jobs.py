@@ -0,0 +1,339 @@
+"""
+Database-backed job queue for dashboard image uploads.
+
+The upload view only spools the file to IMAGE_UPLOAD_JOB_DIR and records an
+ImageUploadJob; the run_image_worker command decodes, compresses and uploads
+it to Cloudinary in the background. Jobs are claimed in batches with a
+conditional UPDATE, so several workers can share the table without a broker,
+and each batch is uploaded concurrently and saved with one bulk_create.
+Uploads whose public ID already has a MediaAsset update that row instead, as
+Cloudinary has replaced the image behind it.
+"""
+
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from pathlib import Path
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+from .models import ImageUploadJob, MediaAsset
+from .utils.cloudinary_utils import SPOOL_CHUNK_SIZE, upload_to_cloudinary
+
+STALE_JOB_TIMEOUT = timedelta(minutes=10)  # Processing jobs older than this are assumed orphaned by a dead worker
+MAX_JOB_ATTEMPTS = 3  # Orphaned jobs are retried this many times before failing
+JOB_BATCH_SIZE = 10  # Jobs claimed and processed together by a worker
+JOB_WORKERS = 4  # Concurrent compress/upload threads per worker
+
+
+def spool_upload(uploaded_file):
+    """
+    Copy an uploaded file into IMAGE_UPLOAD_JOB_DIR in chunks.
+
+    Args:
+        uploaded_file: Django UploadedFile
+
+    Returns:
+        Path string of the spooled file
+    """
+    job_dir = Path(settings.IMAGE_UPLOAD_JOB_DIR)
+    job_dir.mkdir(parents=True, exist_ok=True)
+    source_path = job_dir / f'{uuid.uuid4().hex}{Path(uploaded_file.name).suffix.lower()}'
+
+    with open(source_path, 'wb') as f:
+        for chunk in uploaded_file.chunks(SPOOL_CHUNK_SIZE):
+            f.write(chunk)
+    return str(source_path)
+
+
+def enqueue_uploads(uploaded_files, folder='uploads', original_path=''):
+    """
+    Spool uploaded files to disk and queue them with a single bulk_create.
+
+    Args:
+        uploaded_files: Django UploadedFiles
+        folder: Cloudinary folder path
+        original_path: Optional original path stored on each MediaAsset
+
+    Returns:
+        List of new ImageUploadJobs, in the order of uploaded_files
+    """
+    return ImageUploadJob.objects.bulk_create([
+        ImageUploadJob(
+            source_path=spool_upload(uploaded_file),
+            file_name=uploaded_file.name,
+            folder=folder,
+            original_path=original_path,
+        )
+        for uploaded_file in uploaded_files
+    ])
+
+
+def enqueue_upload(uploaded_file, folder='uploads', original_path=''):
+    """
+    Spool an uploaded file to disk and queue it for processing.
+
+    Returns:
+        The new ImageUploadJob
+    """
+    return enqueue_uploads([uploaded_file], folder, original_path)[0]
+
+
+def requeue_stale_jobs(timeout=STALE_JOB_TIMEOUT):
+    """
+    Return jobs left in processing by a worker that died back to pending.
+
+    Jobs that have used up their attempts are failed instead, and their
+    spooled files deleted.
+
+    Returns:
+        Number of jobs requeued
+    """
+    stale = ImageUploadJob.objects.filter(
+        status=ImageUploadJob.PROCESSING,
+        started_at__lt=timezone.now() - timeout,
+    )
+    given_up = list(stale.filter(attempts__gte=MAX_JOB_ATTEMPTS).only('id', 'source_path'))
+    if given_up:
+        stale.filter(id__in=[job.id for job in given_up]).update(
+            status=ImageUploadJob.FAILED,
+            error='Worker stopped while processing this upload',
+            finished_at=timezone.now(),
+        )
+        for job in given_up:
+            remove_source(job)
+    return stale.update(status=ImageUploadJob.PENDING)
+
+
+def claim_jobs(limit=JOB_BATCH_SIZE):
+    """
+    Claim up to limit of the oldest pending jobs.
+
+    The claim is an UPDATE filtered on status=pending that stamps a fresh
+    token, so when workers race for the same jobs each job is claimed by
+    exactly one of them.
+
+    Returns:
+        List of claimed ImageUploadJobs, oldest first
+    """
+    job_ids = list(
+        ImageUploadJob.objects.filter(status=ImageUploadJob.PENDING)
+        .order_by('created_at', 'id')
+        .values_list('id', flat=True)[:limit]
+    )
+    if not job_ids:
+        return []
+
+    claim_token = uuid.uuid4().hex
+    ImageUploadJob.objects.filter(id__in=job_ids, status=ImageUploadJob.PENDING).update(
+        status=ImageUploadJob.PROCESSING,
+        claim_token=claim_token,
+        started_at=timezone.now(),
+        attempts=F('attempts') + 1,
+    )
+    return list(ImageUploadJob.objects.filter(claim_token=claim_token).order_by('created_at', 'id'))
+
+
+def claim_next_job():
+    """
+    Claim the oldest pending job.
+
+    Returns:
+        The claimed ImageUploadJob, or None if the queue is empty
+    """
+    jobs = claim_jobs(1)
+    return jobs[0] if jobs else None
+
+
+def upload_job_file(job):
+    """
+    Compress and upload a job's file; runs in a worker thread and never touches the database.
+
+    Returns:
+        Cloudinary upload result, or the exception raised
+    """
+    try:
+        return upload_to_cloudinary(
+            job.source_path,
+            folder=job.folder,
+            compress=True,
+            convert_to_webp=True
+        )
+    except Exception as e:
+        return e
+
+
+def asset_fields(job, result):
+    """MediaAsset field values for a job's Cloudinary upload result."""
+    return {
+        'original_path': job.original_path,
+        'file_name': job.file_name,
+        'cloudinary_url': result.get('secure_url', result.get('url', '')),
+        'cloudinary_public_id': result.get('public_id', ''),
+        'format': result.get('format', ''),
+        'width': result.get('width'),
+        'height': result.get('height'),
+        'file_size': result.get('bytes'),
+        'was_converted': True,
+        'web_url': result.get('web_url', ''),
+        'thumb_url': result.get('thumb_url', ''),
+        'url_variants': result.get('url_variants', {}),
+    }
+
+
+def find_assets(public_ids):
+    """Existing MediaAssets by public ID."""
+    return {
+        asset.cloudinary_public_id: asset
+        for asset in MediaAsset.objects.filter(cloudinary_public_id__in=public_ids)
+    }
+
+
+def save_assets(uploaded):
+    """
+    Save the MediaAsset of each uploaded job and point the job at it.
+
+    Public IDs that already have a row update it; the rest are inserted with
+    one bulk_create. If another worker inserts one of those public IDs in the
+    meantime, the batch falls back to one insert per row, so only the jobs
+    that conflict fail.
+
+    Args:
+        uploaded: (job, Cloudinary result) pairs
+
+    Returns:
+        Dictionary mapping each job that could not be saved to its error
+    """
+    existing = find_assets({result.get('public_id') for _, result in uploaded} - {None, ''})
+    updated = {}
+    created = {}
+    for job, result in uploaded:
+        fields = asset_fields(job, result)
+        public_id = fields['cloudinary_public_id']
+        asset = existing.get(public_id) or (created.get(public_id) if public_id else None)
+        if asset is None:
+            asset = MediaAsset(**fields)
+            created[public_id or job.id] = asset
+        else:
+            # Cloudinary replaced the image behind this public ID; the row follows the latest upload
+            for field, value in fields.items():
+                setattr(asset, field, value)
+            if asset.pk:
+                updated[asset.pk] = asset
+        job.media_asset = asset
+
+    if updated:
+        MediaAsset.objects.bulk_update(updated.values(), list(fields))
+
+    errors = {}
+    try:
+        with transaction.atomic():
+            MediaAsset.objects.bulk_create(created.values())
+    except IntegrityError:
+        for asset in created.values():
+            asset.pk = None  # Set if an earlier chunk of the rolled-back insert went through
+            try:
+                with transaction.atomic():
+                    asset.save()
+            except IntegrityError as e:
+                errors.update({
+                    job: f'Public ID {asset.cloudinary_public_id} was saved by another upload at the same time: {e}'
+                    for job, _ in uploaded if job.media_asset is asset
+                })
+    return errors
+
+
+def process_jobs(jobs, workers=JOB_WORKERS):
+    """
+    Upload claimed jobs concurrently, then save the MediaAssets with one
+    bulk_create (and a bulk_update for public IDs already stored) and every
+    job with one bulk_update.
+
+    Args:
+        jobs: ImageUploadJobs in processing state
+        workers: Number of concurrent compress/upload threads
+
+    Returns:
+        Tuple of (succeeded, failed) counts
+    """
+    if not jobs:
+        return 0, 0
+
+    # Pillow and the HTTP client release the GIL, so threads compress and upload in parallel
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(jobs)))) as pool:
+        results = list(pool.map(upload_job_file, jobs))
+
+    finished_at = timezone.now()
+    uploaded = [(job, result) for job, result in zip(jobs, results) if not isinstance(result, Exception)]
+
+    with transaction.atomic():
+        errors = save_assets(uploaded) if uploaded else {}
+
+        for job, result in uploaded:
+            if job in errors:
+                continue
+            job.status = ImageUploadJob.DONE
+            job.error = ''
+            job.result = {
+                'url': result.get('secure_url', result.get('url', '')),
+                'web_url': result.get('web_url', ''),
+                'thumb_url': result.get('thumb_url', ''),
+                'public_id': result.get('public_id', ''),
+                'width': result.get('width'),
+                'height': result.get('height'),
+                'format': result.get('format', ''),
+                'id': job.media_asset.id,
+            }
+
+        for job, result in zip(jobs, results):
+            if isinstance(result, Exception) or job in errors:
+                job.media_asset = None
+                job.status = ImageUploadJob.FAILED
+                job.error = errors.get(job, str(result))
+            job.finished_at = finished_at
+
+        ImageUploadJob.objects.bulk_update(jobs, ['media_asset', 'status', 'error', 'result', 'finished_at'])
+
+    for job in jobs:
+        remove_source(job)
+    succeeded = len(uploaded) - len(errors)
+    return succeeded, len(jobs) - succeeded
+
+
+def process_job(job):
+    """
+    Upload a claimed job's file to Cloudinary and save the MediaAsset.
+
+    Returns:
+        True if the upload succeeded, False otherwise
+    """
+    succeeded, _ = process_jobs([job], workers=1)
+    return succeeded == 1
+
+
+def remove_source(job):
+    """Delete a finished job's spooled file."""
+    if os.path.exists(job.source_path):
+        os.remove(job.source_path)
+
+
+def run_pending_jobs(max_jobs=None, batch_size=JOB_BATCH_SIZE, workers=JOB_WORKERS):
+    """
+    Process pending jobs in batches until the queue is empty or max_jobs have run.
+
+    Returns:
+        Tuple of (succeeded, failed) counts
+    """
+    succeeded = 0
+    failed = 0
+    while max_jobs is None or succeeded + failed < max_jobs:
+        limit = batch_size if max_jobs is None else min(batch_size, max_jobs - succeeded - failed)
+        jobs = claim_jobs(limit)
+        if not jobs:
+            break
+        batch_succeeded, batch_failed = process_jobs(jobs, workers)
+        succeeded += batch_succeeded
+        failed += batch_failed
+    return succeeded, failed
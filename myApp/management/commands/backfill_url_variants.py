@@ -0,0 +1,51 @@
+"""
+Management command to precompute Cloudinary URL variants for existing media assets.
+"""
+
+from django.core.management.base import BaseCommand
+from myApp.models import MediaAsset
+from myApp.utils.cloudinary_utils import get_asset_url_fields
+
+URL_FIELDS = ['web_url', 'thumb_url', 'url_variants']
+
+
+class Command(BaseCommand):
+    help = 'Fill web_url, thumb_url and url_variants on media assets from CLOUDINARY_URL_VARIANTS'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Recompute every asset, e.g. after changing CLOUDINARY_URL_VARIANTS'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Assets updated per query (default: 500)'
+        )
+
+    def handle(self, *args, **options):
+        assets = MediaAsset.objects.only('id', 'cloudinary_url', *URL_FIELDS).order_by('id')
+        if not options['force']:
+            assets = assets.filter(url_variants={})
+
+        batch = []
+        updated = 0
+        for asset in assets.iterator(chunk_size=options['batch_size']):
+            fields = get_asset_url_fields(asset.cloudinary_url)
+            if all(getattr(asset, field) == value for field, value in fields.items()):
+                continue
+            for field, value in fields.items():
+                setattr(asset, field, value)
+            batch.append(asset)
+            if len(batch) >= options['batch_size']:
+                MediaAsset.objects.bulk_update(batch, URL_FIELDS)
+                updated += len(batch)
+                batch = []
+
+        if batch:
+            MediaAsset.objects.bulk_update(batch, URL_FIELDS)
+            updated += len(batch)
+
+        self.stdout.write(self.style.SUCCESS(f'Updated URL variants for {updated} media asset(s)'))
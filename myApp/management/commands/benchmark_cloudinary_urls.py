@@ -0,0 +1,59 @@
+"""
+Management command to compare the Cloudinary SDK URL builder with utils.cloudinary_urls.
+"""
+
+import time
+import cloudinary.utils
+from django.core.management.base import BaseCommand
+from myApp.models import MediaAsset
+from myApp.utils.cloudinary_urls import build_urls, clear_url_cache, get_presets
+
+
+class Command(BaseCommand):
+    help = 'Benchmark per-URL cost of cloudinary_url vs the memoized batch URL builder'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--count',
+            type=int,
+            default=2000,
+            help='Public IDs to build URLs for (default: 2000)'
+        )
+
+    def handle(self, *args, **options):
+        count = options['count']
+        public_ids = list(
+            MediaAsset.objects.exclude(cloudinary_public_id='')
+            .values_list('cloudinary_public_id', flat=True)[:count]
+        )
+        # Pad with synthetic IDs so the benchmark runs on an empty database too
+        public_ids += [f'uploads/benchmark-{i}' for i in range(count - len(public_ids))]
+        presets = get_presets()
+        total_urls = len(public_ids) * len(presets)
+
+        start = time.perf_counter()
+        for public_id in public_ids:
+            for transformation in presets.values():
+                sdk_options = {'raw_transformation': transformation} if transformation else {}
+                cloudinary.utils.cloudinary_url(public_id, **sdk_options)
+        sdk_seconds = time.perf_counter() - start
+
+        clear_url_cache()
+        start = time.perf_counter()
+        build_urls(public_ids)
+        cold_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        build_urls(public_ids)
+        warm_seconds = time.perf_counter() - start
+
+        self.stdout.write(f'{len(public_ids)} public ID(s) x {len(presets)} preset(s) = {total_urls} URLs')
+        for label, seconds in (
+            ('cloudinary_url per call', sdk_seconds),
+            ('build_urls, cold cache', cold_seconds),
+            ('build_urls, warm cache', warm_seconds),
+        ):
+            self.stdout.write(f'{label}: {seconds * 1e6 / total_urls:.2f}us per URL ({seconds * 1000:.1f}ms total)')
+
+        speedup = sdk_seconds / max(cold_seconds, 1e-9)
+        self.stdout.write(self.style.SUCCESS(f'Batch builder was {speedup:.1f}x faster than the SDK with a cold cache'))
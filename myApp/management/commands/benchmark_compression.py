@@ -0,0 +1,89 @@
+"""
+Management command to compare the quality search modes of smart_compress_to_bytes.
+"""
+
+import io
+import time
+from pathlib import Path
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from PIL import Image
+from myApp.utils.cloudinary_utils import smart_compress_to_bytes
+
+SEARCH_MODES = ('binary', 'predictive')
+
+
+class Command(BaseCommand):
+    help = 'Benchmark binary vs predictive JPEG quality search on static images'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--source-dir',
+            type=str,
+            default=str(settings.BASE_DIR / 'static' / 'images'),
+            help='Directory of images to compress (default: static/images)'
+        )
+        parser.add_argument(
+            '--target-ratio',
+            type=float,
+            default=0.5,
+            help='Target size as a fraction of the quality-85 encode, so every image needs a search (default: 0.5)'
+        )
+
+    def handle(self, *args, **options):
+        source_dir = Path(options['source_dir'])
+        if not source_dir.is_dir():
+            raise CommandError(f'Source directory not found: {source_dir}')
+
+        totals = {mode: {'full_encodes': 0, 'sample_encodes': 0, 'seconds': 0.0, 'bytes': 0} for mode in SEARCH_MODES}
+        count = 0
+
+        for path in sorted(source_dir.iterdir()):
+            try:
+                with Image.open(path) as img:
+                    img.verify()
+            except Exception:
+                continue
+
+            data = path.read_bytes()
+            # Size of the starting encode; the target is a fraction of it
+            baseline = smart_compress_to_bytes(io.BytesIO(data), target_bytes=float('inf'))
+            target_bytes = int(len(baseline.getbuffer()) * options['target_ratio'])
+
+            results = []
+            for mode in SEARCH_MODES:
+                stats = {}
+                start = time.perf_counter()
+                output = smart_compress_to_bytes(
+                    io.BytesIO(data), max_bytes=float('inf'), target_bytes=target_bytes,
+                    search=mode, stats=stats
+                )
+                elapsed = time.perf_counter() - start
+                size = len(output.getbuffer())
+
+                total = totals[mode]
+                total['full_encodes'] += stats.get('full_encodes', 0)
+                total['sample_encodes'] += stats.get('sample_encodes', 0)
+                total['seconds'] += elapsed
+                total['bytes'] += size
+                results.append(
+                    f"{mode}: {stats.get('full_encodes', 0)} full/{stats.get('sample_encodes', 0)} sample, "
+                    f"{elapsed * 1000:.0f}ms, {size // 1024}KB"
+                )
+
+            count += 1
+            self.stdout.write(f'{path.name} (target {target_bytes // 1024}KB): ' + '; '.join(results))
+
+        if not count:
+            raise CommandError(f'No readable images in {source_dir}')
+
+        self.stdout.write('')
+        for mode in SEARCH_MODES:
+            total = totals[mode]
+            self.stdout.write(
+                f"{mode}: {total['full_encodes']} full encodes, {total['sample_encodes']} sample encodes, "
+                f"{total['seconds']:.2f}s, {total['bytes'] // 1024}KB total"
+            )
+
+        speedup = totals['binary']['seconds'] / max(totals['predictive']['seconds'], 1e-9)
+        self.stdout.write(self.style.SUCCESS(f'Predictive search was {speedup:.1f}x faster over {count} image(s)'))
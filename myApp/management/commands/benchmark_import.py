@@ -0,0 +1,145 @@
+"""
+Management command to benchmark import_homepage_data on a synthetic payload.
+"""
+
+import time
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from myApp.content_import import (
+    IMPORT_BATCH_SIZE, LIST_SECTIONS, SINGLETON_SECTIONS, import_homepage_data,
+)
+from myApp.models import MediaAsset
+
+# Field values for one synthetic row of each list section
+ROW_FACTORIES = {
+    'navigation': lambda i: {'label': f'Link {i}', 'url': f'/page-{i}/', 'sort_order': i, 'is_active': True},
+    'stats': lambda i: {'number': str(i), 'label': f'Stat {i}', 'icon': 'fa-star', 'sort_order': i},
+    'services': lambda i: {
+        'title': f'Service {i}', 'description': f'Description of service {i}', 'image_url': '',
+        'icon': 'fa-spa', 'sort_order': i, 'content': {'body': f'Service {i}'},
+    },
+    'portfolio_projects': lambda i: {
+        'title': f'Project {i}', 'description': f'Project {i}', 'image_url': '', 'gallery': [],
+        'category': 'retreat', 'sort_order': i, 'content': {},
+    },
+    'testimonials': lambda i: {
+        'name': f'Client {i}', 'role': 'Student', 'company': '', 'content': f'Testimonial {i}',
+        'image_url': '', 'rating': 5, 'sort_order': i,
+    },
+    'faqs': lambda i: {'question': f'Question {i}?', 'answer': f'Answer {i}.', 'category': 'general', 'sort_order': i},
+    'contact_info': lambda i: {'type': 'email', 'label': f'Email {i}', 'value': f'{i}@example.com', 'icon': 'fa-envelope', 'sort_order': i},
+    'contact_form_fields': lambda i: {
+        'name': f'field_{i}', 'label': f'Field {i}', 'field_type': 'text', 'required': False,
+        'placeholder': '', 'sort_order': i,
+    },
+    'social_links': lambda i: {'platform': 'instagram', 'url': f'https://instagram.com/{i}', 'icon': 'fa-instagram', 'sort_order': i},
+    'media_assets': lambda i: {
+        'original_path': f'benchmark/{i}.jpg', 'file_name': f'{i}.jpg',
+        'cloudinary_url': f'https://res.cloudinary.com/benchmark/image/upload/v1/benchmark/{i}.webp',
+        'cloudinary_public_id': f'benchmark/{i}', 'format': 'webp', 'width': 1920, 'height': 1280,
+        'file_size': 250000, 'was_converted': True,
+    },
+}
+
+
+class Rollback(Exception):
+    """Raised to discard a benchmark run's writes."""
+
+
+def build_payload(rows):
+    """Synthetic export with rows spread evenly over the list sections and media assets."""
+    per_section = rows // len(ROW_FACTORIES)
+    data = {section: {'title': f'{section} title'} for section in SINGLETON_SECTIONS}
+    data['seo'] = {'title': 'Benchmark', 'description': 'Synthetic import payload'}
+    data['footer'] = {'copyright_text': 'Benchmark'}
+    for section, factory in ROW_FACTORIES.items():
+        data[section] = [factory(i) for i in range(per_section)]
+    return data
+
+
+def legacy_import(data):
+    """The previous importer: autocommitted per-row create() calls and an exists() check per asset."""
+    for section, model in SINGLETON_SECTIONS.items():
+        instance, created = model.objects.get_or_create(pk=1)
+        for key, value in data[section].items():
+            setattr(instance, key, value)
+        instance.save()
+    for section, model in LIST_SECTIONS.items():
+        model.objects.all().delete()
+        for item in data[section]:
+            model.objects.create(**item)
+    for item in data['media_assets']:
+        if not MediaAsset.objects.filter(cloudinary_public_id=item['cloudinary_public_id']).exists():
+            MediaAsset.objects.create(**item)
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the bulk homepage import against per-row inserts on a synthetic payload (changes are rolled back)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows',
+            type=int,
+            default=50000,
+            help='Rows in the synthetic payload (default: 50000)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=IMPORT_BATCH_SIZE,
+            help=f'Rows per bulk insert or update (default: {IMPORT_BATCH_SIZE})'
+        )
+        parser.add_argument(
+            '--skip-legacy',
+            action='store_true',
+            help='Only time the bulk and sync importers'
+        )
+
+    def timed_rollback(self, func):
+        """Run func in a transaction that is rolled back; returns seconds taken and func's result."""
+        result = None
+        start = time.perf_counter()
+        try:
+            with transaction.atomic():
+                result = func()
+                elapsed = time.perf_counter() - start
+                raise Rollback
+        except Rollback:
+            pass
+        return elapsed, result
+
+    def handle(self, *args, **options):
+        data = build_payload(options['rows'])
+        total_rows = sum(len(rows) for rows in data.values() if isinstance(rows, list))
+        self.stdout.write(f'Synthetic payload: {total_rows} list rows in {len(ROW_FACTORIES)} sections')
+
+        bulk_seconds, results = self.timed_rollback(
+            lambda: import_homepage_data(data, batch_size=options['batch_size'])
+        )
+        for result in results:
+            rows = result['created'] + result['updated']
+            self.stdout.write(f"  {result['section']}: {rows} row(s) in {result['seconds'] * 1000:.1f}ms")
+        self.stdout.write(f'Bulk import: {bulk_seconds:.2f}s ({total_rows / bulk_seconds:,.0f} rows/s)')
+
+        # Re-import the same payload with one FAQ edited, as after a small content change
+        edited = dict(data, faqs=[dict(data['faqs'][0], answer='Edited answer.'), *data['faqs'][1:]])
+
+        def sync_after_import():
+            import_homepage_data(data, batch_size=options['batch_size'])
+            start = time.perf_counter()
+            results = import_homepage_data(edited, batch_size=options['batch_size'], sync=True)
+            return time.perf_counter() - start, results
+
+        _, (sync_seconds, results) = self.timed_rollback(sync_after_import)
+        changes = sum(result['created'] + result['updated'] + result['deleted'] for result in results[:-1])
+        self.stdout.write(f'Sync re-import with one edit: {sync_seconds * 1000:.0f}ms, {changes} row change(s)')
+
+        if options['skip_legacy']:
+            return
+
+        # Inside one transaction the per-row path skips its per-row commits, so this understates it
+        legacy_seconds, _ = self.timed_rollback(lambda: legacy_import(data))
+        self.stdout.write(f'Per-row import: {legacy_seconds:.2f}s ({total_rows / legacy_seconds:,.0f} rows/s)')
+        self.stdout.write(self.style.SUCCESS(
+            f'Bulk import was {legacy_seconds / bulk_seconds:.1f}x faster (all changes rolled back)'
+        ))
@@ -0,0 +1,98 @@
+"""
+Management command to build responsive image derivatives for static images.
+"""
+
+import os
+import time
+from multiprocessing import Pool
+from pathlib import Path
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from myApp.utils.responsive_images import (
+    DERIVATIVE_WIDTHS, DERIVATIVE_FORMATS, DERIVATIVE_QUALITY,
+    supported_formats, find_source_images, generate_derivatives, write_manifest
+)
+
+
+class Command(BaseCommand):
+    help = 'Build WebP/AVIF derivatives at several widths for static images and write a srcset manifest'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--static-dir',
+            type=str,
+            default=str(settings.BASE_DIR / 'static'),
+            help='Static directory the manifest paths are relative to (default: static)'
+        )
+        parser.add_argument(
+            '--source-dir',
+            type=str,
+            default='images',
+            help='Directory to scan, relative to the static directory (default: images)'
+        )
+        parser.add_argument(
+            '--widths',
+            type=int,
+            nargs='+',
+            default=list(DERIVATIVE_WIDTHS),
+            help=f'Derivative widths (default: {" ".join(map(str, DERIVATIVE_WIDTHS))})'
+        )
+        parser.add_argument(
+            '--formats',
+            nargs='+',
+            default=list(DERIVATIVE_FORMATS),
+            help=f'Derivative formats (default: {" ".join(DERIVATIVE_FORMATS)})'
+        )
+        parser.add_argument(
+            '--quality',
+            type=int,
+            default=DERIVATIVE_QUALITY,
+            help=f'Encoder quality (default: {DERIVATIVE_QUALITY})'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Number of worker processes (default: CPU count)'
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Rebuild derivatives that are already up to date'
+        )
+
+    def handle(self, *args, **options):
+        static_dir = Path(options['static_dir'])
+        source_dir = static_dir / options['source_dir']
+        if not source_dir.is_dir():
+            raise CommandError(f'Source directory not found: {source_dir}')
+        
+        formats = supported_formats(options['formats'])
+        for fmt in set(options['formats']) - set(formats):
+            self.stdout.write(self.style.WARNING(f'Skipping {fmt}: not supported by this Pillow build'))
+        if not formats:
+            raise CommandError('None of the requested formats can be written')
+        
+        sources = find_source_images(static_dir, source_dir)
+        tasks = [
+            (str(path), str(static_dir), options['widths'], formats, options['quality'], options['force'])
+            for path in sources
+        ]
+        
+        start = time.perf_counter()
+        manifest = {}
+        written = 0
+        with Pool(processes=max(1, options['workers'])) as pool:
+            for name, entry, count in pool.imap_unordered(generate_derivatives, tasks):
+                manifest[name] = entry
+                written += count
+        
+        manifest_path = write_manifest(static_dir, manifest)
+        elapsed = time.perf_counter() - start
+        
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Built {written} derivative(s) for {len(manifest)} image(s) in {elapsed:.1f}s; '
+                f'manifest written to {manifest_path}'
+            )
+        )
@@ -0,0 +1,18 @@
+"""
+Management command to rebuild the denormalized homepage snapshot.
+"""
+
+from django.core.management.base import BaseCommand
+from myApp.content_helpers import rebuild_homepage_snapshot, bump_content_version
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the homepage snapshot from the content tables'
+
+    def handle(self, *args, **options):
+        snapshot = rebuild_homepage_snapshot()
+        bump_content_version()
+        
+        self.stdout.write(
+            self.style.SUCCESS(f'Successfully rebuilt homepage snapshot ({len(snapshot.content)} sections)')
+        )
@@ -0,0 +1,70 @@
+"""
+Management command to run a local stand-in for Cloudinary.
+"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from myApp.fake_cloudinary import FakeCloudinaryServer
+
+
+class Command(BaseCommand):
+    help = 'Serve a fake Cloudinary upload API and CDN for offline tests and benchmarks'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--host',
+            type=str,
+            default='127.0.0.1',
+            help='Address to listen on (default: 127.0.0.1)'
+        )
+        parser.add_argument(
+            '--port',
+            type=int,
+            default=8765,
+            help='Port to listen on (default: 8765)'
+        )
+        parser.add_argument(
+            '--storage-dir',
+            type=str,
+            default=str(settings.BASE_DIR / 'fake_cloudinary'),
+            help='Directory uploaded images are stored in (default: fake_cloudinary/)'
+        )
+        parser.add_argument(
+            '--latency',
+            type=float,
+            default=0.0,
+            help='Seconds added to every request, to model network round trips (default: 0)'
+        )
+        parser.add_argument(
+            '--fail-rate',
+            type=float,
+            default=0.0,
+            help='Fraction of uploads answered with an error (default: 0)'
+        )
+        parser.add_argument(
+            '--verbose-requests',
+            action='store_true',
+            help='Log every request'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            server = FakeCloudinaryServer(
+                (options['host'], options['port']), options['storage_dir'],
+                latency=options['latency'], fail_rate=options['fail_rate'],
+                verbose=options['verbose_requests'],
+            )
+        except OSError as e:
+            raise CommandError(f"Could not listen on {options['host']}:{options['port']}: {e}")
+
+        self.stdout.write(f'Fake Cloudinary listening on {server.url}, storing images in {server.storage_dir}')
+        self.stdout.write(f'Point the app at it with: CLOUDINARY_FAKE_URL={server.url}')
+
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+
+        self.stdout.write(self.style.SUCCESS(f'Fake Cloudinary stopped after {len(server.uploads)} upload(s)'))
@@ -0,0 +1,86 @@
+"""
+Management command to process queued dashboard image uploads.
+"""
+
+import time
+import traceback
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from myApp.image_jobs import JOB_BATCH_SIZE, JOB_WORKERS, requeue_stale_jobs, run_pending_jobs
+
+REQUEUE_INTERVAL = 60  # Seconds between checks for jobs orphaned by another worker
+
+
+class Command(BaseCommand):
+    help = 'Process queued dashboard image uploads (decode, compress, upload to Cloudinary)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Process the jobs currently queued and exit instead of polling'
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=1.0,
+            help='Seconds to wait between polls when the queue is empty (default: 1)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=JOB_BATCH_SIZE,
+            help=f'Jobs claimed and saved together (default: {JOB_BATCH_SIZE})'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=JOB_WORKERS,
+            help=f'Concurrent compress/upload threads (default: {JOB_WORKERS})'
+        )
+
+    def requeue(self):
+        """Return jobs left processing by a stopped worker to the queue."""
+        requeued = requeue_stale_jobs()
+        if requeued:
+            self.stdout.write(self.style.WARNING(f'Requeued {requeued} job(s) left by a stopped worker'))
+
+    def run_batch(self, options):
+        """Process the queued jobs; an error is reported and the worker keeps polling."""
+        try:
+            succeeded, failed = run_pending_jobs(
+                batch_size=options['batch_size'], workers=options['workers']
+            )
+        except Exception:
+            # e.g. a connection dropped while idle; claimed jobs are requeued once stale
+            self.stderr.write(self.style.ERROR(f'Image job batch failed:\n{traceback.format_exc()}'))
+            return
+        if succeeded or failed:
+            self.stdout.write(f'Processed {succeeded + failed} job(s): {succeeded} succeeded, {failed} failed')
+
+    def handle(self, *args, **options):
+        self.requeue()
+        next_requeue = time.monotonic() + REQUEUE_INTERVAL
+
+        self.stdout.write('Waiting for image upload jobs...' if not options['once'] else 'Processing queued jobs...')
+
+        try:
+            while True:
+                # Drop connections that went away or outlived CONN_MAX_AGE while idle
+                close_old_connections()
+                if time.monotonic() >= next_requeue:
+                    try:
+                        self.requeue()
+                    except Exception:
+                        self.stderr.write(self.style.ERROR(f'Requeueing stale jobs failed:\n{traceback.format_exc()}'))
+                    next_requeue = time.monotonic() + REQUEUE_INTERVAL
+                self.run_batch(options)
+                if options['once']:
+                    break
+                time.sleep(options['poll_interval'])
+        except KeyboardInterrupt:
+            pass
+        finally:
+            close_old_connections()
+
+        self.stdout.write(self.style.SUCCESS('Image worker stopped'))
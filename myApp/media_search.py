@@ -0,0 +1,150 @@
+"""
+Indexed, relevance-ranked search over MediaAsset file names and paths.
+
+PostgreSQL gets pg_trgm GIN indexes on the searched columns, which serve the
+ILIKE queries Django generates for icontains. SQLite gets an FTS5 table with
+the trigram tokenizer, kept in sync with media_assets by triggers so bulk
+inserts and updates are indexed too. Other backends, and queries too short
+for trigrams, fall back to a plain icontains scan.
+"""
+
+import sqlite3
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+SEARCH_FIELDS = ('file_name', 'original_path', 'cloudinary_public_id')
+SEARCH_TABLE = 'media_assets_search'  # SQLite FTS5 shadow table
+MIN_TRIGRAM_QUERY = 3  # Trigram indexes cannot match shorter queries
+
+SQLITE_TRIGGERS = {
+    f'{SEARCH_TABLE}_ai': f"""
+        CREATE TRIGGER {SEARCH_TABLE}_ai AFTER INSERT ON media_assets BEGIN
+            INSERT INTO {SEARCH_TABLE}(rowid, file_name, original_path, cloudinary_public_id)
+            VALUES (new.id, new.file_name, new.original_path, new.cloudinary_public_id);
+        END
+    """,
+    f'{SEARCH_TABLE}_ad': f"""
+        CREATE TRIGGER {SEARCH_TABLE}_ad AFTER DELETE ON media_assets BEGIN
+            INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rowid, file_name, original_path, cloudinary_public_id)
+            VALUES ('delete', old.id, old.file_name, old.original_path, old.cloudinary_public_id);
+        END
+    """,
+    f'{SEARCH_TABLE}_au': f"""
+        CREATE TRIGGER {SEARCH_TABLE}_au AFTER UPDATE OF file_name, original_path, cloudinary_public_id
+        ON media_assets BEGIN
+            INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rowid, file_name, original_path, cloudinary_public_id)
+            VALUES ('delete', old.id, old.file_name, old.original_path, old.cloudinary_public_id);
+            INSERT INTO {SEARCH_TABLE}(rowid, file_name, original_path, cloudinary_public_id)
+            VALUES (new.id, new.file_name, new.original_path, new.cloudinary_public_id);
+        END
+    """,
+}
+
+
+def sqlite_supports_trigram():
+    """The FTS5 trigram tokenizer needs SQLite 3.34 or newer."""
+    return sqlite3.sqlite_version_info >= (3, 34, 0)
+
+
+def ensure_search_index(using_connection=connection):
+    """
+    Create the search index for the current database if it is missing.
+
+    Safe to run repeatedly. On SQLite, Django rebuilds media_assets for many
+    schema changes, which drops its triggers, so this runs after every migrate
+    and reindexes whenever a trigger had to be recreated.
+
+    Args:
+        using_connection: Database connection to create the index on
+    """
+    vendor = using_connection.vendor
+    if 'media_assets' not in using_connection.introspection.table_names():
+        return
+
+    with using_connection.cursor() as cursor:
+        if vendor == 'postgresql':
+            cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+            for field in SEARCH_FIELDS:
+                cursor.execute(
+                    f'CREATE INDEX IF NOT EXISTS media_assets_{field}_trgm '
+                    f'ON media_assets USING gin (UPPER({field}::text) gin_trgm_ops)'
+                )
+
+        elif vendor == 'sqlite' and sqlite_supports_trigram():
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5("
+                f"file_name, original_path, cloudinary_public_id, "
+                f"content='media_assets', content_rowid='id', tokenize='trigram')"
+            )
+            cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'media_assets'")
+            existing = {row[0] for row in cursor.fetchall()}
+            missing = [name for name in SQLITE_TRIGGERS if name not in existing]
+            for name in missing:
+                cursor.execute(SQLITE_TRIGGERS[name])
+            if missing:
+                # Rows may have changed while the triggers were absent
+                cursor.execute(f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('rebuild')")
+
+
+def drop_search_index(using_connection=connection):
+    """Remove the search index created by ensure_search_index."""
+    with using_connection.cursor() as cursor:
+        if using_connection.vendor == 'postgresql':
+            for field in SEARCH_FIELDS:
+                cursor.execute(f'DROP INDEX IF EXISTS media_assets_{field}_trgm')
+        elif using_connection.vendor == 'sqlite':
+            for name in SQLITE_TRIGGERS:
+                cursor.execute(f'DROP TRIGGER IF EXISTS {name}')
+            cursor.execute(f'DROP TABLE IF EXISTS {SEARCH_TABLE}')
+
+
+def has_search_index():
+    """Whether search_media_assets can use an index on the default database."""
+    return connection.vendor == 'postgresql' or (connection.vendor == 'sqlite' and sqlite_supports_trigram())
+
+
+def matches_any_field(query):
+    """Q object matching query case-insensitively in any searched field."""
+    matches = Q()
+    for field in SEARCH_FIELDS:
+        matches |= Q(**{f'{field}__icontains': query})
+    return matches
+
+
+def search_media_assets(queryset, query):
+    """
+    Filter a MediaAsset queryset to matches for query, best matches first.
+
+    Args:
+        queryset: MediaAsset queryset to search within
+        query: Text to find in file_name, original_path or cloudinary_public_id
+
+    Returns:
+        Queryset ordered by relevance, then newest first
+    """
+    query = query.strip()
+    if len(query) < MIN_TRIGRAM_QUERY or not has_search_index():
+        return queryset.filter(matches_any_field(query)).order_by('-uploaded_at', '-id')
+
+    if connection.vendor == 'postgresql':
+        from django.contrib.postgres.search import TrigramWordSimilarity
+        from django.db.models.functions import Greatest
+
+        rank = Greatest(*(TrigramWordSimilarity(query, field) for field in SEARCH_FIELDS))
+        return queryset.filter(matches_any_field(query)).annotate(search_rank=rank).order_by('-search_rank', '-uploaded_at', '-id')
+
+    # FTS5 phrase query: with the trigram tokenizer this is a case-insensitive substring match
+    phrase = '"' + query.replace('"', '""') + '"'
+    rank = RawSQL(
+        f'SELECT bm25({SEARCH_TABLE}) FROM {SEARCH_TABLE} '
+        f'WHERE {SEARCH_TABLE} MATCH %s AND rowid = media_assets.id',
+        [phrase]
+    )
+    # bm25() scores are negative; more negative is more relevant
+    return (
+        queryset
+        .filter(id__in=RawSQL(f'SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s', [phrase]))
+        .annotate(search_rank=rank)
+        .order_by('search_rank', '-uploaded_at', '-id')
+    )
@@ -0,0 +1,271 @@
+# Generated by Django 5.1.2 on 2026-10-17 01:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myApp', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='About',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(blank=True, max_length=200)),
+                ('description', models.TextField(blank=True)),
+                ('image_url', models.URLField(blank=True)),
+                ('content', models.JSONField(blank=True, default=dict)),
+            ],
+            options={
+                'verbose_name_plural': 'About',
+            },
+        ),
+        migrations.CreateModel(
+            name='Contact',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(blank=True, max_length=200)),
+                ('subtitle', models.TextField(blank=True)),
+                ('content', models.JSONField(blank=True, default=dict)),
+            ],
+            options={
+                'verbose_name_plural': 'Contact',
+            },
+        ),
+        migrations.CreateModel(
+            name='ContactFormField',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('label', models.CharField(max_length=200)),
+                ('field_type', models.CharField(max_length=50)),
+                ('required', models.BooleanField(default=False)),
+                ('placeholder', models.CharField(blank=True, max_length=200)),
+                ('sort_order', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Contact Form Field',
+                'verbose_name_plural': 'Contact Form Fields',
+                'ordering': ['sort_order'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ContactInfo',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('type', models.CharField(max_length=50)),
+                ('label', models.CharField(max_length=100)),
+                ('value', models.CharField(max_length=500)),
+                ('icon', models.CharField(blank=True, max_length=100)),
+                ('sort_order', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Contact Info',
+                'verbose_name_plural': 'Contact Info',
+                'ordering': ['sort_order'],
+            },
+        ),
+        migrations.CreateModel(
+            name='FAQ',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('question', models.CharField(max_length=500)),
+                ('answer', models.TextField()),
+                ('category', models.CharField(blank=True, max_length=100)),
+                ('sort_order', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'FAQ',
+                'verbose_name_plural': 'FAQs',
+                'ordering': ['sort_order'],
+            },
+        ),
+        migrations.CreateModel(
+            name='FAQSection',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(blank=True, max_length=200)),
+                ('subtitle', models.TextField(blank=True)),
+                ('content', models.JSONField(blank=True, default=dict)),
+            ],
+            options={
+                'verbose_name': 'FAQ Section',
+                'verbose_name_plural': 'FAQ Section',
+            },
+        ),
+        migrations.CreateModel(
+            name='Footer',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('copyright_text', models.CharField(blank=True, max_length=500)),
+                ('content', models.JSONField(blank=True, default=dict)),
+            ],
+            options={
+                'verbose_name_plural': 'Footer',
+            },
+        ),
+        migrations.CreateModel(
+            name='Hero',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(blank=True, max_length=200)),
+                ('subtitle', models.TextField(blank=True)),
+                ('image_url', models.URLField(blank=True)),
+                ('button_text', models.CharField(blank=True, max_length=100)),
+                ('button_url', models.CharField(blank=True, max_length=200)),
+                ('content', models.JSONField(blank=True, default=dict)),
+            ],
+            options={
+                'verbose_name_plural': 'Hero',
+            },
+        ),
+        migrations.CreateModel(
+            name='HomepageSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content', models.JSONField(blank=True, default=dict)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Homepage Snapshot',
+                'verbose_name_plural': 'Homepage Snapshot',
+            },
+        ),
+        migrations.CreateModel(
+            name='Navigation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('label', models.CharField(max_length=100)),
+                ('url', models.CharField(max_length=200)),
+                ('sort_order', models.IntegerField(default=0)),
+                ('is_active', models.BooleanField(default=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Navigation Items',
+                'ordering': ['sort_order'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Portfolio',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(blank=True, max_length=200)),
+                ('subtitle', models.TextField(blank=True)),
+                ('content', models.JSONField(blank=True, default=dict)),
+            ],
+            options={
+                'verbose_name_plural': 'Portfolio',
+            },
+        ),
+        migrations.CreateModel(
+            name='PortfolioProject',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=200)),
+                ('description', models.TextField(blank=True)),
+                ('image_url', models.URLField(blank=True)),
+                ('gallery', models.JSONField(blank=True, default=list)),
+                ('category', models.CharField(blank=True, max_length=100)),
+                ('sort_order', models.IntegerField(default=0)),
+                ('content', models.JSONField(blank=True, default=dict)),
+            ],
+            options={
+                'verbose_name': 'Portfolio Project',
+                'verbose_name_plural': 'Portfolio Projects',
+                'ordering': ['sort_order'],
+            },
+        ),
+        migrations.CreateModel(
+            name='SEO',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(blank=True, max_length=200)),
+                ('description', models.TextField(blank=True)),
+                ('keywords', models.CharField(blank=True, max_length=500)),
+                ('og_image', models.URLField(blank=True)),
+                ('og_title', models.CharField(blank=True, max_length=200)),
+                ('og_description', models.TextField(blank=True)),
+            ],
+            options={
+                'verbose_name': 'SEO',
+                'verbose_name_plural': 'SEO',
+            },
+        ),
+        migrations.CreateModel(
+            name='Service',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=200)),
+                ('description', models.TextField(blank=True)),
+                ('image_url', models.URLField(blank=True)),
+                ('icon', models.CharField(blank=True, max_length=100)),
+                ('sort_order', models.IntegerField(default=0)),
+                ('content', models.JSONField(blank=True, default=dict)),
+            ],
+            options={
+                'ordering': ['sort_order'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ServicesSection',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(blank=True, max_length=200)),
+                ('subtitle', models.TextField(blank=True)),
+                ('content', models.JSONField(blank=True, default=dict)),
+            ],
+            options={
+                'verbose_name': 'Services Section',
+                'verbose_name_plural': 'Services Section',
+            },
+        ),
+        migrations.CreateModel(
+            name='SocialLink',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('platform', models.CharField(max_length=100)),
+                ('url', models.URLField()),
+                ('icon', models.CharField(blank=True, max_length=100)),
+                ('sort_order', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Social Link',
+                'verbose_name_plural': 'Social Links',
+                'ordering': ['sort_order'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Stat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('number', models.CharField(max_length=50)),
+                ('label', models.CharField(max_length=100)),
+                ('icon', models.CharField(blank=True, max_length=100)),
+                ('sort_order', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Statistic',
+                'verbose_name_plural': 'Statistics',
+                'ordering': ['sort_order'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Testimonial',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=200)),
+                ('role', models.CharField(blank=True, max_length=200)),
+                ('company', models.CharField(blank=True, max_length=200)),
+                ('content', models.TextField()),
+                ('image_url', models.URLField(blank=True)),
+                ('rating', models.IntegerField(blank=True, default=5, null=True)),
+                ('sort_order', models.IntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['sort_order'],
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.1.2 on 2026-10-17 02:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myApp', '0002_content_models_homepagesnapshot'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mediaasset',
+            name='content_hash',
+            field=models.CharField(blank=True, help_text='SHA-256 of the source file, used to skip unchanged files', max_length=64, null=True),
+        ),
+        migrations.AddField(
+            model_name='mediaasset',
+            name='source_mtime',
+            field=models.FloatField(blank=True, help_text='Source file modification time when last uploaded', null=True),
+        ),
+        migrations.AddField(
+            model_name='mediaasset',
+            name='source_size',
+            field=models.BigIntegerField(blank=True, help_text='Source file size in bytes when last uploaded', null=True),
+        ),
+    ]
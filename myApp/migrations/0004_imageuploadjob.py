@@ -0,0 +1,36 @@
+# Generated by Django 5.1.2 on 2026-10-17 02:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myApp', '0003_mediaasset_content_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImageUploadJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('processing', 'Processing'), ('done', 'Done'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('source_path', models.CharField(help_text='Spooled upload on local disk, removed once processed', max_length=1000)),
+                ('file_name', models.CharField(help_text='Original file name', max_length=255)),
+                ('folder', models.CharField(default='uploads', help_text='Cloudinary folder', max_length=255)),
+                ('original_path', models.CharField(blank=True, default='', max_length=500)),
+                ('result', models.JSONField(blank=True, default=dict, help_text='Upload response returned to the image picker')),
+                ('error', models.TextField(blank=True)),
+                ('attempts', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('media_asset', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='upload_jobs', to='myApp.mediaasset')),
+            ],
+            options={
+                'ordering': ['created_at'],
+                'indexes': [models.Index(fields=['status', 'created_at'], name='myApp_image_status_6a83cf_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.2 on 2026-10-17 02:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myApp', '0004_imageuploadjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='imageuploadjob',
+            name='claim_token',
+            field=models.CharField(blank=True, default='', help_text='Identifies the worker batch that claimed the job', max_length=32),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.2 on 2026-10-17 02:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myApp', '0005_imageuploadjob_claim_token'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='mediaasset',
+            index=models.Index(fields=['-uploaded_at', '-id'], name='media_assets_recent_idx'),
+        ),
+    ]
@@ -0,0 +1,85 @@
+import sqlite3
+
+from django.db import migrations
+
+# The DDL is copied here rather than imported from myApp.media_search, so this
+# migration keeps doing what it did when written however that module changes.
+# media_search.ensure_search_index recreates the same objects after each migrate.
+
+SEARCH_FIELDS = ('file_name', 'original_path', 'cloudinary_public_id')
+
+POSTGRESQL_CREATE = ['CREATE EXTENSION IF NOT EXISTS pg_trgm'] + [
+    f'CREATE INDEX IF NOT EXISTS media_assets_{field}_trgm '
+    f'ON media_assets USING gin (UPPER({field}::text) gin_trgm_ops)'
+    for field in SEARCH_FIELDS
+]
+
+POSTGRESQL_DROP = [f'DROP INDEX IF EXISTS media_assets_{field}_trgm' for field in SEARCH_FIELDS]
+
+SQLITE_CREATE = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS media_assets_search USING fts5("
+    "file_name, original_path, cloudinary_public_id, "
+    "content='media_assets', content_rowid='id', tokenize='trigram')",
+    """
+    CREATE TRIGGER IF NOT EXISTS media_assets_search_ai AFTER INSERT ON media_assets BEGIN
+        INSERT INTO media_assets_search(rowid, file_name, original_path, cloudinary_public_id)
+        VALUES (new.id, new.file_name, new.original_path, new.cloudinary_public_id);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS media_assets_search_ad AFTER DELETE ON media_assets BEGIN
+        INSERT INTO media_assets_search(media_assets_search, rowid, file_name, original_path, cloudinary_public_id)
+        VALUES ('delete', old.id, old.file_name, old.original_path, old.cloudinary_public_id);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS media_assets_search_au AFTER UPDATE OF file_name, original_path, cloudinary_public_id
+    ON media_assets BEGIN
+        INSERT INTO media_assets_search(media_assets_search, rowid, file_name, original_path, cloudinary_public_id)
+        VALUES ('delete', old.id, old.file_name, old.original_path, old.cloudinary_public_id);
+        INSERT INTO media_assets_search(rowid, file_name, original_path, cloudinary_public_id)
+        VALUES (new.id, new.file_name, new.original_path, new.cloudinary_public_id);
+    END
+    """,
+    "INSERT INTO media_assets_search(media_assets_search) VALUES ('rebuild')",
+]
+
+SQLITE_DROP = [
+    'DROP TRIGGER IF EXISTS media_assets_search_ai',
+    'DROP TRIGGER IF EXISTS media_assets_search_ad',
+    'DROP TRIGGER IF EXISTS media_assets_search_au',
+    'DROP TABLE IF EXISTS media_assets_search',
+]
+
+
+def run_statements(schema_editor, postgresql, sqlite):
+    connection = schema_editor.connection
+    if connection.vendor == 'postgresql':
+        statements = postgresql
+    elif connection.vendor == 'sqlite' and sqlite3.sqlite_version_info >= (3, 34, 0):
+        # The FTS5 trigram tokenizer needs SQLite 3.34 or newer
+        statements = sqlite
+    else:
+        return
+    with connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+
+
+def create_index(apps, schema_editor):
+    run_statements(schema_editor, POSTGRESQL_CREATE, SQLITE_CREATE)
+
+
+def drop_index(apps, schema_editor):
+    run_statements(schema_editor, POSTGRESQL_DROP, SQLITE_DROP)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myApp', '0006_mediaasset_recent_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
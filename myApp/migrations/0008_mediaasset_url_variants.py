@@ -0,0 +1,28 @@
+# Generated by Django 5.1.2 on 2026-10-17 02:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myApp', '0007_mediaasset_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mediaasset',
+            name='thumb_url',
+            field=models.URLField(blank=True, default='', help_text='Thumbnail variant URL', max_length=1000),
+        ),
+        migrations.AddField(
+            model_name='mediaasset',
+            name='url_variants',
+            field=models.JSONField(blank=True, default=dict, help_text='URL for each transformation in CLOUDINARY_URL_VARIANTS'),
+        ),
+        migrations.AddField(
+            model_name='mediaasset',
+            name='web_url',
+            field=models.URLField(blank=True, default='', help_text='Web-optimized variant URL', max_length=1000),
+        ),
+    ]
@@ -0,0 +1,51 @@
+from django.db import migrations
+from django.db.migrations.exceptions import IrreversibleError
+from django.db.models import Count, Max
+
+
+def remove_duplicate_assets(apps, schema_editor):
+    """
+    Keep the newest asset for each repeated public ID and point its upload jobs at it.
+
+    Every removed row is printed with its path, so the cleanup can be audited
+    and the rows re-created from the output if needed.
+    """
+    MediaAsset = apps.get_model('myApp', 'MediaAsset')
+    ImageUploadJob = apps.get_model('myApp', 'ImageUploadJob')
+    duplicates = (
+        MediaAsset.objects.exclude(cloudinary_public_id__isnull=True).exclude(cloudinary_public_id='')
+        .values('cloudinary_public_id').annotate(count=Count('id'), keep_id=Max('id')).filter(count__gt=1)
+    )
+    for duplicate in duplicates:
+        stale = MediaAsset.objects.filter(cloudinary_public_id=duplicate['cloudinary_public_id']).exclude(
+            id=duplicate['keep_id']
+        )
+        for asset_id, original_path, cloudinary_url in stale.values_list('id', 'original_path', 'cloudinary_url'):
+            print(
+                f"\n  Removing duplicate media asset {asset_id} ({original_path}, {cloudinary_url}) "
+                f"for public ID {duplicate['cloudinary_public_id']!r}; keeping {duplicate['keep_id']}",
+                end='',
+            )
+        ImageUploadJob.objects.filter(media_asset__in=stale).update(media_asset_id=duplicate['keep_id'])
+        stale.delete()
+
+
+def restore_duplicate_assets(apps, schema_editor):
+    raise IrreversibleError(
+        'Migration 0009a deleted duplicate media assets (listed in its output) and cannot restore them. '
+        'Re-create them by hand, or restore a backup, if they are needed.'
+    )
+
+
+# Data only: on PostgreSQL the deletes leave deferred trigger events pending
+# until commit, and ALTER TABLE in the same transaction fails, so the unique
+# constraint is added by the next migration, in a transaction of its own.
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myApp', '0008_mediaasset_url_variants'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_assets, restore_duplicate_assets),
+    ]
@@ -0,0 +1,23 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myApp', '0009a_mediaasset_remove_duplicate_public_ids'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='mediaasset',
+            name='media_asset_cloudin_bfad95_idx',
+        ),
+        migrations.AddConstraint(
+            model_name='mediaasset',
+            constraint=models.UniqueConstraint(
+                condition=models.Q(('cloudinary_public_id', ''), _negated=True),
+                fields=('cloudinary_public_id',),
+                name='media_assets_public_id_unique',
+            ),
+        ),
+    ]
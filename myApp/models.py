@@ -8,12 +8,18 @@ class MediaAsset(models.Model):
     original_path = models.CharField(max_length=500, help_text="Original file path relative to static directory")
     file_name = models.CharField(max_length=255, help_text="Original file name")
     cloudinary_url = models.URLField(max_length=1000, help_text="Full Cloudinary URL")
+    web_url = models.URLField(max_length=1000, blank=True, default='', help_text="Web-optimized variant URL")
+    thumb_url = models.URLField(max_length=1000, blank=True, default='', help_text="Thumbnail variant URL")
+    url_variants = models.JSONField(default=dict, blank=True, help_text="URL for each transformation in CLOUDINARY_URL_VARIANTS")
     cloudinary_public_id = models.CharField(max_length=500, blank=True, null=True, help_text="Cloudinary public ID")
     format = models.CharField(max_length=10, blank=True, null=True, help_text="Image format (webp, jpg, png, etc.)")
     width = models.IntegerField(blank=True, null=True, help_text="Image width in pixels")
     height = models.IntegerField(blank=True, null=True, help_text="Image height in pixels")
     file_size = models.BigIntegerField(blank=True, null=True, help_text="File size in bytes")
     was_converted = models.BooleanField(default=False, help_text="Whether the image was converted to WebP")
+    content_hash = models.CharField(max_length=64, blank=True, null=True, help_text="SHA-256 of the source file, used to skip unchanged files")
+    source_size = models.BigIntegerField(blank=True, null=True, help_text="Source file size in bytes when last uploaded")
+    source_mtime = models.FloatField(blank=True, null=True, help_text="Source file modification time when last uploaded")
     uploaded_at = models.DateTimeField(auto_now_add=True, help_text="When the image was uploaded")
     
     class Meta:
@@ -21,13 +27,59 @@ class MediaAsset(models.Model):
         ordering = ['-uploaded_at']
         indexes = [
             models.Index(fields=['original_path']),
-            models.Index(fields=['cloudinary_public_id']),
+            # Keyset pagination of the gallery walks (uploaded_at, id) newest first
+            models.Index(fields=['-uploaded_at', '-id'], name='media_assets_recent_idx'),
+        ]
+        constraints = [
+            # Also serves public ID lookups; NULL and blank IDs may repeat
+            models.UniqueConstraint(
+                fields=['cloudinary_public_id'],
+                condition=~models.Q(cloudinary_public_id=''),
+                name='media_assets_public_id_unique',
+            ),
         ]
     
     def __str__(self):
         return f"{self.file_name} - {self.cloudinary_url[:50]}..."
 
 
+class ImageUploadJob(models.Model):
+    """Dashboard image upload waiting for, or processed by, the run_image_worker command."""
+    PENDING = 'pending'
+    PROCESSING = 'processing'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (PROCESSING, 'Processing'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    ]
+    
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=PENDING)
+    source_path = models.CharField(max_length=1000, help_text="Spooled upload on local disk, removed once processed")
+    file_name = models.CharField(max_length=255, help_text="Original file name")
+    folder = models.CharField(max_length=255, default='uploads', help_text="Cloudinary folder")
+    original_path = models.CharField(max_length=500, blank=True, default='')
+    media_asset = models.ForeignKey(MediaAsset, on_delete=models.SET_NULL, null=True, blank=True, related_name='upload_jobs')
+    result = models.JSONField(default=dict, blank=True, help_text="Upload response returned to the image picker")
+    error = models.TextField(blank=True)
+    attempts = models.IntegerField(default=0)
+    claim_token = models.CharField(max_length=32, blank=True, default='', help_text="Identifies the worker batch that claimed the job")
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.file_name} ({self.status})"
+
+
 class SEO(models.Model):
     """SEO metadata for the homepage."""
     title = models.CharField(max_length=200, blank=True)
@@ -289,3 +341,16 @@ class Footer(models.Model):
     
     def __str__(self):
         return "Footer"
+
+
+class HomepageSnapshot(models.Model):
+    """Denormalized homepage content, rebuilt whenever a content section changes."""
+    content = models.JSONField(default=dict, blank=True)  # Output of get_homepage_content_from_db()
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = "Homepage Snapshot"
+        verbose_name_plural = "Homepage Snapshot"
+    
+    def __str__(self):
+        return f"Homepage Snapshot ({self.updated_at:%Y-%m-%d %H:%M})"
@@ -0,0 +1,294 @@
+"""
+Full-page response cache for public pages.
+
+Rendered pages are stored per homepage content version, so any change to the
+content models (dashboard edit, admin, import) purges every cached page. They
+are also keyed by a build fingerprint of the templates and static manifests,
+so a deploy that changes how pages render does not serve pages cached by the
+previous build.
+"""
+
+import gzip
+import hashlib
+from datetime import datetime, timezone
+from functools import lru_cache, wraps
+from pathlib import Path
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; pages are then precompressed with zlib's gzip only
+    brotli = None
+from .content_helpers import get_content_version, get_content_last_modified, bump_content_version
+from .utils.responsive_images import MANIFEST_NAME, RESPONSIVE_DIR
+
+# Cache settings
+PAGE_CACHE_KEY = 'page:{path}:{version}:{build}'
+PAGE_CACHE_TIMEOUT = 60 * 60 * 24  # Entries are keyed by version, so this only bounds stale ones
+
+# Content codings in order of preference
+PAGE_ENCODINGS = ('br', 'gzip') if brotli else ('gzip',)
+
+# Per-process copy of the latest cached entry for each path, as (cache key, entry) tuples
+_local_pages = {}
+
+
+def purge_page_cache():
+    """Purge all cached pages by starting a new content version."""
+    bump_content_version()
+
+
+def build_files():
+    """
+    Files whose changes alter rendered pages.
+    
+    Returns:
+        List of paths: every template, the hashed static file manifest and the
+        responsive image manifest, when they exist
+    """
+    template_dirs = [Path(directory) for engine in settings.TEMPLATES for directory in engine.get('DIRS', [])]
+    template_dirs.append(Path(__file__).resolve().parent / 'templates')
+    files = sorted(path for directory in template_dirs for path in directory.rglob('*.html'))
+    
+    files.append(Path(settings.STATIC_ROOT) / 'staticfiles.json')
+    responsive_manifest = finders.find(f'{RESPONSIVE_DIR}/{MANIFEST_NAME}')
+    if responsive_manifest:
+        files.append(Path(responsive_manifest))
+    return [path for path in files if path.is_file()]
+
+
+@lru_cache(maxsize=None)
+def get_build_fingerprint():
+    """
+    Identify the deployed build once per process.
+    
+    Combines settings.RELEASE_ID with the size and modification time of every
+    file from build_files(), so a deploy changing templates or hashed static
+    names yields a new fingerprint even without a release ID.
+    
+    Returns:
+        Tuple of (fingerprint string, build time as a timezone-aware datetime
+        or None when no build file was found)
+    """
+    digest = hashlib.sha256(settings.RELEASE_ID.encode())
+    latest_mtime = None
+    for path in build_files():
+        stat = path.stat()
+        digest.update(f'{path}:{stat.st_size}:{stat.st_mtime_ns}'.encode())
+        latest_mtime = max(latest_mtime or 0, stat.st_mtime)
+    build_time = datetime.fromtimestamp(int(latest_mtime), tz=timezone.utc) if latest_mtime else None
+    return digest.hexdigest()[:16], build_time
+
+
+def make_etag(content):
+    """
+    Build a strong ETag for rendered page bytes.
+    
+    Args:
+        content: Rendered response body
+    
+    Returns:
+        Quoted ETag string, which changes with the build fingerprint too
+    """
+    fingerprint, _ = get_build_fingerprint()
+    return '"%s"' % hashlib.sha256(fingerprint.encode() + content).hexdigest()
+
+
+def compress_page(content):
+    """
+    Precompress rendered page bytes in every supported content coding.
+    
+    Args:
+        content: Rendered response body
+    
+    Returns:
+        Dictionary mapping content coding to compressed bytes
+    """
+    encodings = {'gzip': gzip.compress(content, compresslevel=9, mtime=0)}
+    if brotli:
+        encodings['br'] = brotli.compress(content, quality=11, mode=brotli.MODE_TEXT)
+    return encodings
+
+
+def parse_accept_encoding(header):
+    """
+    Parse an Accept-Encoding header into a {coding: q-value} dictionary.
+    
+    Args:
+        header: Accept-Encoding header value
+    
+    Returns:
+        Dictionary of lowercase codings to their q-values
+    """
+    accepted = {}
+    for item in header.split(','):
+        coding, _, params = item.strip().partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(';'):
+            name, _, value = param.strip().partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[coding] = q
+    return accepted
+
+
+def select_encoding(request, entry):
+    """
+    Pick the precompressed variant of a cached page to send for a request.
+    
+    Args:
+        request: HttpRequest
+        entry: Cached page entry
+    
+    Returns:
+        Content coding name, or None for the uncompressed page
+    """
+    accepted = parse_accept_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+    for coding in PAGE_ENCODINGS:
+        if coding in entry['encodings'] and accepted.get(coding, accepted.get('*', 0)) > 0:
+            return coding
+    return None
+
+
+def variant_etag(entry, encoding):
+    """Strong ETag for one encoding of a cached page; each variant needs its own."""
+    if encoding is None:
+        return entry['etag']
+    return '%s-%s"' % (entry['etag'][:-1], encoding)
+
+
+def build_page_response(request, entry):
+    """
+    Build the response for a cached page in the best encoding the client accepts.
+    
+    Args:
+        request: HttpRequest
+        entry: Cached page entry
+    
+    Returns:
+        HttpResponse
+    """
+    encoding = select_encoding(request, entry)
+    content = entry['encodings'][encoding] if encoding else entry['content']
+    response = HttpResponse(content, content_type=entry['content_type'])
+    if encoding:
+        response['Content-Encoding'] = encoding
+    response['ETag'] = variant_etag(entry, encoding)
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return response
+
+
+def is_cacheable_request(request):
+    """Only anonymous GET/HEAD requests without a query string share cached pages."""
+    return (
+        request.method in ('GET', 'HEAD')
+        and not request.GET
+        and not request.user.is_authenticated
+    )
+
+
+def page_cache_key(request, version):
+    """Cache key for a request's path at a content version under the running build."""
+    fingerprint, _ = get_build_fingerprint()
+    return PAGE_CACHE_KEY.format(path=request.path, version=version, build=fingerprint)
+
+
+def get_cached_page(request):
+    """
+    Get the cached entry for a request's path at the current content version.
+    
+    Args:
+        request: HttpRequest
+    
+    Returns:
+        Dictionary with content, content_type and etag, or None on a miss
+    """
+    key = page_cache_key(request, get_content_version())
+    local = _local_pages.get(request.path)
+    if local and local[0] == key:
+        return local[1]
+    
+    entry = cache.get(key)
+    if entry is not None:
+        _local_pages[request.path] = (key, entry)
+    return entry
+
+
+def store_page(request, response, version):
+    """
+    Store a rendered response for a request's path.
+    
+    Args:
+        request: HttpRequest
+        response: Rendered HttpResponse
+        version: Content version the response was rendered from
+    
+    Returns:
+        The stored entry
+    """
+    entry = {
+        'content': response.content,
+        'content_type': response['Content-Type'],
+        'etag': make_etag(response.content),
+        # Compressed once here, so hits only pick a variant
+        'encodings': compress_page(response.content),
+    }
+    key = page_cache_key(request, version)
+    cache.set(key, entry, PAGE_CACHE_TIMEOUT)
+    _local_pages[request.path] = (key, entry)
+    return entry
+
+
+def page_etag(request, *args, **kwargs):
+    """
+    ETag for conditional requests, taken from the cached page for the current
+    content version. Returns None when the page has not been rendered yet.
+    """
+    if not is_cacheable_request(request):
+        return None
+    entry = get_cached_page(request)
+    return variant_etag(entry, select_encoding(request, entry)) if entry else None
+
+
+def page_last_modified(request, *args, **kwargs):
+    """Last-Modified for conditional requests: the later of the latest content change and the build."""
+    if not is_cacheable_request(request):
+        return None
+    _, build_time = get_build_fingerprint()
+    content_time = get_content_last_modified()
+    return max(content_time, build_time) if build_time else content_time
+
+
+def cache_public_page(view_func):
+    """
+    Serve anonymous requests for a view from the full-page cache.
+    
+    Cache hits return the stored bytes, precompressed to match the request's
+    Accept-Encoding, without rendering the template.
+    """
+    @wraps(view_func)
+    def _wrapped_view(request, *args, **kwargs):
+        if not is_cacheable_request(request):
+            return view_func(request, *args, **kwargs)
+        
+        entry = get_cached_page(request)
+        if entry is None:
+            # Read the version before rendering so an edit made mid-render is not cached under it
+            version = get_content_version()
+            response = view_func(request, *args, **kwargs)
+            if response.status_code != 200 or response.streaming:
+                return response
+            entry = store_page(request, response, version)
+        
+        return build_page_response(request, entry)
+    return _wrapped_view
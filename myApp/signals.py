@@ -0,0 +1,48 @@
+"""
+Signal handlers for keeping cached homepage content in sync with the database.
+"""
+
+from contextlib import contextmanager
+from django.db import connections, transaction
+from django.db.models.signals import post_save, post_delete
+from .content_helpers import HOMEPAGE_CONTENT_MODELS, bump_content_version
+from .media_search import ensure_search_index
+
+
+def content_changed(sender, using=None, **kwargs):
+    """Bump the homepage content version once the change is committed."""
+    # Bumping before commit would let readers cache the old rows under the new version
+    transaction.on_commit(bump_content_version, using=using)
+
+
+def media_search_index_check(sender, using='default', **kwargs):
+    """Recreate MediaAsset search triggers that a migration's table rebuild dropped."""
+    ensure_search_index(connections[using])
+
+
+def connect_content_signals():
+    """Bump the content version on every save or delete of a homepage content model."""
+    for model in HOMEPAGE_CONTENT_MODELS:
+        post_save.connect(content_changed, sender=model, dispatch_uid=f'content_saved_{model.__name__}')
+        post_delete.connect(content_changed, sender=model, dispatch_uid=f'content_deleted_{model.__name__}')
+
+
+@contextmanager
+def content_signals_disconnected():
+    """
+    Disconnect the content version signals for a bulk write.
+
+    Without receivers, queryset deletes run as one DELETE instead of loading
+    every row to send post_delete. The caller must bump the content version
+    itself once the write commits.
+    """
+    for model in HOMEPAGE_CONTENT_MODELS:
+        post_save.disconnect(sender=model, dispatch_uid=f'content_saved_{model.__name__}')
+        post_delete.disconnect(sender=model, dispatch_uid=f'content_deleted_{model.__name__}')
+    try:
+        yield
+    finally:
+        connect_content_signals()
+
+
+connect_content_signals()
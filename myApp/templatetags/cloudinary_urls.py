@@ -0,0 +1,25 @@
+"""
+Template tags for Cloudinary delivery URLs built by utils.cloudinary_urls.
+"""
+
+from django import template
+from ..utils.cloudinary_urls import ORIGINAL, build_url, is_configured
+
+register = template.Library()
+
+
+@register.simple_tag
+def cloudinary_url(public_id, preset=ORIGINAL, default=''):
+    """
+    Emit the delivery URL of a Cloudinary image for a named preset.
+
+    Usage:
+        {% load cloudinary_urls %}
+        <img src="{% cloudinary_url image.cloudinary_public_id 'thumb' default=image.thumb_url %}">
+
+    Emits default for an empty public ID, or when neither Cloudinary nor local
+    delivery is configured.
+    """
+    if not public_id or not is_configured():
+        return default
+    return build_url(public_id, preset)
@@ -0,0 +1,59 @@
+"""
+Template tags for responsive images built by build_responsive_images.
+"""
+
+from django import template
+from django.templatetags.static import static
+from django.utils.html import format_html, format_html_join
+from ..utils.responsive_images import MIME_TYPES, PICTURE_FORMATS, get_manifest
+
+register = template.Library()
+
+
+def srcset_candidates(variants):
+    """Comma-separated srcset candidates for a list of manifest variants."""
+    return ', '.join(f"{static(variant['path'])} {variant['width']}w" for variant in variants)
+
+
+@register.simple_tag
+def srcset(path, sizes='100vw', image_format='webp'):
+    """
+    Emit srcset and sizes attributes for one derivative format of a static image.
+
+    Usage:
+        <img src="{% static 'images/x.jpg' %}" {% srcset 'images/x.jpg' sizes='50vw' %}>
+
+    Emits nothing when the image has no derivatives, so the plain src is used.
+    """
+    entry = get_manifest().get(path)
+    variants = entry['variants'].get(image_format) if entry else None
+    if not variants:
+        return ''
+    return format_html('srcset="{}" sizes="{}"', srcset_candidates(variants), sizes)
+
+
+@register.simple_tag
+def picture_sources(path, sizes='100vw'):
+    """
+    Emit a <source> element per derivative format of a static image, AVIF first.
+
+    Usage:
+        <picture class="contents">
+            {% picture_sources 'images/x.jpg' sizes='50vw' %}
+            <img src="{% static 'images/x.jpg' %}" alt="...">
+        </picture>
+
+    Browsers pick the first type they support and fall back to the <img>; emits
+    nothing when the image has no derivatives.
+    """
+    entry = get_manifest().get(path)
+    if not entry:
+        return ''
+    return format_html_join(
+        '', '<source type="{}" srcset="{}" sizes="{}">',
+        (
+            (MIME_TYPES[fmt], srcset_candidates(entry['variants'][fmt]), sizes)
+            for fmt in PICTURE_FORMATS
+            if entry['variants'].get(fmt)
+        )
+    )
@@ -1,3 +1,1062 @@
-from django.test import TestCase
+import gzip
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from unittest import mock
+from urllib.request import urlopen
 
-# Create your tests here.
+import cloudinary
+from PIL import ExifTags, Image
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase, override_settings
+from django.template import Context, Template
+from django.test.utils import CaptureQueriesContext
+from django.test.signals import template_rendered
+from django.urls import reverse
+from django.utils.http import http_date
+
+from . import content_export, content_helpers, content_import, image_delivery, image_jobs, media_search, page_cache
+from .fake_cloudinary import FakeCloudinaryServer
+from .utils import cloudinary_urls, cloudinary_utils, responsive_images
+from .content_import import IN_LOOKUP_CHUNK_SIZE, ImportFormatError, import_homepage_data, import_homepage_ndjson
+from .models import FAQ, SEO, ImageUploadJob, MediaAsset
+import upload_images_to_cloudinary as uploader
+
+# Every test uses a process-local cache, never the shared file cache in the system temp dir
+LOCMEM_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+# The manifest storage needs collectstatic to have run; tests use plain static files
+PLAIN_STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+# Production's WhiteNoise storage without its slow compression pass; the
+# manifest lookups, which fail on a missing asset, are the same
+MANIFEST_STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.ManifestStaticFilesStorage'},
+}
+
+locmem_caches = override_settings(CACHES=LOCMEM_CACHES)
+
+
+def setUpModule():
+    locmem_caches.enable()
+
+
+def tearDownModule():
+    locmem_caches.disable()
+
+
+@override_settings(STORAGES=PLAIN_STORAGES)
+class ConditionalGetTests(TestCase):
+    """Conditional GET on public pages: 304s skip rendering and the page body."""
+
+    def setUp(self):
+        cache.clear()
+        self.rendered = []
+        template_rendered.connect(self.on_template_rendered)
+        self.addCleanup(template_rendered.disconnect, self.on_template_rendered)
+
+    def on_template_rendered(self, sender, template, **kwargs):
+        self.rendered.append(template.name)
+
+    def assert_not_modified(self, full_response, response):
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(self.rendered, [])
+        bytes_saved = len(full_response.content) - len(response.content)
+        self.assertEqual(bytes_saved, len(full_response.content))
+        self.assertGreater(bytes_saved, 10_000)
+
+    def test_if_none_match_returns_304_for_home(self):
+        first = self.client.get(reverse('home'))
+        self.assertEqual(first.status_code, 200)
+        self.assertIn('ETag', first)
+        self.assertIn('Last-Modified', first)
+        self.rendered.clear()
+
+        response = self.client.get(reverse('home'), HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assert_not_modified(first, response)
+
+    def test_if_modified_since_returns_304_for_about(self):
+        first = self.client.get(reverse('about'))
+        self.rendered.clear()
+
+        response = self.client.get(reverse('about'), HTTP_IF_MODIFIED_SINCE=first['Last-Modified'])
+        self.assert_not_modified(first, response)
+
+    def test_content_change_invalidates_validators(self):
+        first = self.client.get(reverse('home'))
+        with self.captureOnCommitCallbacks(execute=True):
+            FAQ.objects.create(question='New question', answer='New answer')
+
+        response = self.client.get(reverse('home'), HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 200)
+
+        response = self.client.get(reverse('home'), HTTP_IF_MODIFIED_SINCE=http_date(0))
+        self.assertEqual(response.status_code, 200)
+
+    def test_new_build_invalidates_cached_page_and_validators(self):
+        first = self.client.get(reverse('home'))
+        fingerprint, _ = page_cache.get_build_fingerprint()
+        deployed = (fingerprint + '-next', datetime.now(timezone.utc) + timedelta(days=1))
+        with mock.patch.object(page_cache, 'get_build_fingerprint', return_value=deployed):
+            self.rendered.clear()
+            response = self.client.get(reverse('home'), HTTP_IF_NONE_MATCH=first['ETag'])
+            self.assertEqual(response.status_code, 200)
+            self.assertIn('myApp/home.html', self.rendered)
+            self.assertNotEqual(response['ETag'], first['ETag'])
+
+            response = self.client.get(reverse('home'), HTTP_IF_MODIFIED_SINCE=first['Last-Modified'])
+            self.assertEqual(response.status_code, 200)
+
+    def test_page_head_renders_seo_content(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            SEO.objects.create(title='Edited title', description='Edited <description>')
+            content_helpers.rebuild_homepage_snapshot()
+        response = self.client.get(reverse('home'))
+        self.assertContains(response, '<title>Edited title</title>')
+        self.assertContains(response, '<meta name="description" content="Edited &lt;description&gt;">')
+
+
+@override_settings(STORAGES=PLAIN_STORAGES)
+class PrecompressedPageTests(TestCase):
+    """Cached pages are compressed once and served by Accept-Encoding."""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_gzip_variant_matches_identity(self):
+        identity = self.client.get(reverse('home'))
+        response = self.client.get(reverse('home'), HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertNotEqual(response['ETag'], identity['ETag'])
+        self.assertEqual(gzip.decompress(response.content), identity.content)
+        self.assertLess(len(response.content), len(identity.content))
+
+    def test_refused_encoding_is_not_sent(self):
+        response = self.client.get(reverse('home'), HTTP_ACCEPT_ENCODING='gzip;q=0, br;q=0')
+        self.assertNotIn('Content-Encoding', response)
+
+    def test_compression_happens_once_per_version(self):
+        with mock.patch.object(page_cache, 'compress_page', wraps=page_cache.compress_page) as compress_page:
+            for _ in range(3):
+                self.client.get(reverse('home'), HTTP_ACCEPT_ENCODING='gzip')
+            self.assertEqual(compress_page.call_count, 1)
+
+            with self.captureOnCommitCallbacks(execute=True):
+                FAQ.objects.create(question='New question', answer='New answer')
+            self.client.get(reverse('home'), HTTP_ACCEPT_ENCODING='gzip')
+            self.assertEqual(compress_page.call_count, 2)
+
+
+@override_settings(STORAGES=PLAIN_STORAGES)
+class ResponsiveImageTests(TestCase):
+    """build_responsive_images writes derivatives once and the tags reference every format."""
+
+    def setUp(self):
+        static_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(static_dir.cleanup)
+        self.static_dir = Path(static_dir.name)
+        (self.static_dir / 'images').mkdir()
+        # Stored landscape, displayed portrait after EXIF rotation
+        exif = Image.Exif()
+        exif[ExifTags.Base.Orientation] = 6
+        Image.new('RGB', (800, 600), 'red').save(self.static_dir / 'images' / 'rotated.jpg', exif=exif)
+        Image.new('P', (400, 300)).save(self.static_dir / 'images' / 'palette.png')
+
+    def build(self):
+        out = io.StringIO()
+        call_command('build_responsive_images', static_dir=str(self.static_dir), formats=['webp'], workers=1, stdout=out)
+        return out.getvalue()
+
+    def test_manifest_and_skip_on_rerun(self):
+        self.assertIn('Built 4 derivative(s) for 2 image(s)', self.build())
+        manifest = json.loads((self.static_dir / 'responsive' / 'manifest.json').read_text())
+        rotated = manifest['images/rotated.jpg']
+        self.assertEqual((rotated['width'], rotated['height']), (600, 800))
+        self.assertEqual([v['width'] for v in rotated['variants']['webp']], [320, 600])
+        with Image.open(self.static_dir / rotated['variants']['webp'][1]['path']) as img:
+            self.assertEqual(img.size, (600, 800))
+
+        self.assertIn('Built 0 derivative(s) for 2 image(s)', self.build())
+        task = (str(self.static_dir / 'images' / 'rotated.jpg'), str(self.static_dir), [320, 640], ['webp'], 80, False)
+        with mock.patch.object(responsive_images.ImageOps, 'exif_transpose') as exif_transpose:
+            name, entry, written = responsive_images.generate_derivatives(task)
+        exif_transpose.assert_not_called()
+        self.assertEqual((written, entry), (0, rotated))
+
+    def test_picture_sources_lists_avif_before_webp(self):
+        def variants(fmt):
+            return [{'width': w, 'height': w, 'path': f'responsive/x-{w}w.{fmt}'} for w in (320, 640)]
+        manifest = {'x.jpg': {'width': 640, 'height': 640, 'variants': {'webp': variants('webp'), 'avif': variants('avif')}}}
+        template = Template("{% load responsive_images %}{% picture_sources 'x.jpg' sizes='50vw' %}|{% srcset 'x.jpg' %}|{% picture_sources 'missing.jpg' %}")
+        with mock.patch('myApp.templatetags.responsive_images.get_manifest', return_value=manifest):
+            sources, srcset, missing = template.render(Context()).split('|')
+        self.assertEqual(sources, (
+            '<source type="image/avif" srcset="/static/responsive/x-320w.avif 320w, /static/responsive/x-640w.avif 640w" sizes="50vw">'
+            '<source type="image/webp" srcset="/static/responsive/x-320w.webp 320w, /static/responsive/x-640w.webp 640w" sizes="50vw">'
+        ))
+        self.assertEqual(srcset, 'srcset="/static/responsive/x-320w.webp 320w, /static/responsive/x-640w.webp 640w" sizes="100vw"')
+        self.assertEqual(missing, '')
+
+
+@override_settings(STORAGES=MANIFEST_STORAGES)
+class ManifestStaticFilesTests(TestCase):
+    """Public pages render after collectstatic, so every asset they use is in the manifest."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        static_root = tempfile.TemporaryDirectory()
+        cls.addClassCleanup(static_root.cleanup)
+        cls.enterClassContext(override_settings(STATIC_ROOT=static_root.name))
+        call_command('collectstatic', interactive=False, verbosity=0)
+
+    def test_public_pages_use_hashed_static_urls(self):
+        for name in ('home', 'about'):
+            with self.subTest(name):
+                response = self.client.get(reverse(name))
+                self.assertEqual(response.status_code, 200)
+                self.assertRegex(response.content.decode(), r'src="/static/images/[^"]+\.[0-9a-f]{12}\.(jpg|png)"')
+
+
+class ContentImportTests(TestCase):
+    """import_homepage_data writes everything in one transaction with bulk inserts."""
+
+    def setUp(self):
+        cache.clear()
+        FAQ.objects.create(question='Old question', answer='Old answer')
+        self.payload = {
+            'hero': {'title': 'Imported hero'},
+            'faqs': [{'question': f'Question {i}?', 'answer': 'Answer', 'sort_order': i} for i in range(250)],
+            'media_assets': [
+                {'file_name': f'{i}.jpg', 'cloudinary_public_id': f'uploads/{i}',
+                 'cloudinary_url': f'https://res.cloudinary.com/test/image/upload/v1/uploads/{i}.jpg'}
+                for i in (1, 2, 2)
+            ],
+        }
+
+    def run_import(self, payload, **options):
+        with tempfile.NamedTemporaryFile('w', suffix='.json') as f:
+            json.dump(payload, f)
+            f.flush()
+            call_command('import_homepage_data', f.name, stdout=io.StringIO(), **options)
+
+    def test_import_uses_batched_inserts_and_bumps_version_once(self):
+        version = content_helpers.get_content_version()
+        with self.captureOnCommitCallbacks(execute=True) as callbacks, CaptureQueriesContext(connection) as queries:
+            self.run_import(self.payload, batch_size=100)
+
+        faq_inserts = [q for q in queries.captured_queries if q['sql'].startswith('INSERT INTO "myApp_faq"')]
+        self.assertEqual(len(faq_inserts), 3)
+        self.assertEqual(len(callbacks), 1)
+        self.assertNotEqual(content_helpers.get_content_version(), version)
+        self.assertEqual(FAQ.objects.count(), 250)
+        self.assertEqual(MediaAsset.objects.count(), 2)
+        self.assertEqual(content_helpers.get_homepage_content()['hero']['title'], 'Imported hero')
+
+    def test_failed_import_keeps_previous_content(self):
+        self.payload['media_assets'].append({'cloudinary_url': 'https://x/upload/y', 'no_such_field': 1})
+        with self.assertRaises(TypeError):
+            self.run_import(self.payload)
+        self.assertEqual(list(FAQ.objects.values_list('question', flat=True)), ['Old question'])
+        self.assertEqual(MediaAsset.objects.count(), 0)
+
+    def test_sync_writes_only_the_diff_and_keeps_primary_keys(self):
+        self.run_import(self.payload)
+        ids = dict(FAQ.objects.values_list('question', 'id'))
+
+        self.payload['faqs'][0]['answer'] = 'Edited answer'
+        del self.payload['faqs'][1]
+        self.payload['faqs'].append({'question': 'New question?', 'answer': 'Answer'})
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            results = import_homepage_data(self.payload, sync=True)
+        faqs = next(result for result in results if result['section'] == 'faqs')
+        self.assertEqual(
+            [faqs['created'], faqs['updated'], faqs['deleted'], faqs['unchanged']], [1, 1, 1, 248]
+        )
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(FAQ.objects.get(question='Question 0?').answer, 'Edited answer')
+        self.assertEqual(FAQ.objects.get(question='Question 0?').id, ids['Question 0?'])
+        self.assertEqual(FAQ.objects.get(question='Question 249?').id, ids['Question 249?'])
+
+        # Nothing changed: no snapshot rebuild and no version bump, so caches stay warm
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            results = import_homepage_data(self.payload, sync=True)
+        self.assertEqual(callbacks, [])
+        self.assertEqual(results[-1]['unchanged'], 1)
+
+    def test_media_asset_dedup_is_set_based(self):
+        def asset(i):
+            return {'file_name': f'{i}.jpg', 'cloudinary_public_id': f'bulk/{i}',
+                    'cloudinary_url': f'https://res.cloudinary.com/test/image/upload/v1/bulk/{i}.jpg'}
+
+        import_homepage_data({'media_assets': [asset(i) for i in range(500)]})
+        assets = [asset(i) for i in range(2000)]
+        with CaptureQueriesContext(connection) as queries:
+            results = import_homepage_data({'media_assets': assets})
+
+        sql = [q['sql'] for q in queries.captured_queries]
+        lookups = [q for q in sql if q.startswith('SELECT') and '"media_assets"' in q]
+        inserts = [q for q in sql if q.startswith('INSERT') and '"media_assets"' in q]
+        self.assertEqual(len(lookups), -(-2000 // IN_LOOKUP_CHUNK_SIZE))
+        # SQLite caps each INSERT at 999 parameters, so batches are smaller than batch_size here
+        self.assertLess(len(inserts), 1500 // 50)
+        self.assertEqual([results[0]['created'], results[0]['unchanged']], [1500, 500])
+        self.assertEqual(MediaAsset.objects.count(), 2000)
+
+        # The constraint backs the in-memory filter; blank public IDs may repeat
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            MediaAsset.objects.create(**asset(0))
+        MediaAsset.objects.bulk_create([MediaAsset(cloudinary_url='https://x/upload/y', cloudinary_public_id='')] * 2)
+
+    def test_assets_inserted_by_another_writer_are_reported_unchanged(self):
+        def asset(i):
+            return {'file_name': f'{i}.jpg', 'cloudinary_public_id': f'race/{i}',
+                    'cloudinary_url': f'https://res.cloudinary.com/test/image/upload/v1/race/{i}.jpg'}
+
+        MediaAsset.objects.create(**asset(1))
+        lookup = content_import.existing_public_ids
+        calls = []
+
+        def stale_first_lookup(public_ids):
+            # The first lookup ran before another writer stored race/1
+            calls.append(public_ids)
+            return set() if len(calls) == 1 else lookup(public_ids)
+
+        with mock.patch.object(content_import, 'existing_public_ids', side_effect=stale_first_lookup):
+            results = import_homepage_data({'media_assets': [asset(i) for i in range(3)]})
+
+        self.assertEqual(len(calls), 2)
+        self.assertEqual([results[0]['created'], results[0]['unchanged']], [2, 1])
+        self.assertEqual(MediaAsset.objects.filter(cloudinary_public_id__startswith='race/').count(), 3)
+
+
+class ContentExportTests(TestCase):
+    """export_all_data streams rows instead of building the export in memory."""
+
+    def setUp(self):
+        FAQ.objects.bulk_create(FAQ(question=f'Question {i}?', answer='Ünïcode\nanswer', sort_order=i) for i in range(25))
+        MediaAsset.objects.create(cloudinary_url='https://res.cloudinary.com/test/image/upload/v1/a.jpg', cloudinary_public_id='a')
+
+    def test_json_export_matches_a_single_dump(self):
+        stream = io.StringIO()
+        with CaptureQueriesContext(connection) as queries:
+            counts = content_export.export_content(stream, chunk_size=10)
+
+        data = json.loads(stream.getvalue())
+        self.assertEqual(stream.getvalue(), json.dumps(data, indent=2, ensure_ascii=False))
+        self.assertEqual(counts['faqs'], 25)
+        self.assertEqual([faq['question'] for faq in data['faqs']][:2], ['Question 0?', 'Question 1?'])
+        self.assertEqual(data['media_assets'][0]['cloudinary_public_id'], 'a')
+        self.assertEqual(data['seo'], {})
+        self.assertLess(len(queries), 30)
+
+    def test_ndjson_export_has_one_record_per_row(self):
+        stream = io.StringIO()
+        content_export.export_content(stream, 'ndjson')
+        records = [json.loads(line) for line in stream.getvalue().splitlines()]
+
+        json_stream = io.StringIO()
+        content_export.export_content(json_stream)
+        data = json.loads(json_stream.getvalue())
+        self.assertEqual([r['data'] for r in records if r['section'] == 'faqs' and 'data' in r], data['faqs'])
+        self.assertIn({'section': 'faqs'}, records)
+        self.assertEqual(len(records), 8 + 25 + 1 + 10)  # singletons, rows, and a header per list section
+
+    def test_emptied_section_round_trips_like_json(self):
+        FAQ.objects.all().delete()
+        exports = {}
+        for output_format in content_export.EXPORT_FORMATS:
+            stream = io.StringIO()
+            content_export.export_content(stream, output_format)
+            exports[output_format] = stream.getvalue()
+
+        for sync in (False, True):
+            FAQ.objects.create(question='Stale question?', answer='Answer')
+            import_homepage_ndjson(exports['ndjson'].splitlines(), sync=sync)
+            self.assertEqual(FAQ.objects.count(), 0)
+
+            FAQ.objects.create(question='Stale question?', answer='Answer')
+            import_homepage_data(json.loads(exports['json']), sync=sync)
+            self.assertEqual(FAQ.objects.count(), 0)
+        self.assertEqual(MediaAsset.objects.count(), 1)
+
+    def test_ndjson_import_streams_in_batches(self):
+        stream = io.StringIO()
+        content_export.export_content(stream, 'ndjson')
+        extra = [
+            json.dumps({'section': 'media_assets', 'data': {
+                'cloudinary_public_id': f'more/{i}',
+                'cloudinary_url': f'https://res.cloudinary.com/test/image/upload/v1/more/{i}.jpg',
+            }})
+            for i in range(30)
+        ]
+        lines = stream.getvalue().splitlines() + extra
+        FAQ.objects.all().delete()
+
+        reports = []
+        with CaptureQueriesContext(connection) as queries:
+            results = import_homepage_ndjson(
+                iter(lines), batch_size=10, progress=lambda rows, seconds: reports.append(rows), progress_every=20
+            )
+        faq_inserts = [q for q in queries.captured_queries if q['sql'].startswith('INSERT INTO "myApp_faq"')]
+        self.assertEqual(len(faq_inserts), 3)
+        self.assertEqual(FAQ.objects.count(), 25)
+        self.assertEqual(MediaAsset.objects.count(), 31)
+        media = next(result for result in results if result['section'] == 'media_assets')
+        self.assertEqual([media['created'], media['unchanged']], [30, 1])
+        self.assertEqual(reports, [20, 40, 60, 64])
+
+        with self.assertRaisesMessage(ImportFormatError, 'line 2'):
+            import_homepage_ndjson(['{"section": "faqs", "data": {}}', '{"section": "nope", "data": {}}'])
+        self.assertEqual(FAQ.objects.count(), 25)
+
+
+class FakeCloudinaryTestCase(TestCase):
+    """Points the Cloudinary SDK at a FakeCloudinaryServer for each test."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        storage_dir = tempfile.TemporaryDirectory()
+        cls.addClassCleanup(storage_dir.cleanup)
+        cls.server = FakeCloudinaryServer(('127.0.0.1', 0), storage_dir.name).start()
+        cls.addClassCleanup(cls.server.stop)
+
+    def setUp(self):
+        self.server.reset()
+        self.server.fail_rate = 0.0
+        self.upload_prefix = self.server.url
+        cloudinary.config(
+            cloud_name='test', api_key='key', api_secret='secret', upload_prefix=self.upload_prefix,
+            cname=self.upload_prefix.split('://')[1], secure=False
+        )
+        self.addCleanup(cloudinary.reset_config)
+
+
+class FakeCloudinaryServerTests(FakeCloudinaryTestCase):
+    """The fake server answers like Cloudinary and serves what it stored."""
+
+    def test_chunked_upload_is_reassembled_and_served(self):
+        import cloudinary.uploader
+
+        data = io.BytesIO()
+        Image.effect_noise((200, 150), 64).convert('RGB').save(data, format='PNG')
+        result = cloudinary.uploader.upload_large(
+            io.BytesIO(data.getvalue()), resource_type='image', folder='gallery', public_id='noise', chunk_size=4096
+        )
+
+        self.assertEqual(self.server.uploads, ['gallery/noise'])
+        self.assertEqual((result['public_id'], result['width'], result['height']), ('gallery/noise', 200, 150))
+        self.assertEqual(result['format'], 'png')
+        with urlopen(cloudinary.utils.cloudinary_url('gallery/noise', raw_transformation='w_100')[0]) as response:
+            self.assertEqual(response.read(), data.getvalue())
+
+
+class ParallelUploaderTests(FakeCloudinaryTestCase):
+    """Concurrent, resumable runs of upload_images_to_cloudinary.py against a local fake endpoint."""
+
+    def setUp(self):
+        super().setUp()
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.static_dir = Path(temp_dir.name) / 'images'
+        (self.static_dir / 'gallery').mkdir(parents=True)
+        self.checkpoint_path = Path(temp_dir.name) / 'checkpoint.txt'
+
+        # Two images above the 64px threshold get converted to WebP first
+        for name, size in [('large.jpg', (100, 80)), ('gallery/large.png', (120, 90)),
+                           ('small.jpg', (40, 40)), ('gallery/small.png', (32, 48))]:
+            Image.new('RGB', size, (200, 120, 40)).save(self.static_dir / name)
+        self.image_files = sorted(uploader.find_image_files(self.static_dir))
+
+    def run_uploader(self, workers=2):
+        return uploader.upload_images(
+            self.image_files, self.static_dir, threshold=64, workers=workers,
+            checkpoint_path=self.checkpoint_path
+        )
+
+    def test_parallel_run_uploads_and_saves_every_image(self):
+        self.assertEqual(self.run_uploader(), (4, 0, 0))
+        self.assertCountEqual(self.server.uploads, ['large', 'gallery/large', 'small', 'gallery/small'])
+        self.assertCountEqual(
+            MediaAsset.objects.values_list('original_path', 'was_converted'),
+            [('large.jpg', True), ('gallery/large.png', True), ('small.jpg', False), ('gallery/small.png', False)]
+        )
+        # A clean run removes its checkpoint and leaves no converted files behind
+        self.assertFalse(self.checkpoint_path.exists())
+        self.assertEqual(list(self.static_dir.rglob('*.webp')), [])
+
+    def test_run_resumes_from_checkpoint(self):
+        self.checkpoint_path.write_text('large.jpg\nsmall.jpg\n')
+        self.assertEqual(self.run_uploader(), (2, 0, 2))
+        self.assertCountEqual(self.server.uploads, ['gallery/large', 'gallery/small'])
+
+    def test_failed_image_is_retried_on_next_run(self):
+        self.server.fail_public_ids.add('gallery/large')
+        with self.assertLogs(uploader.logger, 'ERROR'):
+            self.assertEqual(self.run_uploader(), (3, 1, 0))
+        self.assertCountEqual(
+            self.checkpoint_path.read_text().split(),
+            ['large.jpg', 'small.jpg', 'gallery/small.png']
+        )
+
+        self.server.fail_public_ids.clear()
+        self.server.uploads.clear()
+        self.assertEqual(self.run_uploader(workers=1), (1, 0, 3))
+        self.assertEqual(self.server.uploads, ['gallery/large'])
+        self.assertEqual(MediaAsset.objects.count(), 4)
+
+    def test_unchanged_images_are_skipped(self):
+        self.assertEqual(self.run_uploader(), (4, 0, 0))
+        self.server.uploads.clear()
+        self.assertEqual(self.run_uploader(), (0, 0, 4))
+        self.assertEqual(self.server.uploads, [])
+
+        Image.new('RGB', (40, 40), (10, 10, 10)).save(self.static_dir / 'small.jpg')
+        self.assertEqual(self.run_uploader(), (1, 0, 3))
+        self.assertEqual(self.server.uploads, ['small'])
+        self.assertEqual(MediaAsset.objects.filter(original_path='small.jpg').count(), 1)
+
+        self.server.uploads.clear()
+        self.assertEqual(uploader.upload_images(
+            self.image_files, self.static_dir, threshold=64, workers=1, force=True
+        ), (4, 0, 0))
+        self.assertEqual(len(self.server.uploads), 4)
+
+    def test_same_name_images_get_separate_public_ids(self):
+        for name, size in [('large.png', (100, 80)), ('gallery/small.jpg', (40, 40))]:
+            Image.new('RGB', size, (10, 60, 200)).save(self.static_dir / name)
+        self.image_files = sorted(uploader.find_image_files(self.static_dir))
+
+        self.assertEqual(self.run_uploader(), (6, 0, 0))
+        self.assertCountEqual(self.server.uploads, [
+            'large_jpg', 'large_png', 'gallery/large', 'small', 'gallery/small_jpg', 'gallery/small_png',
+        ])
+        self.assertEqual(MediaAsset.objects.count(), 6)
+
+        self.server.uploads.clear()
+        self.assertEqual(self.run_uploader(), (0, 0, 6))
+        self.assertEqual(self.server.uploads, [])
+
+    def test_writer_saves_in_batches(self):
+        MediaAsset.objects.create(original_path='a.jpg', file_name='a.jpg', cloudinary_url='https://old/a.jpg')
+        checkpoint = uploader.UploadCheckpoint(self.checkpoint_path)
+        writer = uploader.MediaAssetWriter(batch_size=3, checkpoint=checkpoint)
+
+        with CaptureQueriesContext(connection) as queries:
+            for name in ['a', 'b', 'c', 'd', 'e']:
+                prepared = {'original_path': f'{name}.jpg', 'file_name': f'{name}.jpg',
+                            'file_size': 10, 'was_converted': False}
+                writer.add(prepared, {'secure_url': f'https://new/{name}.jpg', 'public_id': name})
+            self.assertEqual(writer.saved, 3)
+            writer.flush()
+        checkpoint.close()
+
+        inserts = [q for q in queries.captured_queries if q['sql'].startswith('INSERT')]
+        self.assertEqual(len(inserts), 2)
+        self.assertEqual(writer.saved, 5)
+        self.assertEqual(MediaAsset.objects.count(), 5)
+        self.assertEqual(MediaAsset.objects.get(original_path='a.jpg').cloudinary_url, 'https://new/a.jpg')
+        self.assertCountEqual(self.checkpoint_path.read_text().split(), ['a.jpg', 'b.jpg', 'c.jpg', 'd.jpg', 'e.jpg'])
+
+    def test_writer_keeps_one_row_per_public_id(self):
+        MediaAsset.objects.create(original_path='old/a.jpg', file_name='a.jpg', cloudinary_url='https://old/a', cloudinary_public_id='a')
+        MediaAsset.objects.create(original_path='a.png', file_name='a.png', cloudinary_url='https://old/b', cloudinary_public_id='b')
+        writer = uploader.MediaAssetWriter(batch_size=10)
+        for path in ['a.jpg', 'a.png', 'c.jpg']:
+            prepared = {'original_path': path, 'file_name': path, 'file_size': 10, 'was_converted': False}
+            writer.add(prepared, {'secure_url': f'https://new/{path}', 'public_id': path.split('.')[0]})
+        with self.assertLogs(uploader.logger, 'ERROR') as logs:
+            writer.flush()
+        self.assertIn('a.jpg shares its public ID', logs.output[0])
+
+        # a.jpg and a.png were both uploaded as "a": the later one takes over the row
+        # that held it, and a.jpg is left for the next run instead of counted as saved
+        self.assertEqual((writer.saved, writer.failed), (2, 1))
+        self.assertEqual(
+            set(MediaAsset.objects.values_list('original_path', 'cloudinary_public_id', 'cloudinary_url')),
+            {('a.png', 'a', 'https://new/a.png'), ('a.png', 'b', 'https://old/b'), ('c.jpg', 'c', 'https://new/c.jpg')},
+        )
+
+
+class PredictiveCompressionTests(TestCase):
+    """smart_compress_to_bytes picks a quality from a sample and confirms it at full size."""
+
+    def setUp(self):
+        # Detail at every scale, so a downscaled sample behaves like the full image
+        img = Image.effect_mandelbrot((1600, 1200), (-2, -1.2, 1, 1.2), 100).convert('RGB')
+        self.data = io.BytesIO()
+        img.save(self.data, format='PNG')
+        self.full_size = len(cloudinary_utils.smart_compress_to_bytes(
+            io.BytesIO(self.data.getvalue()), target_bytes=float('inf')
+        ).getbuffer())
+
+    def compress(self, search):
+        stats = {}
+        output = cloudinary_utils.smart_compress_to_bytes(
+            io.BytesIO(self.data.getvalue()), target_bytes=self.full_size // 2, search=search, stats=stats
+        )
+        return len(output.getbuffer()), stats
+
+    def test_predictive_search_uses_fewer_full_encodes(self):
+        binary_size, binary_stats = self.compress('binary')
+        size, stats = self.compress('predictive')
+        self.assertLessEqual(size, self.full_size // 2)
+        self.assertGreater(stats['sample_encodes'], 0)
+        self.assertLessEqual(stats['full_encodes'], 1 + cloudinary_utils.PREDICTIVE_MAX_CONFIRMS)
+        self.assertLess(stats['full_encodes'], binary_stats['full_encodes'])
+        self.assertGreater(size, binary_size * 0.8)
+
+
+# Uploads a file in a fresh process and reports how much its peak RSS grew
+MEASURE_UPLOAD_RSS = """
+import json, os, resource, sys
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'myProject.settings')
+import django
+django.setup()
+from myApp.utils.cloudinary_utils import upload_to_cloudinary
+
+before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+with open(sys.argv[1], 'rb') as f:
+    result = upload_to_cloudinary(f)
+after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({'peak_kb': after - before, 'public_id': result['public_id']}))
+"""
+
+
+@unittest.skipUnless(sys.platform.startswith('linux'), 'ru_maxrss is reported in KB on Linux')
+class BoundedMemoryUploadTests(FakeCloudinaryTestCase):
+    """Dashboard uploads are spooled, decoded downscaled and streamed in chunks."""
+
+    def test_50_megapixel_upload_has_bounded_peak_rss(self):
+        size = (8192, 6144)
+        decoded_kb = size[0] * size[1] * 3 // 1024
+        with tempfile.NamedTemporaryFile(suffix='.jpg') as source:
+            Image.linear_gradient('L').resize(size).convert('RGB').save(source, format='JPEG', quality=95)
+            source.flush()
+
+            output = subprocess.run(
+                [sys.executable, '-c', MEASURE_UPLOAD_RSS, source.name],
+                cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+                env={**os.environ, 'CLOUDINARY_FAKE_URL': self.upload_prefix}
+            ).stdout
+        result = json.loads(output.splitlines()[-1])
+
+        self.assertEqual(self.server.uploads, [result['public_id']])
+        self.assertTrue(result['public_id'].startswith('uploads/'))
+        # Decoding at full size alone would take decoded_kb; the bounded path
+        # holds a 4096px decode plus the JPEG encoder's buffers (~90MB)
+        self.assertLess(result['peak_kb'], decoded_kb)
+
+
+class ImageUploadJobTests(FakeCloudinaryTestCase):
+    """Dashboard uploads are queued and processed by the image worker."""
+
+    def setUp(self):
+        super().setUp()
+        from django.contrib.auth.models import User
+
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.job_dir = Path(temp_dir.name)
+        job_dir_override = override_settings(IMAGE_UPLOAD_JOB_DIR=self.job_dir)
+        job_dir_override.enable()
+        self.addCleanup(job_dir_override.disable)
+        self.client.force_login(User.objects.create_user('editor'))
+
+    def image_file(self, name='photo.png'):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+
+        data = io.BytesIO()
+        Image.new('RGB', (64, 48), (10, 120, 200)).save(data, format='PNG')
+        return SimpleUploadedFile(name, data.getvalue(), content_type='image/png')
+
+    def post_image(self, name='photo.png'):
+        return self.client.post(reverse('dashboard:upload_image'), {'image': self.image_file(name)})
+
+    def test_upload_is_queued_then_processed_by_worker(self):
+        response = self.post_image()
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(self.server.uploads, [])
+        self.assertEqual(MediaAsset.objects.count(), 0)
+        status_url = response.json()['status_url']
+        self.assertEqual(self.client.get(status_url).json()['status'], 'pending')
+
+        self.assertEqual(image_jobs.run_pending_jobs(), (1, 0))
+
+        status = self.client.get(status_url).json()
+        self.assertEqual(status['status'], 'done')
+        self.assertEqual(status['id'], MediaAsset.objects.get(file_name='photo.png').id)
+        with urlopen(status['url']) as response:
+            self.assertEqual(response.headers['Content-Type'], 'image/webp')
+        asset = MediaAsset.objects.get()
+        self.assertEqual(asset.thumb_url, status['thumb_url'])
+        self.assertIn('card', asset.url_variants)
+        self.assertEqual(list(self.job_dir.iterdir()), [])
+
+    def test_failed_upload_reports_error(self):
+        self.server.fail_rate = 1.0
+        status_url = self.post_image().json()['status_url']
+
+        self.assertEqual(image_jobs.run_pending_jobs(), (0, 1))
+
+        status = self.client.get(status_url).json()
+        self.assertEqual(status['status'], 'failed')
+        self.assertIn('Simulated failure', status['error'])
+        self.assertEqual(MediaAsset.objects.count(), 0)
+
+    def test_job_is_claimed_once_and_stale_jobs_are_requeued(self):
+        self.post_image()
+        job = image_jobs.claim_next_job()
+        self.assertEqual(job.status, ImageUploadJob.PROCESSING)
+        self.assertIsNone(image_jobs.claim_next_job())
+
+        # A worker died mid-job: the claim is released after the timeout
+        self.assertEqual(image_jobs.requeue_stale_jobs(), 0)
+        ImageUploadJob.objects.filter(id=job.id).update(started_at=job.started_at - image_jobs.STALE_JOB_TIMEOUT * 2)
+        self.assertEqual(image_jobs.requeue_stale_jobs(), 1)
+        self.assertEqual(image_jobs.claim_next_job().attempts, 2)
+
+    def test_given_up_jobs_lose_their_spooled_files(self):
+        self.post_image()
+        job = image_jobs.claim_next_job()
+        ImageUploadJob.objects.filter(id=job.id).update(
+            attempts=image_jobs.MAX_JOB_ATTEMPTS, started_at=job.started_at - image_jobs.STALE_JOB_TIMEOUT * 2
+        )
+        self.assertEqual(image_jobs.requeue_stale_jobs(), 0)
+        self.assertEqual(ImageUploadJob.objects.get(id=job.id).status, ImageUploadJob.FAILED)
+        self.assertEqual(list(self.job_dir.iterdir()), [])
+
+    def run_with_public_ids(self, public_ids):
+        """Upload one queued file per public ID, with Cloudinary returning those IDs."""
+        for i in range(len(public_ids)):
+            self.post_image(f'photo-{i}.png')
+        results = iter([
+            {'secure_url': f'https://res.cloudinary.com/test/image/upload/v{i}/{public_id}.webp', 'public_id': public_id}
+            for i, public_id in enumerate(public_ids)
+        ])
+        with mock.patch.object(image_jobs, 'upload_to_cloudinary', side_effect=lambda *args, **kwargs: next(results)):
+            return image_jobs.run_pending_jobs(workers=1)
+
+    def test_reused_public_id_updates_the_existing_asset(self):
+        asset = MediaAsset.objects.create(
+            file_name='old.png', cloudinary_url='https://res.cloudinary.com/test/image/upload/v0/uploads/dup.png',
+            cloudinary_public_id='uploads/dup',
+        )
+        self.assertEqual(self.run_with_public_ids(['uploads/dup', 'uploads/new', 'uploads/dup']), (3, 0))
+
+        asset.refresh_from_db()
+        self.assertEqual((asset.file_name, asset.cloudinary_url), (
+            'photo-2.png', 'https://res.cloudinary.com/test/image/upload/v2/uploads/dup.webp'
+        ))
+        self.assertEqual(MediaAsset.objects.count(), 2)
+        self.assertEqual(
+            list(ImageUploadJob.objects.order_by('id').values_list('status', 'media_asset__cloudinary_public_id')),
+            [('done', 'uploads/dup'), ('done', 'uploads/new'), ('done', 'uploads/dup')],
+        )
+
+    def test_conflicting_insert_fails_only_that_job(self):
+        MediaAsset.objects.create(file_name='taken.png', cloudinary_url='https://x/taken', cloudinary_public_id='uploads/taken')
+        # Another worker saved the public ID after this batch looked it up
+        with mock.patch.object(image_jobs, 'find_assets', return_value={}):
+            self.assertEqual(self.run_with_public_ids(['uploads/free', 'uploads/taken']), (1, 1))
+
+        free, taken = ImageUploadJob.objects.order_by('id')
+        self.assertEqual((free.status, free.media_asset.cloudinary_public_id), ('done', 'uploads/free'))
+        self.assertEqual((taken.status, taken.media_asset), ('failed', None))
+        self.assertIn('uploads/taken was saved by another upload', taken.error)
+        self.assertEqual(MediaAsset.objects.count(), 2)
+        self.assertEqual(list(self.job_dir.iterdir()), [])
+
+    def test_worker_survives_database_errors_and_requeues_periodically(self):
+        from django.db import OperationalError
+        from myApp.management.commands import run_image_worker
+
+        outcomes = [OperationalError('server closed the connection'), (1, 0), KeyboardInterrupt]
+        out, err = io.StringIO(), io.StringIO()
+        with mock.patch.object(run_image_worker, 'run_pending_jobs', side_effect=outcomes), \
+                mock.patch.object(run_image_worker, 'requeue_stale_jobs', return_value=0) as requeue, \
+                mock.patch.object(run_image_worker, 'REQUEUE_INTERVAL', 0):
+            call_command('run_image_worker', poll_interval=0, stdout=out, stderr=err)
+
+        self.assertIn('server closed the connection', err.getvalue())
+        self.assertIn('1 succeeded', out.getvalue())
+        self.assertIn('Image worker stopped', out.getvalue())
+        self.assertEqual(requeue.call_count, 4)  # at startup and before each of the three polls
+
+    def test_batch_upload_processes_files_together(self):
+        names = [f'shoot-{i}.png' for i in range(6)]
+        with self.assertNumQueries(1 + 2):  # session/user lookups + one bulk insert
+            response = self.client.post(reverse('dashboard:upload_images'), {
+                'image': [self.image_file(name) for name in names], 'folder': 'shoot',
+            })
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual([result['file_name'] for result in response.json()['results']], names)
+        status_url = response.json()['status_url']
+
+        # One file goes missing before the worker gets to it
+        Path(ImageUploadJob.objects.get(file_name='shoot-5.png').source_path).unlink()
+
+        with mock.patch.object(MediaAsset.objects, 'bulk_create', wraps=MediaAsset.objects.bulk_create) as bulk_create:
+            self.assertEqual(image_jobs.run_pending_jobs(batch_size=10, workers=4), (5, 1))
+            self.assertEqual(bulk_create.call_count, 1)
+
+        results = self.client.get(status_url).json()['results']
+        self.assertEqual([result['status'] for result in results], ['done'] * 5 + ['failed'])
+        self.assertEqual(len(self.server.uploads), 5)
+        self.assertCountEqual(MediaAsset.objects.values_list('file_name', flat=True), names[:5])
+
+
+class GalleryPaginationTests(TestCase):
+    """The gallery JSON API pages through assets with a (uploaded_at, id) cursor."""
+
+    def setUp(self):
+        from django.contrib.auth.models import User
+
+        self.client.force_login(User.objects.create_user('editor'))
+        MediaAsset.objects.bulk_create([
+            MediaAsset(original_path=f'{i}.jpg', file_name=f'image-{i}.jpg',
+                       cloudinary_url=f'https://res.cloudinary.com/test/image/upload/v1/{i}.jpg')
+            for i in range(7)
+        ])
+        # Several rows sharing a timestamp must not be skipped or repeated across pages
+        first = MediaAsset.objects.order_by('id').first()
+        MediaAsset.objects.filter(id__lte=first.id + 3).update(uploaded_at=first.uploaded_at)
+
+    def fetch(self, **params):
+        return self.client.get(reverse('dashboard:gallery'), dict(params, format='json')).json()
+
+    def test_cursor_walks_every_asset_once_newest_first(self):
+        expected = list(MediaAsset.objects.order_by('-uploaded_at', '-id').values_list('id', flat=True))
+        seen = []
+        data = self.fetch(limit=3)
+        while True:
+            self.assertLessEqual(len(data['images']), 3)
+            seen += [image['id'] for image in data['images']]
+            if not data['next_cursor']:
+                break
+            with self.assertNumQueries(3):  # session + user + one page query
+                data = self.fetch(limit=3, cursor=data['next_cursor'])
+        self.assertEqual(seen, expected)
+
+    def test_page_reads_backfilled_url_variants_and_searches(self):
+        data = self.fetch(search='image-4')
+        self.assertEqual([image['file_name'] for image in data['images']], ['image-4.jpg'])
+        self.assertIsNone(data['next_cursor'])
+        # Rows created without variants fall back to the original URL until backfilled
+        self.assertEqual(data['images'][0]['thumb_url'], data['images'][0]['cloudinary_url'])
+
+        call_command('backfill_url_variants', stdout=io.StringIO())
+        image = self.fetch(search='image-4')['images'][0]
+        self.assertIn('/upload/c_thumb,w_300,h_300,q_80/', image['thumb_url'])
+        self.assertIn('/upload/f_webp,q_80,w_1920/', image['web_url'])
+        self.assertEqual(set(image['variants']), set(settings.CLOUDINARY_URL_VARIANTS))
+        self.assertEqual(self.fetch(cursor='not-a-cursor', limit=500)['images'][-1]['file_name'], 'image-0.jpg')
+
+
+class CloudinaryUrlBuilderTests(TestCase):
+    """The memoized URL builder matches the SDK without calling it per URL."""
+
+    public_ids = ['hero', 'uploads/b c~', 'uploads/nested/photo.jpg', 'v12/uploads/versioned']
+
+    def setUp(self):
+        cloudinary.config(cloud_name='test', secure=True)
+        cloudinary_urls.clear_url_cache()
+        self.addCleanup(cloudinary_urls.clear_url_cache)
+        self.addCleanup(cloudinary.reset_config)
+
+    def assert_urls_match_sdk(self):
+        presets = cloudinary_urls.get_presets()
+        urls = cloudinary_urls.build_urls(self.public_ids)
+        for public_id in self.public_ids:
+            for name, transformation in presets.items():
+                options = {'raw_transformation': transformation} if transformation else {}
+                self.assertEqual(urls[public_id][name], cloudinary.utils.cloudinary_url(public_id, **options)[0])
+
+    def test_urls_match_sdk_for_every_preset(self):
+        self.assert_urls_match_sdk()
+
+    def test_urls_match_sdk_with_sharded_cdn_hosts(self):
+        for secure in (False, True):
+            cloudinary.config(cdn_subdomain=True, secure=secure)
+            self.assert_urls_match_sdk()
+        self.assertIn('res-', cloudinary_urls.build_url('hero'))
+
+    def test_urls_are_cached_per_public_id_and_preset(self):
+        with mock.patch('cloudinary.utils.cloudinary_url', wraps=cloudinary.utils.cloudinary_url) as sdk:
+            cloudinary_urls.build_urls(self.public_ids)
+            cloudinary_urls.build_urls(self.public_ids, ['thumb'])
+        self.assertEqual(sdk.call_count, 1)  # Only the delivery prefix
+        info = cloudinary_urls._build_url.cache_info()
+        self.assertEqual(info.misses, len(self.public_ids) * len(cloudinary_urls.get_presets()))
+        self.assertEqual(info.hits, len(self.public_ids))
+
+        urls = cloudinary_utils.get_cloudinary_urls('photo', folder='uploads')
+        self.assertIn('/upload/c_thumb,w_300,h_300,q_80/v1/uploads/photo', urls['thumbnail'])
+        self.assertTrue(urls['secure'].startswith('https://'))
+
+    def test_gallery_builds_variants_for_rows_not_backfilled(self):
+        from django.contrib.auth.models import User
+
+        self.client.force_login(User.objects.create_user('editor'))
+        MediaAsset.objects.create(
+            file_name='photo.jpg', cloudinary_public_id='uploads/photo',
+            cloudinary_url='https://res.cloudinary.com/test/image/upload/v1/uploads/photo'
+        )
+        image = self.client.get(reverse('dashboard:gallery'), {'format': 'json'}).json()['images'][0]
+        self.assertEqual(image['thumb_url'], cloudinary_urls.build_url('uploads/photo', 'thumb'))
+        self.assertEqual(set(image['variants']), set(settings.CLOUDINARY_URL_VARIANTS))
+
+        response = self.client.get(reverse('dashboard:gallery'))
+        self.assertContains(response, f'src="{cloudinary_urls.build_url("uploads/photo", "thumb")}"')
+        self.assertContains(response, f"copyToClipboard('{cloudinary_urls.build_url('uploads/photo')}')")
+
+        # Without a cloud name the stored URL is shown instead
+        cloudinary.reset_config()
+        cloudinary.config(cloud_name=None)
+        self.assertContains(self.client.get(reverse('dashboard:gallery')), 'src="https://res.cloudinary.com/test/')
+
+
+class ImageDeliveryTests(TestCase):
+    """The local delivery endpoint applies Cloudinary transformations and caches the results."""
+
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.cache_dir = Path(temp_dir.name) / 'cache'
+        originals = Path(temp_dir.name) / 'originals'
+        (originals / 'uploads').mkdir(parents=True)
+        Image.linear_gradient('L').resize((800, 600)).convert('RGB').save(originals / 'uploads' / 'photo.jpg')
+
+        delivery_override = override_settings(
+            IMAGE_DELIVERY_ROOT=originals, IMAGE_TRANSFORM_CACHE_DIR=self.cache_dir, IMAGE_DELIVERY_MODE='local'
+        )
+        delivery_override.enable()
+        self.addCleanup(delivery_override.disable)
+        cloudinary_urls.clear_url_cache()
+        self.addCleanup(cloudinary_urls.clear_url_cache)
+
+    def fetch(self, url, **headers):
+        response = self.client.get(url, headers=headers)
+        content = b''.join(response.streaming_content) if response.streaming else response.content
+        return response, content
+
+    def test_thumbnail_is_rendered_once_and_cached_immutably(self):
+        url = cloudinary_urls.build_url('uploads/photo', 'thumb')
+        self.assertEqual(url, '/images/upload/c_thumb,w_300,h_300,q_80/v1/uploads/photo')
+
+        response, content = self.fetch(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('immutable', response['Cache-Control'])
+        with Image.open(io.BytesIO(content)) as img:
+            self.assertEqual((img.format, img.size), ('JPEG', (300, 300)))
+
+        with mock.patch.object(image_delivery, 'render_derivative') as render:
+            cached, cached_content = self.fetch(url)
+            not_modified, _ = self.fetch(url, if_none_match=response['ETag'])
+        render.assert_not_called()
+        self.assertEqual(cached_content, content)
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(len(list(self.cache_dir.rglob('*.jpg'))), 1)
+
+    def test_auto_format_follows_accept_and_limit_never_upscales(self):
+        url = cloudinary_urls.build_url('uploads/photo', 'hero')
+        response, content = self.fetch(url, accept='image/webp,*/*')
+        self.assertIn('Accept', response['Vary'])
+        with Image.open(io.BytesIO(content)) as img:
+            self.assertEqual((img.format, img.size), ('WEBP', (800, 600)))
+
+        _, content = self.fetch(url, accept='image/jpeg')
+        with Image.open(io.BytesIO(content)) as img:
+            self.assertEqual(img.format, 'JPEG')
+
+    def test_stored_variants_point_at_local_endpoint(self):
+        fields = cloudinary_utils.get_asset_url_fields(
+            'https://res.cloudinary.com/test/image/upload/v1712/uploads/photo.jpg'
+        )
+        self.assertEqual(fields['thumb_url'], '/images/upload/c_thumb,w_300,h_300,q_80/v1712/uploads/photo.jpg')
+        response, content = self.fetch(fields['web_url'])
+        self.assertEqual(response['Content-Type'], 'image/webp')
+
+    def test_bad_requests(self):
+        self.assertEqual(self.fetch('/images/upload/e_sepia/uploads/photo.jpg')[0].status_code, 400)
+        self.assertEqual(self.fetch('/images/upload/w_99999/uploads/photo.jpg')[0].status_code, 400)
+        self.assertEqual(self.fetch('/images/upload/c_thumb,w_300,h_300,q_80/uploads/missing.jpg')[0].status_code, 404)
+        self.assertEqual(self.fetch('/images/upload/c_thumb,w_300,h_300,q_80/../../etc/passwd')[0].status_code, 404)
+
+    def test_only_named_transformations_are_rendered(self):
+        # Same parameters as the thumb preset in another order: the same derivative
+        self.assertEqual(self.fetch('/images/upload/q_80,w_300,h_300,c_thumb/uploads/photo.jpg')[0].status_code, 200)
+        self.assertEqual(self.fetch('/images/upload/uploads/photo.jpg')[0].status_code, 200)
+        for transformation in ('w_301', 'c_thumb,w_300,h_300,q_81', 'c_fill,w_640,h_480,q_auto'):
+            with self.subTest(transformation):
+                response, content = self.fetch(f'/images/upload/{transformation}/uploads/photo.jpg')
+                self.assertEqual(response.status_code, 400)
+                self.assertIn(b'named transformations', content)
+        self.assertEqual(len(list(self.cache_dir.rglob('*.jpg'))), 2)
+
+
+@unittest.skipUnless(media_search.has_search_index(), 'needs PostgreSQL or SQLite with FTS5 trigrams')
+class MediaSearchTests(TestCase):
+    """Gallery search goes through the search index and ranks by relevance."""
+
+    def create(self, file_name, original_path='', public_id=None):
+        return MediaAsset.objects.create(
+            file_name=file_name, original_path=original_path, cloudinary_public_id=public_id,
+            cloudinary_url=f'https://res.cloudinary.com/test/image/upload/v1/{file_name}'
+        )
+
+    def search(self, query):
+        return list(media_search.search_media_assets(MediaAsset.objects.all(), query).values_list('file_name', flat=True))
+
+    def test_matches_every_field_ranked_by_relevance(self):
+        self.create('retreat-morning-session-with-the-whole-group-yoga.jpg')
+        self.create('yoga.jpg')
+        self.create('beach.jpg', original_path='yoga/beach.jpg')
+        self.create('portrait.jpg', public_id='uploads/YogaPortrait')
+        self.create('unrelated.jpg')
+
+        results = self.search('YOGA')
+        self.assertEqual(results[0], 'yoga.jpg')
+        self.assertCountEqual(results, [
+            'yoga.jpg', 'retreat-morning-session-with-the-whole-group-yoga.jpg', 'beach.jpg', 'portrait.jpg',
+        ])
+
+    def test_index_follows_bulk_writes_updates_and_deletes(self):
+        MediaAsset.objects.bulk_create([MediaAsset(file_name='sunrise.jpg', cloudinary_url='https://x/upload/a')])
+        asset = self.create('sunset.jpg')
+        self.assertEqual(self.search('sunrise'), ['sunrise.jpg'])
+
+        MediaAsset.objects.filter(id=asset.id).update(file_name='moonrise.jpg')
+        self.assertEqual(self.search('sunset'), [])
+        self.assertEqual(self.search('moonrise'), ['moonrise.jpg'])
+
+        asset.delete()
+        self.assertEqual(self.search('rise.jpg'), ['sunrise.jpg'])
+
+    def test_short_queries_fall_back_to_icontains(self):
+        self.create('a1.jpg')
+        self.assertEqual(self.search('a1'), ['a1.jpg'])
+
+    @unittest.skipUnless(connection.vendor == 'sqlite', 'SQLite trigger recovery')
+    def test_missing_triggers_are_recreated_and_reindexed(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DROP TRIGGER {media_search.SEARCH_TABLE}_ai')
+        self.create('lotus.jpg')
+        self.assertEqual(self.search('lotus'), [])
+
+        media_search.ensure_search_index()
+        self.assertEqual(self.search('lotus'), ['lotus.jpg'])
@@ -4,4 +4,5 @@ from . import views
 urlpatterns = [
     path('', views.home, name='home'),
     path('about/', views.about, name='about'),
+    path('images/upload/<path:path>', views.image_delivery, name='image_delivery'),
 ]
\ No newline at end of file
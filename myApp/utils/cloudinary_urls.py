@@ -0,0 +1,148 @@
+"""
+Memoized Cloudinary delivery URL builder.
+
+cloudinary.utils.cloudinary_url re-reads the configuration and re-parses its
+options on every call. Delivery URLs only differ by public ID and
+transformation, so the prefix is worked out once per configuration through the
+SDK, each URL is assembled by string concatenation, and results are kept in an
+LRU cache keyed by (public_id, preset).
+
+With cdn_subdomain (or secure_cdn_subdomain) the SDK spreads images over
+res-1 to res-5 hosts by public ID, so no shared prefix exists; URLs are then
+built by the SDK itself, still behind the same cache.
+"""
+
+import re
+from functools import lru_cache
+import cloudinary
+import cloudinary.utils
+from django.conf import settings
+
+URL_CACHE_SIZE = 32768  # Distinct (public_id, preset) URLs kept in memory
+ORIGINAL = 'original'  # Preset name for the untransformed URL
+
+# Public IDs in folders get a version segment, as the SDK does with force_version
+VERSIONED_PUBLIC_ID = re.compile(r'^v\d+/')
+
+
+def get_presets():
+    """Named transformations, plus ORIGINAL for no transformation."""
+    from .cloudinary_utils import DEFAULT_URL_VARIANTS
+    presets = {ORIGINAL: ''}
+    presets.update(getattr(settings, 'CLOUDINARY_URL_VARIANTS', DEFAULT_URL_VARIANTS))
+    return presets
+
+
+@lru_cache(maxsize=16)
+def _delivery_prefix(config_key):
+    # Let the SDK apply cname, private CDN and secure settings once, for a sentinel ID
+    url = cloudinary.utils.cloudinary_url('x')[0]
+    return url[:-1]
+
+
+@lru_cache(maxsize=1)
+def _local_prefix():
+    from django.urls import reverse
+    return reverse('image_delivery', args=['x'])[:-1]
+
+
+def is_local_delivery():
+    """Whether images are served by the app's own delivery endpoint (IMAGE_DELIVERY_MODE=local)."""
+    return getattr(settings, 'IMAGE_DELIVERY_MODE', 'cloudinary') == 'local'
+
+
+def is_configured():
+    """Whether delivery URLs can be built: local delivery, or a Cloudinary cloud name is set."""
+    return is_local_delivery() or bool(cloudinary.config().cloud_name)
+
+
+class ShardedHosts(tuple):
+    """Stands in for the prefix when the SDK picks a CDN host per public ID; holds the config key."""
+
+
+def delivery_prefix():
+    """
+    Delivery URL prefix ending in /upload/ for the current Cloudinary configuration.
+
+    Returns a ShardedHosts key instead when cdn_subdomain is on, as the host
+    then depends on the public ID.
+    """
+    if is_local_delivery():
+        return _local_prefix()
+    config = cloudinary.config()
+    config_key = (
+        config.cloud_name, config.secure, config.cname, config.private_cdn,
+        config.secure_distribution, config.cdn_subdomain, config.secure_cdn_subdomain,
+    )
+    if config.cdn_subdomain or config.secure_cdn_subdomain:
+        return ShardedHosts(config_key)
+    return _delivery_prefix(config_key)
+
+
+@lru_cache(maxsize=URL_CACHE_SIZE)
+def _build_url(prefix, public_id, transformation):
+    if isinstance(prefix, ShardedHosts):
+        options = {'raw_transformation': transformation} if transformation else {}
+        return cloudinary.utils.cloudinary_url(public_id, **options)[0]
+    path = cloudinary.utils.smart_escape(public_id)
+    if '/' in public_id and not VERSIONED_PUBLIC_ID.match(public_id):
+        path = 'v1/' + path
+    return f'{prefix}{transformation}/{path}' if transformation else prefix + path
+
+
+def build_url(public_id, preset=ORIGINAL):
+    """
+    Build the delivery URL of one image for a named preset.
+
+    Args:
+        public_id: Cloudinary public ID
+        preset: Name from CLOUDINARY_URL_VARIANTS, or ORIGINAL
+
+    Returns:
+        Delivery URL string
+    """
+    return _build_url(delivery_prefix(), public_id, get_presets()[preset])
+
+
+def build_urls(public_ids, presets=None):
+    """
+    Build the delivery URLs of many images for several presets in one pass.
+
+    The configuration and presets are resolved once for the whole batch.
+
+    Args:
+        public_ids: Iterable of Cloudinary public IDs
+        presets: Preset names (defaults to every preset)
+
+    Returns:
+        Dictionary mapping public_id to a {preset: url} dictionary
+    """
+    prefix = delivery_prefix()
+    all_presets = get_presets()
+    transformations = [(name, all_presets[name]) for name in (presets or all_presets)]
+    return {
+        public_id: {name: _build_url(prefix, public_id, transformation) for name, transformation in transformations}
+        for public_id in public_ids
+    }
+
+
+def rebase_url(url):
+    """
+    Point a stored Cloudinary delivery URL at the app's delivery endpoint in local mode.
+
+    Args:
+        url: Cloudinary delivery URL
+
+    Returns:
+        The equivalent local URL in local mode, otherwise url unchanged
+    """
+    if not is_local_delivery() or '/image/upload/' not in url:
+        return url
+    return delivery_prefix() + url.split('/image/upload/', 1)[1]
+
+
+def clear_url_cache():
+    """Forget cached URLs, e.g. after changing the Cloudinary configuration in tests."""
+    _build_url.cache_clear()
+    _delivery_prefix.cache_clear()
+    _local_prefix.cache_clear()
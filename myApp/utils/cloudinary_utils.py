@@ -4,17 +4,147 @@ Cloudinary utility functions for image upload and optimization.
 
 import os
 import io
+import shutil
+import tempfile
+from contextlib import ExitStack, contextmanager
 from PIL import Image
 import cloudinary
 import cloudinary.uploader
 from django.conf import settings
+from .cloudinary_urls import ORIGINAL, build_urls, rebase_url
 
 # Compression settings
 MAX_BYTES = 10 * 1024 * 1024  # 10MB
 TARGET_BYTES = int(MAX_BYTES * 0.93)  # 9.3MB (slightly under limit)
+PREDICTIVE_SAMPLE_PIXELS = 256 * 256  # Pixel budget of the sample used to model size vs quality
+PREDICTIVE_MAX_CONFIRMS = 3  # Full encodes tried before settling or falling back to binary search
+PREDICTIVE_TOLERANCE = 0.9  # A confirmed encode this close to the target ends the search
+MAX_UPLOAD_DIMENSION = 4096  # Longest side kept when decoding uploads, bounding decoded memory
+SPOOL_CHUNK_SIZE = 64 * 1024  # Chunk size used when spooling uploads to disk
+UPLOAD_CHUNK_SIZE = 6 * 1024 * 1024  # Chunk size streamed to Cloudinary (its minimum is 5MB)
 
+# Named transformations used when settings.CLOUDINARY_URL_VARIANTS is not set
+DEFAULT_URL_VARIANTS = {
+    'web': 'f_webp,q_80,w_1920',
+    'thumb': 'c_thumb,w_300,h_300,q_80',
+}
 
-def smart_compress_to_bytes(image_file, max_bytes=MAX_BYTES, target_bytes=TARGET_BYTES, quality=85):
+
+def _encode_jpeg(img, quality, stats=None, stat_key='full_encodes'):
+    """
+    Encode an image as optimized JPEG.
+    
+    Args:
+        img: PIL image in RGB or L mode
+        quality: JPEG quality
+        stats: Optional dict whose stat_key counter is incremented
+        stat_key: Counter to increment in stats
+    
+    Returns:
+        BytesIO object positioned at the end of the data
+    """
+    output = io.BytesIO()
+    img.save(output, format='JPEG', quality=quality, optimize=True)
+    if stats is not None:
+        stats[stat_key] = stats.get(stat_key, 0) + 1
+    return output
+
+
+def _binary_search_quality(img, target_bytes, min_quality, max_quality, best_output, stats=None):
+    """
+    Find the highest quality whose full encode fits target_bytes.
+    
+    Returns:
+        BytesIO of the best encode found, or best_output if none fit
+    """
+    while min_quality <= max_quality:
+        mid_quality = (min_quality + max_quality) // 2
+        
+        try:
+            output = _encode_jpeg(img, mid_quality, stats)
+            size = output.tell()
+            
+            if size <= target_bytes:
+                best_output = output
+                min_quality = mid_quality + 1
+            else:
+                max_quality = mid_quality - 1
+        except Exception:
+            max_quality = mid_quality - 1
+    
+    return best_output
+
+
+def _predictive_search_quality(img, target_bytes, min_quality, max_quality, full_size, stats=None):
+    """
+    Pick a quality from a downscaled sample, then confirm it with full encodes.
+    
+    Sample encodes are cheap, so they are used to search the quality range.
+    Each full encode calibrates the full/sample size ratio at its quality, and
+    the ratio for other qualities is interpolated between calibrated points.
+    The search stops once a confirmed encode lands within
+    PREDICTIVE_TOLERANCE of the target or PREDICTIVE_MAX_CONFIRMS full encodes
+    have been made.
+    
+    Returns:
+        Tuple of (BytesIO or None, highest quality known to be too large)
+    """
+    factor = (PREDICTIVE_SAMPLE_PIXELS / (img.size[0] * img.size[1])) ** 0.5
+    sample = img.resize(
+        (max(1, int(img.size[0] * factor)), max(1, int(img.size[1] * factor))),
+        Image.Resampling.BILINEAR
+    )
+    sample_sizes = {}
+    
+    def sample_size(q):
+        if q not in sample_sizes:
+            sample_sizes[q] = _encode_jpeg(sample, q, stats, 'sample_encodes').tell()
+        return sample_sizes[q]
+    
+    ratios = {max_quality: full_size / sample_size(max_quality)}
+    
+    def predicted_size(q):
+        lower = max((c for c in ratios if c <= q), default=None)
+        upper = min((c for c in ratios if c >= q), default=None)
+        if lower is None or upper is None or lower == upper:
+            ratio = ratios[lower if lower is not None else upper]
+        else:
+            weight = (q - lower) / (upper - lower)
+            ratio = ratios[lower] + (ratios[upper] - ratios[lower]) * weight
+        return sample_size(q) * ratio
+    
+    best_output, best_quality, too_large = None, min_quality - 1, max_quality
+    
+    for _ in range(PREDICTIVE_MAX_CONFIRMS):
+        # Highest untried quality whose predicted full size fits
+        low, high, guess = best_quality + 1, too_large - 1, None
+        while low <= high:
+            mid = (low + high) // 2
+            if predicted_size(mid) <= target_bytes:
+                guess, low = mid, mid + 1
+            else:
+                high = mid - 1
+        if guess is None:
+            if best_output is not None or best_quality + 1 > too_large - 1:
+                break
+            guess = best_quality + 1
+        
+        output = _encode_jpeg(img, guess, stats)
+        size = output.tell()
+        ratios[guess] = size / sample_size(guess)
+        
+        if size <= target_bytes:
+            best_output, best_quality = output, guess
+            if size >= target_bytes * PREDICTIVE_TOLERANCE:
+                break
+        else:
+            too_large = guess
+    
+    return best_output, too_large
+
+
+def smart_compress_to_bytes(image_file, max_bytes=MAX_BYTES, target_bytes=TARGET_BYTES, quality=85,
+                            search='predictive', stats=None, max_dimension=None):
     """
     Intelligently compress an image to fit within size limits while preserving quality.
     
@@ -23,6 +153,12 @@ def smart_compress_to_bytes(image_file, max_bytes=MAX_BYTES, target_bytes=TARGET
         max_bytes: Maximum allowed size in bytes
         target_bytes: Target size to compress to
         quality: Starting quality (85-95 recommended)
+        search: 'predictive' to pick the quality from a downscaled sample and
+            confirm it with one full encode, or 'binary' to binary search with
+            full encodes
+        stats: Optional dict that receives 'full_encodes' and 'sample_encodes' counts
+        max_dimension: Optional longest side; larger images are scaled down while
+            decoding (JPEG draft mode, then reduce) so the full size is never in memory
     
     Returns:
         BytesIO object containing compressed image
@@ -34,6 +170,10 @@ def smart_compress_to_bytes(image_file, max_bytes=MAX_BYTES, target_bytes=TARGET
         img = Image.open(image_file)
         image_file.seek(0)  # Reset file pointer
     
+    if max_dimension and max(img.size) > max_dimension:
+        # thumbnail() uses draft() for JPEG and reduce() before resampling
+        img.thumbnail((max_dimension, max_dimension), Image.Resampling.LANCZOS)
+    
     # Convert RGBA to RGB if necessary (JPEG doesn't support transparency)
     if img.mode in ('RGBA', 'LA', 'P'):
         # Create white background
@@ -52,8 +192,7 @@ def smart_compress_to_bytes(image_file, max_bytes=MAX_BYTES, target_bytes=TARGET
         img = img.convert('RGB')
     
     # Get initial size
-    output = io.BytesIO()
-    img.save(output, format='JPEG', quality=quality, optimize=True)
+    output = _encode_jpeg(img, quality, stats)
     current_size = output.tell()
     
     # If already under target, return
@@ -61,49 +200,84 @@ def smart_compress_to_bytes(image_file, max_bytes=MAX_BYTES, target_bytes=TARGET
         output.seek(0)
         return output
     
-    # Binary search for optimal quality
     min_quality = 30
     max_quality = quality
     best_output = output
     
-    while min_quality <= max_quality:
-        mid_quality = (min_quality + max_quality) // 2
-        output = io.BytesIO()
-        
-        try:
-            img.save(output, format='JPEG', quality=mid_quality, optimize=True)
-            size = output.tell()
-            
-            if size <= target_bytes:
-                best_output = output
-                min_quality = mid_quality + 1
-            else:
-                max_quality = mid_quality - 1
-        except Exception:
-            max_quality = mid_quality - 1
+    # Sampling only pays off when the sample is much smaller than the image
+    if search == 'predictive' and img.size[0] * img.size[1] > PREDICTIVE_SAMPLE_PIXELS * 4:
+        predicted_output, too_large = _predictive_search_quality(
+            img, target_bytes, min_quality, max_quality, current_size, stats
+        )
+        if predicted_output is not None:
+            best_output = predicted_output
+        else:
+            # Every confirm overshot; finish with full encodes below the last miss
+            best_output = _binary_search_quality(img, target_bytes, min_quality, too_large - 1, best_output, stats)
+    else:
+        # Binary search for optimal quality
+        best_output = _binary_search_quality(img, target_bytes, min_quality, max_quality, best_output, stats)
     
     # If still too large, resize image
-    best_output.seek(0)
-    if best_output.tell() > max_bytes:
+    if len(best_output.getbuffer()) > max_bytes:
         # Calculate resize factor
-        factor = (max_bytes / best_output.tell()) ** 0.5
+        factor = (max_bytes / len(best_output.getbuffer())) ** 0.5
         new_size = (int(img.size[0] * factor), int(img.size[1] * factor))
         img = img.resize(new_size, Image.Resampling.LANCZOS)
         
         # Recompress at good quality
-        output = io.BytesIO()
-        img.save(output, format='JPEG', quality=85, optimize=True)
-        best_output = output
+        best_output = _encode_jpeg(img, 85, stats)
     
     best_output.seek(0)
     return best_output
 
 
+@contextmanager
+def spooled_upload(image_file):
+    """
+    Make an upload available as a file on disk without reading it into memory.
+    
+    Args:
+        image_file: File-like object, path, or bytes
+    
+    Yields:
+        Path to a file with the upload's contents; temporary copies are removed on exit
+    """
+    if isinstance(image_file, str):
+        yield image_file
+        return
+    
+    # Django keeps large uploads in a temporary file already
+    if hasattr(image_file, 'temporary_file_path'):
+        yield image_file.temporary_file_path()
+        return
+    
+    spool = tempfile.NamedTemporaryFile(prefix='upload_', delete=False)
+    try:
+        with spool:
+            if isinstance(image_file, bytes):
+                spool.write(image_file)
+            elif hasattr(image_file, 'chunks'):
+                for chunk in image_file.chunks(SPOOL_CHUNK_SIZE):
+                    spool.write(chunk)
+            else:
+                if hasattr(image_file, 'seek'):
+                    image_file.seek(0)
+                shutil.copyfileobj(image_file, spool, SPOOL_CHUNK_SIZE)
+        yield spool.name
+    finally:
+        os.remove(spool.name)
+
+
 def upload_to_cloudinary(image_file, folder='uploads', public_id=None, 
                          compress=True, convert_to_webp=True):
     """
     Upload image to Cloudinary with smart compression and optimization.
     
+    The upload is spooled to disk, decoded at no more than MAX_UPLOAD_DIMENSION
+    on its longest side, and streamed to Cloudinary in chunks, so memory use
+    does not grow with the size of the original file.
+    
     Args:
         image_file: File-like object, path, or bytes
         folder: Cloudinary folder path
@@ -115,57 +289,38 @@ def upload_to_cloudinary(image_file, folder='uploads', public_id=None,
         Dictionary with upload result including URLs
     """
     try:
-        # Prepare file for upload
-        if isinstance(image_file, bytes):
-            file_obj = io.BytesIO(image_file)
-        elif isinstance(image_file, str):
-            # It's a file path
-            with open(image_file, 'rb') as f:
-                file_obj = io.BytesIO(f.read())
-        else:
-            # It's a file-like object
-            file_obj = image_file
-            if hasattr(file_obj, 'seek'):
-                file_obj.seek(0)
-        
-        # Compress if needed
-        if compress:
-            file_obj = smart_compress_to_bytes(file_obj)
-        
-        # Upload options
-        upload_options = {
-            'resource_type': 'image',
-            'folder': folder,
-        }
-        
-        if convert_to_webp:
-            upload_options['format'] = 'webp'
-            upload_options['quality'] = 'auto:good'
-        
-        if public_id:
-            upload_options['public_id'] = public_id
-        
-        # Upload to Cloudinary
-        result = cloudinary.uploader.upload(
-            file_obj,
-            **upload_options
-        )
-        
-        # Generate URL variants
-        secure_url = result.get('secure_url', result.get('url', ''))
-        
-        # Web-optimized URL (if not already WebP)
-        if convert_to_webp and 'webp' not in secure_url.lower():
-            web_url = secure_url.replace('/upload/', '/upload/f_webp,q_80,w_1920/')
-        else:
-            web_url = secure_url.replace('/upload/', '/upload/q_80,w_1920/')
-        
-        # Thumbnail URL
-        thumb_url = secure_url.replace('/upload/', '/upload/c_thumb,w_300,h_300,q_80/')
+        with ExitStack() as stack:
+            # Prepare file for upload
+            upload_path = stack.enter_context(spooled_upload(image_file))
+            
+            # Compress if needed
+            if compress:
+                compressed = smart_compress_to_bytes(upload_path, max_dimension=MAX_UPLOAD_DIMENSION)
+                upload_path = stack.enter_context(spooled_upload(compressed))
+                del compressed
+            
+            # Upload options
+            upload_options = {
+                'resource_type': 'image',
+                'folder': folder,
+            }
+            
+            if convert_to_webp:
+                upload_options['format'] = 'webp'
+                upload_options['quality'] = 'auto:good'
+            
+            if public_id:
+                upload_options['public_id'] = public_id
+            
+            # Upload to Cloudinary, streaming the file in chunks
+            result = cloudinary.uploader.upload_large(
+                upload_path,
+                chunk_size=UPLOAD_CHUNK_SIZE,
+                **upload_options
+            )
         
-        # Add custom URL variants to result
-        result['web_url'] = web_url
-        result['thumb_url'] = thumb_url
+        # Add the web_url/thumb_url/url_variants stored on MediaAsset to the result
+        result.update(get_asset_url_fields(result.get('secure_url', result.get('url', ''))))
         
         return result
         
@@ -173,6 +328,51 @@ def upload_to_cloudinary(image_file, folder='uploads', public_id=None,
         raise Exception(f"Error uploading to Cloudinary: {str(e)}")
 
 
+def build_url_variants(url, transformations=None):
+    """
+    Build named transformation URLs for a stored Cloudinary URL.
+    
+    This is plain string work on the delivery URL, so it needs no SDK call.
+    With IMAGE_DELIVERY_MODE=local the variants point at the app's own
+    delivery endpoint instead of Cloudinary.
+    
+    Args:
+        url: Cloudinary delivery URL
+        transformations: Optional name -> transformation string mapping
+            (defaults to settings.CLOUDINARY_URL_VARIANTS)
+    
+    Returns:
+        Dictionary mapping each name to its URL; non-Cloudinary URLs are returned unchanged
+    """
+    if transformations is None:
+        transformations = getattr(settings, 'CLOUDINARY_URL_VARIANTS', DEFAULT_URL_VARIANTS)
+    url = rebase_url(url)
+    if '/upload/' not in url:
+        return {name: url for name in transformations}
+    return {
+        name: url.replace('/upload/', f'/upload/{transformation}/', 1)
+        for name, transformation in transformations.items()
+    }
+
+
+def get_asset_url_fields(url):
+    """
+    Precomputed URL fields for a MediaAsset, so pages only read columns.
+    
+    Args:
+        url: Cloudinary delivery URL
+    
+    Returns:
+        Dictionary with web_url, thumb_url and url_variants
+    """
+    variants = build_url_variants(url)
+    return {
+        'web_url': variants.get('web', url),
+        'thumb_url': variants.get('thumb', url),
+        'url_variants': variants,
+    }
+
+
 def get_cloudinary_urls(public_id, folder=None):
     """
     Generate multiple URL variants for a Cloudinary image.
@@ -189,12 +389,12 @@ def get_cloudinary_urls(public_id, folder=None):
     else:
         full_public_id = public_id
     
-    base_url = cloudinary.utils.cloudinary_url(full_public_id)[0]
+    urls = build_urls([full_public_id], [ORIGINAL, 'web', 'thumb'])[full_public_id]
+    base_url = urls[ORIGINAL]
     
     return {
         'original': base_url,
-        'web_optimized': base_url.replace('/upload/', '/upload/f_webp,q_80,w_1920/'),
-        'thumbnail': base_url.replace('/upload/', '/upload/c_thumb,w_300,h_300,q_80/'),
+        'web_optimized': urls['web'],
+        'thumbnail': urls['thumb'],
         'secure': base_url.replace('http://', 'https://') if 'http://' in base_url else base_url,
     }
-
@@ -0,0 +1,219 @@
+"""
+Responsive image derivatives for static images.
+
+Derivatives are written to static/responsive/ with a manifest describing the
+widths available for each source image, which the {% picture_sources %} and
+{% srcset %} template tags read to build <source> elements and srcset
+attributes.
+"""
+
+import json
+import os
+from pathlib import Path
+from PIL import ExifTags, Image, ImageOps
+from django.contrib.staticfiles import finders
+
+try:
+    import pillow_avif  # noqa: F401  Registers the AVIF plugin on Pillow < 11.2
+except ImportError:
+    pass
+
+# Derivative settings
+DERIVATIVE_WIDTHS = (320, 640, 1280, 1920)
+DERIVATIVE_FORMATS = ('webp', 'avif')
+DERIVATIVE_QUALITY = 80
+SOURCE_EXTENSIONS = {'.jpg', '.jpeg', '.jfif', '.png', '.bmp', '.tiff', '.tif', '.webp'}
+PIL_FORMATS = {'webp': 'WEBP', 'avif': 'AVIF'}
+MIME_TYPES = {'webp': 'image/webp', 'avif': 'image/avif'}
+
+# <picture> sources in order of preference; browsers take the first type they support
+PICTURE_FORMATS = ('avif', 'webp')
+
+# Output location, relative to the static directory
+RESPONSIVE_DIR = 'responsive'
+MANIFEST_NAME = 'manifest.json'
+
+# Loaded manifest, as a (path, mtime, manifest) tuple
+_manifest_cache = (None, None, {})
+
+
+def supported_formats(formats=DERIVATIVE_FORMATS):
+    """
+    Filter derivative formats down to the ones this Pillow build can write.
+    
+    Args:
+        formats: Requested format names
+    
+    Returns:
+        List of supported format names
+    """
+    Image.init()
+    return [fmt for fmt in formats if PIL_FORMATS.get(fmt) in Image.SAVE]
+
+
+def derivative_widths(source_width, widths=DERIVATIVE_WIDTHS):
+    """
+    Pick the derivative widths for a source image, never upscaling.
+    
+    Args:
+        source_width: Width of the original image
+        widths: Requested widths
+    
+    Returns:
+        Sorted list of widths; includes the source width when it is smaller
+        than the largest requested width
+    """
+    chosen = {width for width in widths if width < source_width}
+    if source_width <= max(widths):
+        chosen.add(source_width)
+    return sorted(chosen)
+
+
+def derivative_path(name, width, fmt):
+    """
+    Get the static path of one derivative.
+    
+    Args:
+        name: Static path of the source image (e.g. images/Myra-Yoga-1.jpg)
+        width: Derivative width
+        fmt: Derivative format
+    
+    Returns:
+        Static path such as responsive/images/Myra-Yoga-1-640w.webp
+    """
+    stem = os.path.splitext(name)[0]
+    return f'{RESPONSIVE_DIR}/{stem}-{width}w.{fmt}'
+
+
+def oriented_size(img):
+    """
+    Get an image's size after EXIF rotation, from its header alone.
+    
+    Args:
+        img: Image returned by Image.open, not yet decoded
+    
+    Returns:
+        Tuple of (width, height) as ImageOps.exif_transpose would produce
+    """
+    width, height = img.size
+    # Orientations 5-8 rotate by 90 degrees, swapping the dimensions
+    if img.getexif().get(ExifTags.Base.Orientation) in (5, 6, 7, 8):
+        return height, width
+    return width, height
+
+
+def generate_derivatives(task):
+    """
+    Write every derivative of one source image. Runs in a worker process.
+    
+    Args:
+        task: Tuple of (source_path, static_dir, widths, formats, quality, force)
+    
+    Returns:
+        Tuple of (static path, manifest entry, number of files written)
+    """
+    source_path, static_dir, widths, formats, quality, force = task
+    source_path = Path(source_path)
+    static_dir = Path(static_dir)
+    name = source_path.relative_to(static_dir).as_posix()
+    source_mtime = source_path.stat().st_mtime
+    
+    with Image.open(source_path) as opened:
+        # Image.open only reads the header, so the manifest entry and the
+        # up-to-date check cost no decode; unchanged images are never decoded
+        width, height = oriented_size(opened)
+        entry = {'width': width, 'height': height, 'variants': {fmt: [] for fmt in formats}}
+        
+        outdated = []
+        for target_width in derivative_widths(width, widths):
+            target_height = max(1, round(height * target_width / width))
+            for fmt in formats:
+                path = derivative_path(name, target_width, fmt)
+                output_path = static_dir / path
+                entry['variants'][fmt].append({'width': target_width, 'height': target_height, 'path': path})
+                if force or not output_path.exists() or output_path.stat().st_mtime < source_mtime:
+                    outdated.append((target_width, target_height, fmt, output_path))
+        
+        if not outdated:
+            return name, entry, 0
+        
+        img = ImageOps.exif_transpose(opened)
+        has_alpha = img.mode in ('RGBA', 'LA', 'PA') or 'transparency' in img.info
+        if img.mode not in ('RGB', 'RGBA'):
+            img = img.convert('RGBA' if has_alpha else 'RGB')
+        
+        resized = None
+        for target_width, target_height, fmt, output_path in outdated:
+            # Outputs are grouped by width, so each width is resized once
+            if resized is None or resized.width != target_width:
+                resized = img if target_width == width else img.resize(
+                    (target_width, target_height), Image.Resampling.LANCZOS
+                )
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            resized.save(output_path, PIL_FORMATS[fmt], quality=quality)
+    
+    return name, entry, len(outdated)
+
+
+def find_source_images(static_dir, source_dir):
+    """
+    Find source images under a directory, skipping existing derivatives.
+    
+    Args:
+        static_dir: Static root the manifest paths are relative to
+        source_dir: Directory to scan
+    
+    Returns:
+        Sorted list of image paths
+    """
+    output_dir = Path(static_dir) / RESPONSIVE_DIR
+    return sorted(
+        path for path in Path(source_dir).rglob('*')
+        if path.is_file()
+        and path.suffix.lower() in SOURCE_EXTENSIONS
+        and output_dir not in path.parents
+    )
+
+
+def write_manifest(static_dir, manifest):
+    """
+    Write the derivative manifest.
+    
+    Args:
+        static_dir: Static directory containing the responsive directory
+        manifest: Dictionary of static path to manifest entry
+    
+    Returns:
+        Path to the manifest file
+    """
+    manifest_path = Path(static_dir) / RESPONSIVE_DIR / MANIFEST_NAME
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest_path
+
+
+def get_manifest():
+    """
+    Get the derivative manifest, reloading it only when the file changes.
+    
+    Returns:
+        Dictionary of static path to manifest entry; empty if the derivatives
+        have not been built
+    """
+    global _manifest_cache
+    
+    path = _manifest_cache[0] or finders.find(f'{RESPONSIVE_DIR}/{MANIFEST_NAME}')
+    if not path:
+        return {}
+    
+    try:
+        mtime = os.stat(path).st_mtime
+    except OSError:
+        _manifest_cache = (None, None, {})
+        return {}
+    
+    if mtime != _manifest_cache[1]:
+        with open(path, encoding='utf-8') as f:
+            _manifest_cache = (path, mtime, json.load(f))
+    return _manifest_cache[2]
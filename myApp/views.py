@@ -1,9 +1,39 @@
+from django.http import FileResponse, Http404, HttpResponseBadRequest
 from django.shortcuts import render
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.views.decorators.http import condition, require_safe
+from .content_helpers import get_homepage_content
+from .image_delivery import CACHE_CONTROL, TransformationError, get_derivative
+from .page_cache import cache_public_page, page_etag, page_last_modified
 
 # Create your views here.
 
+@condition(etag_func=page_etag, last_modified_func=page_last_modified)
+@cache_public_page
 def home(request):
-    return render(request, 'myApp/home.html')
+    return render(request, 'myApp/home.html', {'content': get_homepage_content()})
 
+@condition(etag_func=page_etag, last_modified_func=page_last_modified)
+@cache_public_page
 def about(request):
-    return render(request, 'myApp/about.html')
+    return render(request, 'myApp/about.html', {'content': get_homepage_content()})
+
+@require_safe
+def image_delivery(request, path):
+    """Serve a locally transformed image for a Cloudinary-style delivery path."""
+    try:
+        derivative = get_derivative(path, request.headers.get('Accept', ''))
+    except TransformationError as e:
+        return HttpResponseBadRequest(str(e))
+    if derivative is None:
+        raise Http404('No such image')
+
+    response = get_conditional_response(request, etag=derivative['etag'])
+    if response is None:
+        response = FileResponse(open(derivative['path'], 'rb'), content_type=derivative['content_type'])
+    # Derivatives never change under their key, so clients may cache them for good
+    response['ETag'] = derivative['etag']
+    response['Cache-Control'] = CACHE_CONTROL
+    if derivative['vary_accept']:
+        patch_vary_headers(response, ['Accept'])
+    return response
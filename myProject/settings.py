@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 from pathlib import Path
 import os
+import tempfile
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -60,6 +61,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -107,6 +109,28 @@ else:
     }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+# Use Redis if REDIS_URL is set so content version bumps reach every worker,
+# otherwise fall back to a file-based cache shared by the workers on this host
+REDIS_URL = os.getenv('REDIS_URL')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.getenv('CACHE_DIR', os.path.join(tempfile.gettempdir(), 'radiatinglife-cache')),
+        }
+    }
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -149,6 +173,23 @@ STATICFILES_DIRS = [
 
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 
+# collectstatic writes content-hashed copies plus .gz/.br siblings to STATIC_ROOT;
+# WhiteNoise serves them in-process with far-future immutable cache headers,
+# Range support and wsgi.file_wrapper (sendfile under gunicorn)
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage',
+    },
+}
+
+# Identifies the deployed build; part of the full-page cache key and ETags, so a
+# deploy never serves pages rendered by the previous release. Railway sets
+# RAILWAY_DEPLOYMENT_ID; template and static manifest changes are detected anyway.
+RELEASE_ID = os.getenv('RELEASE_ID', os.getenv('RAILWAY_DEPLOYMENT_ID', ''))
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -172,6 +213,47 @@ if CLOUDINARY_CLOUD_NAME and CLOUDINARY_API_KEY and CLOUDINARY_API_SECRET:
         secure=True
     )
 
+# Send uploads and delivery URLs to a local stand-in instead of Cloudinary,
+# e.g. CLOUDINARY_FAKE_URL=http://127.0.0.1:8765 with `python manage.py run_fake_cloudinary`
+CLOUDINARY_FAKE_URL = os.getenv('CLOUDINARY_FAKE_URL', '')
+
+if CLOUDINARY_FAKE_URL:
+    import cloudinary
+    from urllib.parse import urlsplit
+
+    cloudinary.config(
+        cloud_name=CLOUDINARY_CLOUD_NAME or 'local',
+        api_key=CLOUDINARY_API_KEY or 'local',
+        api_secret=CLOUDINARY_API_SECRET or 'local',
+        upload_prefix=CLOUDINARY_FAKE_URL,
+        cname=urlsplit(CLOUDINARY_FAKE_URL).netloc,
+        secure=False
+    )
+
+# Named Cloudinary transformations precomputed on every MediaAsset at upload time.
+# "web" and "thumb" fill the web_url/thumb_url columns; run
+# `python manage.py backfill_url_variants --force` after changing this.
+CLOUDINARY_URL_VARIANTS = {
+    'web': 'f_webp,q_80,w_1920',
+    'thumb': 'c_thumb,w_300,h_300,q_80',
+    'card': 'c_fill,w_640,h_480,q_auto,f_auto',
+    'hero': 'c_limit,w_2560,q_auto,f_auto',
+}
+
+# Self-hosted delivery: with IMAGE_DELIVERY_MODE=local, image URLs point at
+# /images/upload/<transformation>/<public_id>, which transforms originals from
+# IMAGE_DELIVERY_ROOT with Pillow and caches the results in IMAGE_TRANSFORM_CACHE_DIR.
+# Only the CLOUDINARY_URL_VARIANTS transformations above are served there.
+IMAGE_DELIVERY_MODE = os.getenv('IMAGE_DELIVERY_MODE', 'cloudinary')
+IMAGE_DELIVERY_ROOT = Path(os.getenv('IMAGE_DELIVERY_ROOT', BASE_DIR / 'media_originals'))
+IMAGE_TRANSFORM_CACHE_DIR = Path(os.getenv('IMAGE_TRANSFORM_CACHE_DIR', BASE_DIR / 'image_cache'))
+
+# Dashboard uploads are spooled here until the run_image_worker command processes them
+IMAGE_UPLOAD_JOB_DIR = Path(os.getenv('IMAGE_UPLOAD_JOB_DIR', BASE_DIR / 'upload_jobs'))
+
+# Allow whole photo shoots in one batch upload request (Django's default is 100 files)
+DATA_UPLOAD_MAX_NUMBER_FILES = 500
+
 # Authentication Settings
 LOGIN_URL = '/dashboard/login/'
 LOGIN_REDIRECT_URL = '/dashboard/'
@@ -4,15 +4,24 @@ Cloudinary Image Uploader Script
 This script processes static images, converts high-resolution images to WebP,
 uploads them to Cloudinary, and stores the URLs in PostgreSQL.
 
+Files whose content hash matches the asset already stored for their path are
+skipped, so incremental runs only convert and upload new or changed images.
+
 Usage:
     python upload_images_to_cloudinary.py [--static-dir static/images] [--threshold 1920]
+                                          [--workers 4] [--checkpoint upload_checkpoint.txt] [--no-resume]
+                                          [--force] [--batch-size 100]
 """
 
 import os
 import sys
+import glob
+import hashlib
 import logging
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait, FIRST_COMPLETED
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Optional, Tuple, List
 import argparse
 
 # Add project root to path to import Django settings
@@ -28,23 +37,32 @@ from dotenv import load_dotenv
 import cloudinary
 import cloudinary.uploader
 from PIL import Image
-from django.db import connection
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('image_upload.log'),
-        logging.StreamHandler(sys.stdout)
-    ]
-)
+from django.conf import settings
+from django.db import connection, transaction
+from myApp.utils.cloudinary_utils import get_asset_url_fields
+
 logger = logging.getLogger(__name__)
 
-# Image formats supported for conversion
+# Image formats found by the scan, and those supported for conversion
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.tif', '.webp'}
 SUPPORTED_IMAGE_FORMATS = {'.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.tif'}
 WEBP_QUALITY = 90  # High quality WebP conversion
 HIGH_RES_THRESHOLD = 1920  # Default threshold for high-resolution images
+DEFAULT_CHECKPOINT = 'upload_checkpoint.txt'  # Progress file used to resume interrupted runs
+HASH_CHUNK_SIZE = 1024 * 1024  # Read files in 1MB chunks when hashing
+DEFAULT_BATCH_SIZE = 100  # Upload results buffered per database write
+
+
+def configure_logging():
+    """Log to image_upload.log and stdout."""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler('image_upload.log'),
+            logging.StreamHandler(sys.stdout)
+        ]
+    )
 
 
 def load_env() -> dict:
@@ -68,8 +86,8 @@ def load_env() -> dict:
         'postgres_port': os.getenv('POSTGRES_PORT', '5432'),
     }
     
-    # Validate Cloudinary credentials
-    if not all([env_vars['cloudinary_cloud_name'], 
+    # Validate Cloudinary credentials (a local stand-in needs none)
+    if not settings.CLOUDINARY_FAKE_URL and not all([env_vars['cloudinary_cloud_name'], 
                 env_vars['cloudinary_api_key'], 
                 env_vars['cloudinary_api_secret']]):
         raise ValueError("Missing Cloudinary credentials in .env file")
@@ -95,6 +113,11 @@ def configure_cloudinary(cloud_name: str, api_key: str, api_secret: str):
         api_key: Cloudinary API key
         api_secret: Cloudinary API secret
     """
+    if settings.CLOUDINARY_FAKE_URL:
+        # Already pointed at the stand-in by settings
+        logger.info(f"Cloudinary configured for local stand-in: {settings.CLOUDINARY_FAKE_URL}")
+        return
+    
     cloudinary.config(
         cloud_name=cloud_name,
         api_key=api_key,
@@ -248,6 +271,9 @@ def create_media_assets_table(conn):
                             height INTEGER,
                             file_size BIGINT,
                             was_converted BOOLEAN DEFAULT FALSE,
+                            content_hash VARCHAR(64),
+                            source_size BIGINT,
+                            source_mtime DOUBLE PRECISION,
                             uploaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                         );
                     """)
@@ -273,8 +299,38 @@ def create_media_assets_table(conn):
         # Don't raise - allow script to continue and try to use the model anyway
 
 
+def build_asset_fields(file_name: str, upload_result: dict, was_converted: bool,
+                       file_size: int, source_info: Optional[dict] = None) -> dict:
+    """
+    Build the MediaAsset field values for an uploaded image.
+    
+    Args:
+        file_name: Original file name
+        upload_result: Cloudinary upload response dictionary
+        was_converted: Whether the image was converted to WebP
+        file_size: File size in bytes
+        source_info: Optional content_hash/source_size/source_mtime of the source file
+        
+    Returns:
+        Dictionary of field values, including precomputed URL variants but excluding original_path
+    """
+    cloudinary_url = upload_result.get('secure_url') or upload_result.get('url')
+    return {
+        'file_name': file_name,
+        'cloudinary_url': cloudinary_url,
+        **get_asset_url_fields(cloudinary_url),
+        'cloudinary_public_id': upload_result.get('public_id'),
+        'format': upload_result.get('format'),
+        'width': upload_result.get('width'),
+        'height': upload_result.get('height'),
+        'file_size': upload_result.get('bytes') or file_size,
+        'was_converted': was_converted,
+        **(source_info or {}),
+    }
+
+
 def save_to_postgres(conn, original_path: str, file_name: str, upload_result: dict, 
-                    was_converted: bool, file_size: int):
+                    was_converted: bool, file_size: int, source_info: Optional[dict] = None):
     """
     Save image metadata to database using Django ORM.
     
@@ -285,6 +341,7 @@ def save_to_postgres(conn, original_path: str, file_name: str, upload_result: di
         upload_result: Cloudinary upload response dictionary
         was_converted: Whether the image was converted to WebP
         file_size: File size in bytes
+        source_info: Optional content_hash/source_size/source_mtime of the source file
     """
     try:
         from myApp.models import MediaAsset
@@ -292,16 +349,7 @@ def save_to_postgres(conn, original_path: str, file_name: str, upload_result: di
         # Use Django ORM to save the data
         MediaAsset.objects.update_or_create(
             original_path=original_path,
-            defaults={
-                'file_name': file_name,
-                'cloudinary_url': upload_result.get('secure_url') or upload_result.get('url'),
-                'cloudinary_public_id': upload_result.get('public_id'),
-                'format': upload_result.get('format'),
-                'width': upload_result.get('width'),
-                'height': upload_result.get('height'),
-                'file_size': upload_result.get('bytes') or file_size,
-                'was_converted': was_converted,
-            }
+            defaults=build_asset_fields(file_name, upload_result, was_converted, file_size, source_info)
         )
         logger.info(f"Saved metadata for {file_name} to database")
     except Exception as e:
@@ -309,8 +357,196 @@ def save_to_postgres(conn, original_path: str, file_name: str, upload_result: di
         raise
 
 
+def compute_file_hash(image_path: Path) -> str:
+    """
+    Compute the SHA-256 of a file without reading it into memory at once.
+    
+    Args:
+        image_path: Path to the file
+        
+    Returns:
+        Hex digest string
+    """
+    digest = hashlib.sha256()
+    with open(image_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_hash_index() -> dict:
+    """
+    Load the content hash index of previously uploaded source files.
+    
+    Returns:
+        Dictionary mapping original_path to (content_hash, source_size, source_mtime)
+    """
+    from myApp.models import MediaAsset
+    
+    rows = MediaAsset.objects.exclude(content_hash=None).values_list(
+        'original_path', 'content_hash', 'source_size', 'source_mtime'
+    )
+    return {original_path: (content_hash, size, mtime) for original_path, content_hash, size, mtime in rows.iterator()}
+
+
+def check_source(image_path: Path, original_path: str, hash_index: dict) -> Tuple[bool, dict]:
+    """
+    Check whether a source file is unchanged since its last upload.
+    
+    Files whose size and mtime match the index are trusted without hashing;
+    anything else is hashed and compared.
+    
+    Args:
+        image_path: Path to the image file
+        original_path: Path relative to the static directory
+        hash_index: Index returned by load_hash_index
+        
+    Returns:
+        Tuple of (unchanged, source_info) where source_info holds the file's
+        content_hash, source_size and source_mtime
+    """
+    stat = image_path.stat()
+    known = hash_index.get(original_path)
+    
+    if known and known[1] == stat.st_size and known[2] == stat.st_mtime:
+        return True, {'content_hash': known[0], 'source_size': stat.st_size, 'source_mtime': stat.st_mtime}
+    
+    source_info = {
+        'content_hash': compute_file_hash(image_path),
+        'source_size': stat.st_size,
+        'source_mtime': stat.st_mtime,
+    }
+    return bool(known and known[0] == source_info['content_hash']), source_info
+
+
+def get_relative_path(image_path: Path, static_dir: Path) -> Path:
+    """
+    Get an image's path relative to the static directory.
+    
+    Args:
+        image_path: Path to the image file
+        static_dir: Base static directory path
+        
+    Returns:
+        Relative path, or just the file name if the image is outside static_dir
+    """
+    try:
+        return image_path.relative_to(static_dir)
+    except ValueError:
+        return Path(image_path.name)
+
+
+def get_original_path(image_path: Path, static_dir: Path) -> str:
+    """
+    Get the original_path stored for an image (relative, with forward slashes).
+    
+    Args:
+        image_path: Path to the image file
+        static_dir: Base static directory path
+        
+    Returns:
+        Relative path string
+    """
+    return str(get_relative_path(image_path, static_dir)).replace('\\', '/')
+
+
+def get_public_id(image_path: Path, static_dir: Path) -> str:
+    """
+    Get the Cloudinary public ID an image is uploaded under.
+    
+    The relative path without its extension, so URLs stay clean; when another
+    image in the folder has the same name with a different extension (a.jpg
+    and a.png), the extension is kept as a suffix (a_jpg, a_png) so the two
+    never overwrite each other on Cloudinary.
+    
+    Args:
+        image_path: Path to the image file
+        static_dir: Base static directory path
+        
+    Returns:
+        Public ID string
+    """
+    public_id = str(get_relative_path(image_path, static_dir).with_suffix('')).replace('\\', '/')
+    siblings = [
+        path for path in image_path.parent.glob(f'{glob.escape(image_path.stem)}.*')
+        if path.stem == image_path.stem and path.suffix.lower() in IMAGE_EXTENSIONS
+    ]
+    if len(siblings) > 1:
+        public_id = f"{public_id}_{image_path.suffix.lstrip('.')}"
+    return public_id
+
+
+def prepare_image(image_path: Path, static_dir: Path, threshold: int,
+                  work_dir: Optional[Path] = None) -> dict:
+    """
+    Read an image's dimensions and convert it to WebP if it is high resolution.
+    
+    This is the CPU-bound part of processing and is safe to run in a worker process.
+    
+    Args:
+        image_path: Path to the image file
+        static_dir: Base static directory path
+        threshold: Resolution threshold for conversion
+        work_dir: Optional directory for converted files (defaults to next to the original)
+        
+    Returns:
+        Dictionary describing the file to upload and its metadata
+    """
+    public_id = get_public_id(image_path, static_dir)
+    file_name = image_path.name
+    
+    logger.info(f"Processing: {file_name}")
+    
+    # Get image dimensions
+    width, height = get_image_dimensions(image_path)
+    max_dimension = max(width, height)
+    
+    # Determine if conversion is needed
+    needs_conversion = (
+        max_dimension > threshold and 
+        image_path.suffix.lower() in SUPPORTED_IMAGE_FORMATS
+    )
+    
+    # Convert to WebP if needed
+    upload_path = image_path
+    was_converted = False
+    
+    if needs_conversion:
+        logger.info(f"Converting {file_name} to WebP (resolution: {width}x{height})")
+        output_path = None
+        if work_dir is not None:
+            # Flatten the public ID, which is unique per image, so converted files can't collide
+            output_path = work_dir / (public_id.replace('/', '__') + '.webp')
+        upload_path = convert_to_webp(image_path, output_path)
+        was_converted = True
+    
+    return {
+        'image_path': image_path,
+        'original_path': get_original_path(image_path, static_dir),
+        'file_name': file_name,
+        'file_size': image_path.stat().st_size,
+        'upload_path': upload_path,
+        'was_converted': was_converted,
+        'public_id': public_id,
+    }
+
+
+def cleanup_prepared(prepared: dict):
+    """
+    Remove the temporary WebP file created for an image, if any.
+    
+    Args:
+        prepared: Dictionary returned by prepare_image
+    """
+    upload_path = prepared['upload_path']
+    if prepared['was_converted'] and upload_path.exists() and upload_path != prepared['image_path']:
+        upload_path.unlink()
+        logger.info(f"Cleaned up temporary file: {upload_path.name}")
+
+
 def process_image(image_path: Path, static_dir: Path, threshold: int, 
-                 conn, env_vars: dict) -> bool:
+                 conn, env_vars: dict, source_info: Optional[dict] = None,
+                 writer: Optional['MediaAssetWriter'] = None) -> bool:
     """
     Process a single image: convert if needed, upload, and save to database.
     
@@ -320,79 +556,372 @@ def process_image(image_path: Path, static_dir: Path, threshold: int,
         threshold: Resolution threshold for conversion
         conn: Database connection
         env_vars: Environment variables dictionary
+        source_info: Optional content_hash/source_size/source_mtime to store
+        writer: Optional batched writer; the result is saved immediately when omitted
         
     Returns:
         True if successful, False otherwise
     """
+    prepared = None
     try:
-        # Get relative path from static directory
-        try:
-            relative_path = image_path.relative_to(static_dir)
-        except ValueError:
-            relative_path = Path(image_path.name)
+        prepared = prepare_image(image_path, static_dir, threshold)
         
-        original_path = str(relative_path).replace('\\', '/')
-        file_name = image_path.name
-        file_size = image_path.stat().st_size
+        # Upload to Cloudinary
+        upload_result = upload_to_cloudinary(prepared['upload_path'], public_id=prepared['public_id'])
         
-        logger.info(f"Processing: {file_name}")
+        # Save to database
+        if writer is not None:
+            writer.add(prepared, upload_result, source_info)
+        else:
+            save_to_postgres(
+                conn, 
+                prepared['original_path'], 
+                prepared['file_name'], 
+                upload_result, 
+                prepared['was_converted'],
+                prepared['file_size'],
+                source_info
+            )
         
-        # Get image dimensions
-        width, height = get_image_dimensions(image_path)
-        max_dimension = max(width, height)
+        logger.info(f"✓ Successfully processed: {prepared['file_name']}")
+        return True
         
-        # Determine if conversion is needed
-        needs_conversion = (
-            max_dimension > threshold and 
-            image_path.suffix.lower() in SUPPORTED_IMAGE_FORMATS
-        )
+    except Exception as e:
+        logger.error(f"✗ Failed to process {image_path.name}: {e}")
+        return False
+    
+    finally:
+        # Clean up temporary WebP file if created
+        if prepared:
+            cleanup_prepared(prepared)
+
+
+class UploadCheckpoint:
+    """
+    Append-only record of images that finished processing.
+    
+    Each line is the original_path of one completed image, so an interrupted
+    run can be resumed by skipping everything already listed.
+    """
+    
+    def __init__(self, path: Optional[Path], resume: bool = True):
+        """
+        Args:
+            path: Checkpoint file path, or None to disable checkpointing
+            resume: Whether to load progress from an existing checkpoint file
+        """
+        self.path = path
+        self.completed = set()
+        self._file = None
         
-        # Convert to WebP if needed
-        upload_path = image_path
-        was_converted = False
-        temp_webp_path = None
+        if path is None:
+            return
         
-        if needs_conversion:
-            logger.info(f"Converting {file_name} to WebP (resolution: {width}x{height})")
-            temp_webp_path = convert_to_webp(image_path)
-            upload_path = temp_webp_path
-            was_converted = True
+        if resume and path.exists():
+            with open(path, 'r', encoding='utf-8') as f:
+                self.completed = {line.rstrip('\n') for line in f if line.strip()}
+            logger.info(f"Resuming from checkpoint {path}: {len(self.completed)} image(s) already done")
         
-        # Upload to Cloudinary
-        # Use relative path without extension as public_id
-        public_id = str(relative_path.with_suffix('')).replace('\\', '/')
-        upload_result = upload_to_cloudinary(upload_path, public_id=public_id)
+        self._file = open(path, 'a' if resume else 'w', encoding='utf-8')
+    
+    def is_done(self, original_path: str) -> bool:
+        return original_path in self.completed
+    
+    def mark_done(self, original_path: str):
+        """Record an image as completed, flushing so progress survives a crash."""
+        self.completed.add(original_path)
+        if self._file:
+            self._file.write(original_path + '\n')
+            self._file.flush()
+    
+    def close(self, finished: bool = False):
+        """
+        Close the checkpoint file.
         
-        # Save to database
-        save_to_postgres(
-            conn, 
-            original_path, 
-            file_name, 
-            upload_result, 
-            was_converted,
-            file_size
+        Args:
+            finished: True when every image succeeded; the checkpoint is then
+                removed so the next run starts fresh
+        """
+        if self._file:
+            self._file.close()
+            self._file = None
+            if finished and self.path.exists():
+                self.path.unlink()
+
+
+class MediaAssetWriter:
+    """
+    Buffers upload results and writes them to MediaAsset in batches.
+    
+    Each flush is one transaction: a lookup of existing rows by public ID,
+    then by original_path for the rest, bulk_update for those and bulk_create
+    for the remainder. get_public_id gives every image its own public ID; if
+    several paths in a batch were still uploaded under one, only the last is
+    recorded and the others are counted as failed, so the next run retries them.
+    Images are only recorded in the checkpoint once their batch has committed.
+    """
+    
+    def __init__(self, batch_size: int = DEFAULT_BATCH_SIZE,
+                 checkpoint: Optional[UploadCheckpoint] = None):
+        """
+        Args:
+            batch_size: Number of results buffered before writing
+            checkpoint: Optional checkpoint that saved images are recorded in
+        """
+        self.batch_size = max(1, batch_size)
+        self.checkpoint = checkpoint
+        self.saved = 0
+        self.failed = 0
+        # original_path -> field values; a later result for the same path replaces the earlier one
+        self._pending = {}
+    
+    def add(self, prepared: dict, upload_result: dict, source_info: Optional[dict] = None):
+        """
+        Buffer an upload result, flushing when the batch is full.
+        
+        Args:
+            prepared: Dictionary returned by prepare_image
+            upload_result: Cloudinary upload response dictionary
+            source_info: Optional content_hash/source_size/source_mtime of the source file
+        """
+        self._pending[prepared['original_path']] = build_asset_fields(
+            prepared['file_name'], upload_result, prepared['was_converted'],
+            prepared['file_size'], source_info
         )
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+    
+    def flush(self):
+        """Write all buffered results. A failed batch is counted as failed and not checkpointed."""
+        from myApp.models import MediaAsset
         
-        # Clean up temporary WebP file if created
-        if temp_webp_path and temp_webp_path.exists() and temp_webp_path != image_path:
-            temp_webp_path.unlink()
-            logger.info(f"Cleaned up temporary file: {temp_webp_path.name}")
+        if not self._pending:
+            return
         
-        logger.info(f"✓ Successfully processed: {file_name}")
-        return True
+        batch, self._pending = self._pending, {}
+        # Cloudinary keeps one image per public ID, so when several paths in the
+        # batch were uploaded under the same ID only the last one gets a row
+        last_paths = {}
+        for original_path, values in batch.items():
+            public_id = values.get('cloudinary_public_id')
+            last_paths[('id', public_id) if public_id else ('path', original_path)] = original_path
+        rows = {original_path: batch[original_path] for original_path in last_paths.values()}
+        for original_path in sorted(batch.keys() - rows.keys()):
+            self.failed += 1
+            logger.error(f"{original_path} shares its public ID with a later image in the batch; not recorded")
         
-    except Exception as e:
-        logger.error(f"✗ Failed to process {image_path.name}: {e}")
-        return False
+        try:
+            with transaction.atomic():
+                # The public ID is unique, so it is matched first: an image re-uploaded
+                # from a new path takes over its row instead of conflicting with it
+                paths_by_public_id = {
+                    values['cloudinary_public_id']: original_path
+                    for original_path, values in rows.items()
+                    if values.get('cloudinary_public_id')
+                }
+                matched = {
+                    paths_by_public_id[asset.cloudinary_public_id]: asset
+                    for asset in MediaAsset.objects.filter(cloudinary_public_id__in=paths_by_public_id.keys())
+                }
+                claimed = {asset.id for asset in matched.values()}
+                for asset in MediaAsset.objects.filter(original_path__in=rows.keys() - matched.keys()):
+                    if asset.id not in claimed and asset.original_path not in matched:
+                        matched[asset.original_path] = asset
+                        claimed.add(asset.id)
+                
+                for original_path, asset in matched.items():
+                    asset.original_path = original_path
+                    for field, value in rows[original_path].items():
+                        setattr(asset, field, value)
+                
+                if matched:
+                    fields = ['original_path', *next(iter(rows.values())).keys()]
+                    MediaAsset.objects.bulk_update(matched.values(), fields)
+                
+                MediaAsset.objects.bulk_create([
+                    MediaAsset(original_path=original_path, **values)
+                    for original_path, values in rows.items()
+                    if original_path not in matched
+                ])
+        except Exception as e:
+            self.failed += len(rows)
+            logger.error(f"Error saving batch of {len(rows)} image(s) to database: {e}")
+            return
+        
+        self.saved += len(rows)
+        if self.checkpoint:
+            for original_path in rows:
+                self.checkpoint.mark_done(original_path)
+        logger.info(f"Saved metadata for {len(rows)} image(s) to database")
+
+
+def process_images_concurrently(image_files: List[Path], static_dir: Path, threshold: int,
+                                conn, workers: int, writer: MediaAssetWriter,
+                                source_infos: Optional[dict] = None) -> int:
+    """
+    Process images with a pipeline of worker pools.
+    
+    Dimension reads and WebP conversion run in a process pool, uploads run in
+    a thread pool, and upload results are handed to the writer on the main thread.
+    
+    Args:
+        image_files: Images to process
+        static_dir: Base static directory path
+        threshold: Resolution threshold for conversion
+        conn: Database connection
+        workers: Number of conversion processes and upload threads
+        writer: Batched writer that saves results and records them in the checkpoint
+        source_infos: Optional mapping of image path to source info to store
+        
+    Returns:
+        Number of images that failed to convert or upload
+    """
+    uploaded = 0
+    failed = 0
+    total = len(image_files)
+    
+    with tempfile.TemporaryDirectory(prefix='cloudinary_upload_') as work_dir, \
+            ProcessPoolExecutor(max_workers=workers) as convert_pool, \
+            ThreadPoolExecutor(max_workers=workers) as upload_pool:
+        
+        # Map each running future to its stage, source image and prepared metadata
+        pending = {
+            convert_pool.submit(prepare_image, image_path, static_dir, threshold, Path(work_dir)): ('convert', image_path, None)
+            for image_path in image_files
+        }
+        
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage, image_path, prepared = pending.pop(future)
+                try:
+                    result = future.result()
+                    
+                    if stage == 'convert':
+                        upload_future = upload_pool.submit(upload_to_cloudinary, result['upload_path'], result['public_id'])
+                        pending[upload_future] = ('upload', image_path, result)
+                        continue
+                    
+                    writer.add(prepared, result, (source_infos or {}).get(image_path))
+                    uploaded += 1
+                    logger.info(f"✓ Successfully processed: {prepared['file_name']} ({uploaded + failed}/{total})")
+                
+                except Exception as e:
+                    failed += 1
+                    logger.error(f"✗ Failed to process {image_path.name}: {e}")
+                
+                finally:
+                    if stage == 'upload':
+                        cleanup_prepared(prepared)
+    
+    return failed
 
 
-def scan_and_process_images(static_dir: Path, threshold: int = HIGH_RES_THRESHOLD):
+def find_image_files(static_dir: Path) -> List[Path]:
+    """
+    Find all image files under a directory.
+    
+    Args:
+        static_dir: Path to static directory containing images
+        
+    Returns:
+        List of image file paths
+    """
+    return [
+        f for f in static_dir.rglob('*')
+        if f.suffix.lower() in IMAGE_EXTENSIONS and f.is_file()
+    ]
+
+
+def upload_images(image_files: List[Path], static_dir: Path, threshold: int, conn=None,
+                  env_vars: Optional[dict] = None, workers: int = 1,
+                  checkpoint_path: Optional[Path] = None, resume: bool = True,
+                  force: bool = False, batch_size: int = DEFAULT_BATCH_SIZE) -> Tuple[int, int, int]:
+    """
+    Process a list of images, skipping unchanged files and any already
+    recorded in the checkpoint.
+    
+    Args:
+        image_files: Images to process
+        static_dir: Base static directory path
+        threshold: Resolution threshold for WebP conversion
+        conn: Database connection
+        env_vars: Environment variables dictionary
+        workers: Number of parallel workers; 1 processes images one at a time
+        checkpoint_path: Optional checkpoint file for resuming interrupted runs
+        resume: Whether to skip images recorded in an existing checkpoint
+        force: Upload every image even if its content hash is unchanged
+        batch_size: Number of upload results written to the database at once
+        
+    Returns:
+        Tuple of (successful, failed, skipped) counts
+    """
+    from myApp.models import MediaAsset
+    
+    checkpoint = UploadCheckpoint(checkpoint_path, resume=resume)
+    hash_index = {} if force else load_hash_index()
+    remaining = []
+    source_infos = {}
+    skipped = 0
+    
+    for image_path in image_files:
+        original_path = get_original_path(image_path, static_dir)
+        if checkpoint.is_done(original_path):
+            skipped += 1
+            continue
+        
+        unchanged, source_info = check_source(image_path, original_path, hash_index)
+        if unchanged:
+            known = hash_index[original_path]
+            if (known[1], known[2]) != (source_info['source_size'], source_info['source_mtime']):
+                # Same content with a new mtime (e.g. a fresh checkout); record it so the next run skips hashing
+                MediaAsset.objects.filter(original_path=original_path).update(**source_info)
+            skipped += 1
+            continue
+        
+        remaining.append(image_path)
+        source_infos[image_path] = source_info
+    
+    logger.info(f"{len(remaining)} new or changed image(s), {skipped} skipped")
+    finished = False
+    
+    writer = MediaAssetWriter(batch_size, checkpoint)
+    
+    try:
+        if workers > 1:
+            failed = process_images_concurrently(
+                remaining, static_dir, threshold, conn, workers, writer, source_infos
+            )
+        else:
+            failed = 0
+            for image_path in remaining:
+                if not process_image(image_path, static_dir, threshold, conn, env_vars,
+                                     source_infos[image_path], writer):
+                    failed += 1
+        writer.flush()
+        failed += writer.failed
+        finished = failed == 0
+    finally:
+        # Keep the checkpoint after failures or interruptions so the next run resumes
+        checkpoint.close(finished=finished)
+    
+    return writer.saved, failed, skipped
+
+
+def scan_and_process_images(static_dir: Path, threshold: int = HIGH_RES_THRESHOLD, workers: int = 1,
+                            checkpoint_path: Optional[Path] = None, resume: bool = True,
+                            force: bool = False, batch_size: int = DEFAULT_BATCH_SIZE):
     """
     Scan static directory and process all images.
     
     Args:
         static_dir: Path to static directory containing images
         threshold: Resolution threshold for WebP conversion
+        workers: Number of parallel workers; 1 processes images one at a time
+        checkpoint_path: Optional checkpoint file for resuming interrupted runs
+        resume: Whether to skip images recorded in an existing checkpoint
+        force: Upload every image even if its content hash is unchanged
+        batch_size: Number of upload results written to the database at once
     """
     # Load environment variables
     env_vars = load_env()
@@ -412,11 +941,7 @@ def scan_and_process_images(static_dir: Path, threshold: int = HIGH_RES_THRESHOL
         create_media_assets_table(conn)
         
         # Find all image files
-        image_extensions = {'.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.tif', '.webp'}
-        image_files = [
-            f for f in static_dir.rglob('*')
-            if f.suffix.lower() in image_extensions and f.is_file()
-        ]
+        image_files = find_image_files(static_dir)
         
         if not image_files:
             logger.warning(f"No image files found in {static_dir}")
@@ -425,19 +950,17 @@ def scan_and_process_images(static_dir: Path, threshold: int = HIGH_RES_THRESHOL
         logger.info(f"Found {len(image_files)} image(s) to process")
         
         # Process each image
-        successful = 0
-        failed = 0
-        
-        for image_path in image_files:
-            if process_image(image_path, static_dir, threshold, conn, env_vars):
-                successful += 1
-            else:
-                failed += 1
+        successful, failed, skipped = upload_images(
+            image_files, static_dir, threshold, conn, env_vars,
+            workers=workers, checkpoint_path=checkpoint_path, resume=resume, force=force,
+            batch_size=batch_size
+        )
         
         logger.info(f"\n{'='*60}")
         logger.info(f"Processing complete!")
         logger.info(f"Successful: {successful}")
         logger.info(f"Failed: {failed}")
+        logger.info(f"Skipped (unchanged or already done): {skipped}")
         logger.info(f"Total: {len(image_files)}")
         logger.info(f"{'='*60}")
         
@@ -448,6 +971,8 @@ def scan_and_process_images(static_dir: Path, threshold: int = HIGH_RES_THRESHOL
 
 def main():
     """Main entry point for the script."""
+    configure_logging()
+    
     parser = argparse.ArgumentParser(
         description='Upload static images to Cloudinary and store URLs in PostgreSQL'
     )
@@ -463,6 +988,34 @@ def main():
         default=HIGH_RES_THRESHOLD,
         help=f'Resolution threshold for WebP conversion (default: {HIGH_RES_THRESHOLD})'
     )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help='Number of parallel conversion processes and upload threads (default: 1)'
+    )
+    parser.add_argument(
+        '--checkpoint',
+        type=str,
+        default=DEFAULT_CHECKPOINT,
+        help=f'Progress file used to resume interrupted runs (default: {DEFAULT_CHECKPOINT})'
+    )
+    parser.add_argument(
+        '--no-resume',
+        action='store_true',
+        help='Ignore any existing checkpoint and process every image'
+    )
+    parser.add_argument(
+        '--force',
+        action='store_true',
+        help='Re-upload images even if their content hash is unchanged'
+    )
+    parser.add_argument(
+        '--batch-size',
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help=f'Number of upload results written to the database at once (default: {DEFAULT_BATCH_SIZE})'
+    )
     
     args = parser.parse_args()
     
@@ -475,12 +1028,21 @@ def main():
         logger.error(f"Static directory not found: {static_dir}")
         sys.exit(1)
     
+    checkpoint_path = Path(args.checkpoint)
+    if not checkpoint_path.is_absolute():
+        checkpoint_path = BASE_DIR / checkpoint_path
+    
     logger.info(f"Starting image upload process...")
     logger.info(f"Static directory: {static_dir}")
     logger.info(f"Resolution threshold: {args.threshold}px")
+    logger.info(f"Workers: {args.workers}")
     
     try:
-        scan_and_process_images(static_dir, args.threshold)
+        scan_and_process_images(
+            static_dir, args.threshold, workers=args.workers,
+            checkpoint_path=checkpoint_path, resume=not args.no_resume, force=args.force,
+            batch_size=args.batch_size
+        )
     except Exception as e:
         logger.error(f"Fatal error: {e}", exc_info=True)
         sys.exit(1)
@@ -488,4 +1050,3 @@ def main():
 
 if __name__ == '__main__':
     main()
-